@@ -9,19 +9,28 @@ import multiprocessing as mp
 # import queue
 import time
 
-from pymavlink import mavutil
-
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.command import command
+from modules.command import command_report
 from modules.command import command_worker
 from modules.heartbeat import heartbeat_receiver_worker
 from modules.heartbeat import heartbeat_sender_worker
+from modules.mavlink_router import mavlink_router
+from modules.mavlink_router import mavlink_router_worker
+from modules.mavlink_router import message_statistics
+from modules.telemetry import telemetry_decimator
+from modules.telemetry import telemetry_decimator_worker
+from modules.telemetry import telemetry_estimator_worker
+from modules.telemetry import telemetry_history
 from modules.telemetry import telemetry_worker
+from utilities.workers import latest_value_channel
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_select
 from utilities.workers import worker_controller
 from utilities.workers import worker_manager
+from utilities.workers import worker_supervisor
 
 
 # MAVLink connection
@@ -32,8 +41,12 @@ CONNECTION_STRING = "tcp:localhost:12345"
 # =================================================================================================
 # Set queue max sizes (<= 0 for infinity)
 HEARTBEAT_QUEUE_MAX_SIZE = 10
-TELEMETRY_QUEUE_MAX_SIZE = 10
 COMMAND_QUEUE_MAX_SIZE = 10
+ROUTER_QUEUE_MAX_SIZE = 20
+TELEMETRY_QUEUE_MAX_SIZE = 20
+
+# Longer than the router waits for a heartbeat, to include starting the router
+DRONE_CONNECT_TIMEOUT = mavlink_router_worker.HEARTBEAT_TIMEOUT + 10  # seconds
 
 # Set worker counts
 HEARTBEAT_SENDER_WORKER_COUNT = 1
@@ -41,14 +54,85 @@ HEARTBEAT_RECEIVER_WORKER_COUNT = 1
 TELEMETRY_WORKER_COUNT = 1
 COMMAND_WORKER_COUNT = 1
 
+# How worker processes are started, None for the default of the platform
+# "forkserver" imports the preloaded modules once instead of in every worker and restart
+WORKER_START_METHOD = "forkserver" if "forkserver" in mp.get_all_start_methods() else None
+WORKER_PRELOAD = [
+    "pymavlink.mavutil",
+    "pymavlink.dialects.v20.ardupilotmega",
+    "modules.command.command_worker",
+    "modules.heartbeat.heartbeat_receiver_worker",
+    "modules.heartbeat.heartbeat_sender_worker",
+    "modules.mavlink_router.mavlink_router_worker",
+    "modules.telemetry.telemetry_decimator_worker",
+    "modules.telemetry.telemetry_estimator_worker",
+    "modules.telemetry.telemetry_worker",
+]
+
+# Message types whose arrival rate and jitter are recorded
+MEASURED_MESSAGE_TYPES = ["HEARTBEAT", "ATTITUDE", "LOCAL_POSITION_NED", "COMMAND_ACK"]
+# Period of logging message statistics and command latency percentiles
+STATISTICS_LOG_PERIOD = 10  # seconds
+
 # Any other constants
 TARGET = command.Position(0, 0, 0)
+# CSV file of waypoints of x, y, z to visit instead of the target, None to only fly to the target
+MISSION_PATH = None
+
+# Reduce the telemetry to the command worker to at most 1 sample every interval,
+# with a decimator worker between them
+USE_DECIMATOR = False
+COMMAND_TELEMETRY_INTERVAL = 100  # ms
+
+# Filter the telemetry to the command worker, with an estimator worker ahead of any decimator
+# that outputs an estimate every period regardless of the telemetry rate
+USE_ESTIMATOR = False
+ESTIMATOR_OUTPUT_PERIOD = 0.05  # seconds
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
 # =================================================================================================
 
 
+def log_message_statistics(
+    main_logger: logger.Logger,
+    router_statistics: message_statistics.MessageStatistics,
+    worker_statistics: message_statistics.MessageStatistics,
+) -> None:
+    """
+    Logs the arrival statistics of each message type at the router and at the workers.
+    """
+    router_snapshots = router_statistics.snapshot()
+    worker_snapshots = worker_statistics.snapshot()
+    for message_type in MEASURED_MESSAGE_TYPES:
+        main_logger.info(f"{message_type} at router: {router_snapshots[message_type]}")
+        main_logger.info(f"{message_type} at workers: {worker_snapshots[message_type]}")
+
+
+def log_command_latencies(
+    main_logger: logger.Logger, latency_recorder: command_report.LatencyRecorder
+) -> None:
+    """
+    Logs the latency percentiles of each stage from telemetry to command report.
+    """
+    for stage, latencies in latency_recorder.percentiles().items():
+        percentiles = ", ".join(
+            f"p{percentile} {latency * 1000:.1f} ms"
+            for percentile, latency in zip(command_report.DEFAULT_PERCENTILES, latencies)
+        )
+        main_logger.info(f"Command latency {stage}: {percentiles}")
+
+
+def close_shared_memory(
+    shared_memory: "list[queue_proxy_wrapper.QueueProxyWrapper | latest_value_channel.LatestValueChannel | telemetry_history.TelemetryHistory]",
+) -> None:
+    """
+    Frees the shared memory of each queue, channel, and history once no worker is using it.
+    """
+    for resource in shared_memory:
+        resource.close()
+
+
 def main() -> int:
     """
     Main function.
@@ -71,80 +155,220 @@ def main() -> int:
     # Get Pylance to stop complaining
     assert main_logger is not None
 
-    # Create a connection to the drone. Assume that this is safe to pass around to all processes
-    # In reality, this will not work, but to simplify the bootamp, preetend it is allowed
+    # The connection to the drone is opened and owned by the router worker only
+    # Every other worker is given a subscriber that stands in for the connection (mavutil.mavfile),
+    # receiving the message types routed to it and funnelling its sends through the router
     # To test, you will run each of your workers individually to see if they work
     # (test "drones" are provided for you test your workers)
-    # NOTE: If you want to have type annotations for the connection, it is of type mavutil.mavfile
-    connection = mavutil.mavlink_connection(CONNECTION_STRING)
-    connection.wait_heartbeat(timeout=30)  # Wait for the "drone" to connect
 
     # =============================================================================================
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
+    # Queues and the controller must use the same start method as the workers
+    if WORKER_START_METHOD is not None:
+        mp.set_start_method(WORKER_START_METHOD)
+
     # Create a worker controller
     controller = worker_controller.WorkerController()
 
     # Create a multiprocess manager for synchronized queues
     mp_manager = mp.Manager()
 
+    # Notified on every put into a queue that outputs to main
+    main_notifier = mp.Condition()
+
+    # Set by the router once the drone has connected
+    router_ready = mp.Event()
+
     # Create queues
-    heartbeat_to_main_queue = queue_proxy_wrapper.QueueProxyWrapper(
-        mp_manager,
-        HEARTBEAT_QUEUE_MAX_SIZE,
+    # Router queues bypass the manager server process, and subscribers that fall behind
+    # lose their oldest messages instead of stalling the router
+    router_outbound_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None,
+        ROUTER_QUEUE_MAX_SIZE,
+        queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+    )
+
+    router_to_heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None,
+        ROUTER_QUEUE_MAX_SIZE,
+        queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
     )
 
-    telemetry_to_command_queue = queue_proxy_wrapper.QueueProxyWrapper(
+    router_to_telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None,
+        ROUTER_QUEUE_MAX_SIZE,
+        queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
+    )
+
+    router_to_command_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None,
+        ROUTER_QUEUE_MAX_SIZE,
+        queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
+    )
+
+    # Only the newest heartbeat status matters, so never stall the receiver
+    heartbeat_to_main_queue = queue_proxy_wrapper.QueueProxyWrapper(
         mp_manager,
-        TELEMETRY_QUEUE_MAX_SIZE,
+        HEARTBEAT_QUEUE_MAX_SIZE,
+        overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
+        notifier=main_notifier,
     )
 
+    # Command only acts on the newest telemetry, so older samples are overwritten
+    # instead of queued, which also means the telemetry worker never blocks
+    telemetry_to_command_queue = latest_value_channel.LatestValueChannel()
+
+    # Samples go through the decimator if used, falling behind drops the oldest
+    telemetry_output_queue = telemetry_to_command_queue
+    telemetry_to_decimator_queue = None
+    if USE_DECIMATOR:
+        telemetry_to_decimator_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None,
+            TELEMETRY_QUEUE_MAX_SIZE,
+            queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+            overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
+        )
+        telemetry_output_queue = telemetry_to_decimator_queue
+
+    # Every sample goes to the estimator if used, which outputs to the decimator or command
+    estimator_output_queue = telemetry_output_queue
+    telemetry_to_estimator_queue = None
+    if USE_ESTIMATOR:
+        telemetry_to_estimator_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None,
+            TELEMETRY_QUEUE_MAX_SIZE,
+            queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+            overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
+        )
+        telemetry_output_queue = telemetry_to_estimator_queue
+
+    # Commands are lossless
     command_to_main_queue = queue_proxy_wrapper.QueueProxyWrapper(
         mp_manager,
         COMMAND_QUEUE_MAX_SIZE,
+        overflow_policy=queue_proxy_wrapper.OverflowPolicy.BLOCK,
+        notifier=main_notifier,
+    )
+
+    # Arrival statistics from the vehicle at the router and at the workers,
+    # to tell a slow vehicle from a backlog in the pipeline
+    router_statistics = message_statistics.MessageStatistics(MEASURED_MESSAGE_TYPES)
+    worker_statistics = message_statistics.MessageStatistics(MEASURED_MESSAGE_TYPES)
+
+    # Recent telemetry recorded by the telemetry worker for the command worker to query
+    history = telemetry_history.TelemetryHistory()
+
+    # Freed on every return from here on, including failures
+    shared_memory = [
+        queue
+        for queue in [
+            telemetry_to_command_queue,
+            telemetry_to_decimator_queue,
+            telemetry_to_estimator_queue,
+            router_to_command_queue,
+            router_to_telemetry_queue,
+            router_to_heartbeat_queue,
+            router_outbound_queue,
+        ]
+        if queue is not None
+    ] + [history]
+
+    # Stand-ins for the connection
+    sender_connection = mavlink_router.MavlinkSubscriber(None, router_outbound_queue)
+    receiver_connection = mavlink_router.MavlinkSubscriber(
+        router_to_heartbeat_queue, router_outbound_queue, worker_statistics
+    )
+    telemetry_connection = mavlink_router.MavlinkSubscriber(
+        router_to_telemetry_queue, router_outbound_queue, worker_statistics
+    )
+    command_connection = mavlink_router.MavlinkSubscriber(
+        router_to_command_queue, router_outbound_queue, worker_statistics
     )
 
     # Create worker properties for each worker type (what inputs it takes, how many workers)
+    # Router
+    result, router_properties = worker_manager.WorkerProperties.create(
+        1,  # Only 1 process may own the connection
+        mavlink_router_worker.mavlink_router_worker,  # What's the function that this worker runs
+        (
+            CONNECTION_STRING,
+            {
+                "HEARTBEAT": [router_to_heartbeat_queue],
+                "ATTITUDE": [router_to_telemetry_queue],
+                "LOCAL_POSITION_NED": [router_to_telemetry_queue],
+                "COMMAND_ACK": [router_to_command_queue],
+            },
+            router_statistics,
+            router_ready,
+        ),
+        [router_outbound_queue],
+        [],
+        controller,  # Worker controller
+        main_logger,  # Main logger to log any failures during worker creation
+        WORKER_START_METHOD,
+        WORKER_PRELOAD,
+    )
+    if not result:
+        print("Failed to create arguments for Router")
+        close_shared_memory(shared_memory)
+        return -1
+
     # Heartbeat sender
     result, sender_properties = worker_manager.WorkerProperties.create(
         HEARTBEAT_SENDER_WORKER_COUNT,  # How many workers
         heartbeat_sender_worker.heartbeat_sender_worker,  # What's the function that this worker runs
-        (connection,),
+        (sender_connection,),
         [],  # Note that input/output queues must be in the proper order
         [],
         controller,  # Worker controller
         main_logger,  # Main logger to log any failures during worker creation
+        WORKER_START_METHOD,
+        WORKER_PRELOAD,
     )
     if not result:
         print("Failed to create arguments for Sender")
+        close_shared_memory(shared_memory)
         return -1
 
     # Heartbeat receiver
     result, receiver_properties = worker_manager.WorkerProperties.create(
         HEARTBEAT_RECEIVER_WORKER_COUNT,  # How many workers
         heartbeat_receiver_worker.heartbeat_receiver_worker,  # What's the function that this worker runs
-        (connection,),
+        (receiver_connection,),
         [],  # Note that input/output queues must be in the proper order
         [heartbeat_to_main_queue],
         controller,  # Worker controller
         main_logger,  # Main logger to log any failures during worker creation
+        WORKER_START_METHOD,
+        WORKER_PRELOAD,
     )
     if not result:
         print("Failed to create arguments for Receiver")
+        close_shared_memory(shared_memory)
         return -1
 
     # Telemetry
     result, telemetry_properties = worker_manager.WorkerProperties.create(
         TELEMETRY_WORKER_COUNT,  # How many workers
         telemetry_worker.telemetry_worker,  # What's the function that this worker runs
-        (connection,),
+        (
+            telemetry_connection,
+            history,
+        ),
         [],  # Note that input/output queues must be in the proper order
-        [telemetry_to_command_queue],
+        [telemetry_output_queue],
         controller,  # Worker controller
         main_logger,  # Main logger to log any failures during worker creation
+        WORKER_START_METHOD,
+        WORKER_PRELOAD,
     )
     if not result:
         print("Failed to create arguments for Telemetry")
+        close_shared_memory(shared_memory)
         return -1
 
     # Command
@@ -152,28 +376,97 @@ def main() -> int:
         COMMAND_WORKER_COUNT,  # How many workers
         command_worker.command_worker,  # What's the function that this worker runs
         (
-            connection,
+            command_connection,
             TARGET,
+            history,
+            MISSION_PATH,
         ),
         [telemetry_to_command_queue],
         [command_to_main_queue],
         controller,  # Worker controller
         main_logger,  # Main logger to log any failures during worker creation
+        WORKER_START_METHOD,
+        WORKER_PRELOAD,
     )
     if not result:
         print("Failed to create arguments for Command")
+        close_shared_memory(shared_memory)
         return -1
 
+    # Decimator
+    decimator_properties = None
+    if USE_DECIMATOR:
+        result, command_decimator = telemetry_decimator.TelemetryDecimator.create(
+            telemetry_decimator.DecimationMode.MIN_INTERVAL,
+            main_logger,
+            min_interval=COMMAND_TELEMETRY_INTERVAL,
+        )
+        if not result:
+            print("Failed to create decimator for Command")
+            close_shared_memory(shared_memory)
+            return -1
+
+        result, decimator_properties = worker_manager.WorkerProperties.create(
+            1,  # Samples must be decimated in order
+            telemetry_decimator_worker.telemetry_decimator_worker,
+            ([(command_decimator, telemetry_to_command_queue)],),
+            [telemetry_to_decimator_queue],
+            [],
+            controller,  # Worker controller
+            main_logger,  # Main logger to log any failures during worker creation
+            WORKER_START_METHOD,
+            WORKER_PRELOAD,
+        )
+        if not result:
+            print("Failed to create arguments for Decimator")
+            close_shared_memory(shared_memory)
+            return -1
+
+    # Estimator
+    estimator_properties = None
+    if USE_ESTIMATOR:
+        result, estimator_properties = worker_manager.WorkerProperties.create(
+            1,  # Samples must be filtered in order
+            telemetry_estimator_worker.telemetry_estimator_worker,
+            (ESTIMATOR_OUTPUT_PERIOD,),
+            [telemetry_to_estimator_queue],
+            [estimator_output_queue],
+            controller,  # Worker controller
+            main_logger,  # Main logger to log any failures during worker creation
+            WORKER_START_METHOD,
+            WORKER_PRELOAD,
+        )
+        if not result:
+            print("Failed to create arguments for Estimator")
+            close_shared_memory(shared_memory)
+            return -1
+
     # Create the workers (processes) and obtain their managers
-    # sender manager
     worker_managers: list[worker_manager.WorkerManager] = []
 
+    # router manager
+    result, router_manager = worker_manager.WorkerManager.create(
+        worker_properties=router_properties,
+        local_logger=main_logger,
+    )
+    if not result:
+        print("Failed to create manager for Router")
+        close_shared_memory(shared_memory)
+        return -1
+
+    assert router_manager is not None
+
+    worker_managers.append(router_manager)
+
+    # sender manager
+
     result, sender_manager = worker_manager.WorkerManager.create(
         worker_properties=sender_properties,
         local_logger=main_logger,
     )
     if not result:
         print("Failed to create manager for Sender")
+        close_shared_memory(shared_memory)
         return -1
 
     assert sender_manager is not None
@@ -187,6 +480,7 @@ def main() -> int:
     )
     if not result:
         print("Failed to create manager for Receiver")
+        close_shared_memory(shared_memory)
         return -1
 
     assert receiver_manager is not None
@@ -200,6 +494,7 @@ def main() -> int:
     )
     if not result:
         print("Failed to create manager for Telemetry")
+        close_shared_memory(shared_memory)
         return -1
 
     assert telemetry_manager is not None
@@ -213,37 +508,137 @@ def main() -> int:
     )
     if not result:
         print("Failed to create manager for Command")
+        close_shared_memory(shared_memory)
         return -1
 
     assert command_manager is not None
 
     worker_managers.append(command_manager)
 
+    # decimator manager
+    if decimator_properties is not None:
+        result, decimator_manager = worker_manager.WorkerManager.create(
+            worker_properties=decimator_properties,
+            local_logger=main_logger,
+        )
+        if not result:
+            print("Failed to create manager for Decimator")
+            close_shared_memory(shared_memory)
+            return -1
+
+        assert decimator_manager is not None
+
+        worker_managers.append(decimator_manager)
+
+    # estimator manager
+    if estimator_properties is not None:
+        result, estimator_manager = worker_manager.WorkerManager.create(
+            worker_properties=estimator_properties,
+            local_logger=main_logger,
+        )
+        if not result:
+            print("Failed to create manager for Estimator")
+            close_shared_memory(shared_memory)
+            return -1
+
+        assert estimator_manager is not None
+
+        worker_managers.append(estimator_manager)
+
+    # Start the router first and hold back the other workers until the drone has connected
+    router_manager.start_workers()
+    connect_deadline = time.monotonic() + DRONE_CONNECT_TIMEOUT
+    while not router_ready.wait(0.1):
+        is_router_ended = router_manager.get_worker_exit_codes()[0] is not None
+        if is_router_ended or time.monotonic() >= connect_deadline:
+            main_logger.error("Drone did not connect", True)
+            controller.request_exit()
+            router_manager.join_workers()
+            close_shared_memory(shared_memory)
+            return -1
+
     # Start worker processes
-    for manager in worker_managers:
+    for manager in worker_managers[1:]:
         manager.start_workers()
 
+    # Restart any worker that dies so the rest of the pipeline does not starve
+    result, supervisor = worker_supervisor.WorkerSupervisor.create(
+        worker_managers,
+        controller,
+        main_logger,
+    )
+    if not result:
+        print("Failed to create worker supervisor")
+        controller.request_exit()
+        for manager in worker_managers:
+            manager.join_workers()
+        close_shared_memory(shared_memory)
+        return -1
+
+    assert supervisor is not None
+
+    supervisor.start()
+
     main_logger.info("Started")
 
     # Main's work: read from all queues that output to main, and log any commands that we make
     # Continue running for 100 seconds or until the drone disconnects
-    start_time = time.time()
-    while (time.time() - start_time) < 100:
-        if not heartbeat_to_main_queue.queue.empty():
-            if heartbeat_to_main_queue.queue.get_nowait() == "Disconnected":
-                break
-            main_logger.info(f"Heartbeat Status: {heartbeat_to_main_queue.queue.get_nowait()}")
-        if not command_to_main_queue.queue.empty():
-            main_logger.info(f"Command info: {command_to_main_queue.queue.get_nowait()}")
+    # Sleeps until a worker puts into one of the queues instead of polling them
+    main_queues = [heartbeat_to_main_queue, command_to_main_queue]
+    end_time = time.monotonic() + 100
+    statistics_log_time = time.monotonic() + STATISTICS_LOG_PERIOD
+    latency_recorder = command_report.LatencyRecorder()
+    is_disconnected = False
+    while not is_disconnected:
+        now = time.monotonic()
+        if now >= end_time:
+            break
+
+        if now >= statistics_log_time:
+            log_message_statistics(main_logger, router_statistics, worker_statistics)
+            log_command_latencies(main_logger, latency_recorder)
+            statistics_log_time += STATISTICS_LOG_PERIOD
+
+        result, index = queue_select.wait_any(main_queues, min(end_time, statistics_log_time) - now)
+        if not result:
+            continue
+
+        if main_queues[index] is heartbeat_to_main_queue:
+            for status in heartbeat_to_main_queue.get_many(HEARTBEAT_QUEUE_MAX_SIZE):
+                main_logger.info(f"Heartbeat Status: {status}")
+                if status == "Disconnected":
+                    is_disconnected = True
+        else:
+            for command_info in command_to_main_queue.get_many(COMMAND_QUEUE_MAX_SIZE):
+                main_logger.info(f"Command info: {command_info}")
+                if isinstance(command_info, command_report.CommandReport):
+                    latency_recorder.add(command_info)
 
     # Stop the processes
+    log_message_statistics(main_logger, router_statistics, worker_statistics)
+    log_command_latencies(main_logger, latency_recorder)
+    supervisor.stop()
+    main_logger.info(f"Worker restarts: {supervisor.get_restart_counts()}")
+    for manager in worker_managers:
+        main_logger.info(
+            f"Time to first loop of {manager.get_target_name()}: {manager.get_time_to_first_loop()} s"
+        )
     controller.request_exit()
     main_logger.info("Requested exit")
+    main_logger.info(f"Heartbeat statuses dropped: {heartbeat_to_main_queue.get_dropped_count()}")
 
     # Fill and drain queues from END TO START
     command_to_main_queue.fill_and_drain_queue()
     heartbeat_to_main_queue.fill_and_drain_queue()
     telemetry_to_command_queue.fill_and_drain_queue()
+    if telemetry_to_decimator_queue is not None:
+        telemetry_to_decimator_queue.fill_and_drain_queue()
+    if telemetry_to_estimator_queue is not None:
+        telemetry_to_estimator_queue.fill_and_drain_queue()
+    router_to_command_queue.fill_and_drain_queue()
+    router_to_telemetry_queue.fill_and_drain_queue()
+    router_to_heartbeat_queue.fill_and_drain_queue()
+    router_outbound_queue.fill_and_drain_queue()
     main_logger.info("Queues cleared")
 
     # Clean up worker processes
@@ -251,6 +646,9 @@ def main() -> int:
         manager.join_workers()
     main_logger.info("Stopped")
 
+    # Free shared memory now that no worker is using it
+    close_shared_memory(shared_memory)
+
     # We can reset controller in case we want to reuse it
     # Alternatively, create a new WorkerController instance
     controller.clear_exit()
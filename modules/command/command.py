@@ -3,11 +3,17 @@ Decision-making logic.
 """
 
 import math
+import time
 
 from pymavlink import mavutil
 
+from . import command_dispatcher
+from . import command_report
+from . import state_predictor
+from . import waypoint_mission
 from ..common.modules.logger import logger
 from ..telemetry import telemetry
+from ..telemetry import telemetry_history
 
 
 class Position:
@@ -32,18 +38,25 @@ class Command:  # pylint: disable=too-many-instance-attributes
 
     __private_key = object()
 
+    RECENT_VELOCITY_WINDOW = 10000  # ms
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        history: telemetry_history.TelemetryHistory | None = None,
+        mission: waypoint_mission.WaypointMission | None = None,
     ) -> "tuple [True, Command] | [False, None]":
         """
         Falliable create (instantiation) method to create a Command object.
+
+        history: Recent telemetry, None if not recorded.
+        mission: Waypoints to visit, which replace the target, None to only fly to the target.
         """
         return True, cls(
-            cls.__private_key, connection, target, local_logger
+            cls.__private_key, connection, target, local_logger, history, mission
         )  #  Create a Command object
 
     def __init__(
@@ -52,6 +65,8 @@ class Command:  # pylint: disable=too-many-instance-attributes
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        history: telemetry_history.TelemetryHistory | None,
+        mission: waypoint_mission.WaypointMission | None,
     ) -> None:
         assert key is Command.__private_key, "Use create() method"
 
@@ -59,6 +74,14 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self.local_logger = local_logger
         self.target = target
         self.connection = connection
+        self.history = history
+        self.mission = mission
+        if mission is not None:
+            self.target = Position(*mission.get_target())
+        # Suppresses commands that only repeat the last one sent
+        self.dispatcher = command_dispatcher.CommandDispatcher(connection)
+        # Compensates for the latency of the telemetry and the command
+        self.predictor = state_predictor.StatePredictor()
 
         self.max_angle = math.radians(5)
         self.altitude_tolerance = 0.5
@@ -68,10 +91,15 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self.vzi = 0
         self.times_received = 0
 
-    def run(self, data: telemetry.TelemetryData) -> "tuple[True, str] | tuple [False, None]":
+    def run(
+        self, data: telemetry.TelemetryData
+    ) -> "tuple[True, command_report.CommandReport] | tuple [False, None]":
         """
         Make a decision based on received telemetry data.
+        The report converts to the result string and traces the latency of the data.
         """
+        receive_time = time.monotonic()
+
         # Log average velocity for this trip so far
         self.vxi += data.x_velocity
         self.vyi += data.y_velocity
@@ -84,35 +112,52 @@ class Command:  # pylint: disable=too-many-instance-attributes
 
         self.local_logger.info(f"Average velocity: ({avg_vx}, {avg_vy}, {avg_vz}) m/s")
 
+        # Also log the average over the recent window if history is recorded
+        if self.history is not None and data.time_since_boot is not None:
+            recent = self.history.aggregate(
+                data.time_since_boot - self.RECENT_VELOCITY_WINDOW, data.time_since_boot
+            )
+            if recent is not None:
+                self.local_logger.info(
+                    f"Recent average velocity: ({recent.x_velocity}, {recent.y_velocity}, {recent.z_velocity}) m/s"
+                )
+
+        # Decide on where the drone will be when the command takes effect,
+        # not where it was when the telemetry was received
+        state, _ = self.predictor.predict(data, self.__send_latency())
+
+        # Move on to the next waypoint once the drone arrives
+        if self.mission is not None and None not in (state.x, state.y, state.z):
+            self.__advance_mission(state)
+
         # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
         # The appropriate commands to use are instructed below
 
         # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
         # String to return to main: "CHANGE_ALTITUDE: {amount you changed it by, delta height in meters}"
-        height_diff = self.target.z - data.z
-        if data.z is not None and abs(height_diff) > self.altitude_tolerance:
-            self.connection.mav.command_long_send(
-                1,
-                0,
-                mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
-                0,
-                1,
-                0,
-                0,
-                0,
-                0,
-                0,
-                self.target.z,
-            )
-            return True, f"CHANGE_ALTITUDE {height_diff:.2f}"
+        if state.z is not None:
+            height_diff = self.target.z - state.z
+            if abs(height_diff) > self.altitude_tolerance:
+                decision_time = time.monotonic()
+                if not self.dispatcher.send(
+                    mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
+                    (1, 0, 0, 0, 0, 0, self.target.z),
+                    errors=(height_diff,),
+                ):
+                    self.local_logger.debug("Altitude change suppressed as a repeat")
+                    return False, None
+
+                return True, self.__report(
+                    f"CHANGE_ALTITUDE {height_diff:.2f}", data, receive_time, decision_time
+                )
 
         # Adjust direction (yaw) using MAV_CMD_CONDITION_YAW (115). Must use relative angle to current state
         # String to return to main: "CHANGING_YAW: {degree you changed it by in range [-180, 180]}"
         # Positive angle is counter-clockwise as in a right handed system
-        if data.yaw is not None:
-            dx = self.target.x - data.x
-            dy = self.target.y - data.y
-            yaw_diff = (math.atan2(dy, dx) - data.yaw + math.pi) % (2 * math.pi) - math.pi
+        if state.yaw is not None:
+            dx = self.target.x - state.x
+            dy = self.target.y - state.y
+            yaw_diff = (math.atan2(dy, dx) - state.yaw + math.pi) % (2 * math.pi) - math.pi
 
             if abs(yaw_diff) > self.max_angle:
                 yaw_diff_deg = math.degrees(yaw_diff)
@@ -120,24 +165,68 @@ class Command:  # pylint: disable=too-many-instance-attributes
                     direction = -1
                 else:
                     direction = 1
-                self.connection.mav.command_long_send(
-                    1,
-                    0,
+                decision_time = time.monotonic()
+                if not self.dispatcher.send(
                     mavutil.mavlink.MAV_CMD_CONDITION_YAW,
-                    0,
-                    yaw_diff_deg,
-                    5,
-                    direction,
-                    1,
-                    0,
-                    0,
-                    0,
+                    (yaw_diff_deg, 5, direction, 1, 0, 0, 0),
+                ):
+                    self.local_logger.debug("Yaw change suppressed as a repeat")
+                    return False, None
+
+                return True, self.__report(
+                    f"CHANGING YAW {yaw_diff_deg:.2f}", data, receive_time, decision_time
                 )
-                return True, f"CHANGING YAW {yaw_diff_deg:.2f}"
 
         self.local_logger.error("Could not run command")
         return False, None
 
+    def __advance_mission(self, state: telemetry.TelemetryData) -> None:
+        """
+        Visits the waypoints the drone is at and updates the target.
+        """
+        if not self.mission.update(state.x, state.y, state.z):
+            return
+
+        waypoint = self.mission.get_target()
+        if waypoint is None:
+            # Hold at the last waypoint
+            self.local_logger.info("Mission complete")
+            return
+
+        self.target = Position(*waypoint)
+        self.local_logger.info(
+            f"Next waypoint: ({self.target.x}, {self.target.y}, {self.target.z}), "
+            f"{self.mission.get_remaining()} remaining"
+        )
+
+    def __send_latency(self) -> float:
+        """
+        Estimated time in seconds for a command to reach the drone,
+        half the average round trip time of acknowledged commands, 0 if none yet.
+        """
+        round_trip_times = self.dispatcher.get_round_trip_times()
+        if len(round_trip_times) == 0:
+            return 0.0
+
+        return sum(round_trip_times.values()) / len(round_trip_times) / 2
+
+    @staticmethod
+    def __report(
+        message: str, data: telemetry.TelemetryData, receive_time: float, decision_time: float
+    ) -> command_report.CommandReport:
+        """
+        Report of a command that has just been sent.
+        """
+        return command_report.CommandReport(
+            message,
+            data.sequence,
+            data.ingest_time,
+            data.publish_time,
+            receive_time,
+            decision_time,
+            time.monotonic(),
+        )
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -0,0 +1,302 @@
+"""
+Rate limiting and acknowledgement tracking of commands sent to the drone.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+
+DEFAULT_MIN_INTERVAL = 0.25  # seconds
+DEFAULT_REPEAT_INTERVAL = 5.0  # seconds
+DEFAULT_ACK_TIMEOUT = 1.0  # seconds
+# Off unless the autopilot is known to acknowledge commands, as without acknowledgements
+# every command would be retransmitted
+DEFAULT_MAX_RETRANSMITS = 0
+
+# Largest change of any parameter that is not worth sending again, by command
+DEFAULT_TOLERANCES = {
+    mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT: 0.5,  # m
+    mavutil.mavlink.MAV_CMD_CONDITION_YAW: 5.0,  # deg
+}
+
+# Parameter of CONDITION_YAW that is 1 for a relative angle and 0 for an absolute angle
+YAW_RELATIVE_PARAM_INDEX = 3
+
+# Weight of the newest round trip time in the smoothed round trip time
+ROUND_TRIP_TIME_WEIGHT = 0.125
+
+
+def is_idempotent(command: int, params: "tuple[float, ...]") -> bool:
+    """
+    Whether executing the command twice has the same effect as once, so it is safe to retransmit.
+    CHANGE_ALT sets an absolute altitude, while CONDITION_YAW is only absolute if not relative.
+    """
+    if command == mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT:
+        return True
+
+    if command == mavutil.mavlink.MAV_CMD_CONDITION_YAW:
+        return params[YAW_RELATIVE_PARAM_INDEX] == 0
+
+    return False
+
+
+class PendingCommand:
+    """
+    Command sent and not acknowledged yet.
+    """
+
+    __slots__ = ("params", "target_system", "target_component", "confirmation", "sent_time")
+
+    def __init__(
+        self,
+        params: "tuple[float, ...]",
+        target_system: int,
+        target_component: int,
+        sent_time: float,
+    ) -> None:
+        self.params = params
+        self.target_system = target_system
+        self.target_component = target_component
+        # Number of retransmits so far, sent as the confirmation field
+        self.confirmation = 0
+        self.sent_time = sent_time
+
+
+class CommandDispatcher:  # pylint: disable=too-many-instance-attributes
+    """
+    Sends COMMAND_LONG, suppressing commands that would only repeat the last one,
+    and tracks their COMMAND_ACK.
+
+    A command is suppressed if the same command was sent less than the minimum interval ago,
+    or if none of its parameters changed by more than the tolerance of the command
+    since it was last sent, until the repeat interval has passed.
+    Commands can be sent with the measured errors they correct, in which case they are
+    only suppressed while every error is being corrected, that is while it stays on the same
+    side of 0 and does not grow by more than the tolerance. This lets a command with constant
+    parameters, such as an absolute setpoint, be sent again once the drone overshoots.
+    Idempotent commands waiting for their acknowledgement are retransmitted with the confirmation
+    field incremented after each acknowledgement timeout, until they expire after the maximum
+    retransmits, and an unchanged command is not sent again at all in the meantime.
+    Other commands, such as a relative yaw that would turn twice, are never retransmitted
+    and expire after the first acknowledgement timeout.
+    """
+
+    def __init__(
+        self,
+        connection: mavutil.mavfile,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        repeat_interval: float = DEFAULT_REPEAT_INTERVAL,
+        tolerances: "dict[int, float] | None" = None,
+        ack_timeout: float = DEFAULT_ACK_TIMEOUT,
+        max_retransmits: int = DEFAULT_MAX_RETRANSMITS,
+    ) -> None:
+        """
+        connection: Connection to send on and receive COMMAND_ACK from.
+        min_interval: Minimum time in seconds between sends of the same command.
+        repeat_interval: Time in seconds after which an unchanged command is sent again.
+        tolerances: Largest change of any parameter that is suppressed, by command,
+            None for the defaults. Commands without a tolerance are only rate limited.
+        ack_timeout: Time in seconds to wait for an acknowledgement before retransmitting.
+        max_retransmits: Number of retransmits of an idempotent command before it expires,
+            0 to never retransmit.
+        """
+        assert 0.0 <= min_interval <= repeat_interval, "Intervals must be ordered"
+        assert ack_timeout > 0.0, "Acknowledgement timeout must be positive"
+        assert max_retransmits >= 0, "Retransmits must not be negative"
+
+        self.__connection = connection
+        self.__min_interval = min_interval
+        self.__repeat_interval = repeat_interval
+        self.__tolerances = DEFAULT_TOLERANCES if tolerances is None else tolerances
+        self.__ack_timeout = ack_timeout
+        self.__max_retransmits = max_retransmits
+
+        # Time, parameters and errors of the last send of each command
+        self.__last_sends: "dict[int, tuple[float, tuple[float, ...], tuple[float, ...]]]" = {}
+        # Pending commands by command ID, at most 1 of each as acknowledgements carry only the ID
+        self.__pending: "dict[int, PendingCommand]" = {}
+
+        self.__counts: "dict[str, dict[int, int]]" = {
+            "suppressed": {},
+            "retransmitted": {},
+            "expired": {},
+        }
+        self.__round_trip_times: "dict[int, float]" = {}
+        self.__ack_results: "dict[int, int]" = {}
+
+    def send(
+        self,
+        command: int,
+        params: "tuple[float, float, float, float, float, float, float]",
+        target_system: int = 1,
+        target_component: int = 0,
+        errors: "tuple[float, ...]" = (),
+    ) -> bool:
+        """
+        Sends the command unless it is suppressed.
+        Replaces any pending command with the same ID.
+
+        command: MAV_CMD of the command.
+        params: Parameters 1 to 7 of the command.
+        target_system: System to send to.
+        target_component: Component to send to.
+        errors: Measured errors the command corrects, such as the height difference
+            of an altitude change, empty to only compare the parameters.
+
+        Returns whether the command was sent.
+        """
+        now = time.monotonic()
+
+        last_send = self.__last_sends.get(command)
+        if last_send is not None and self.__is_repeat(command, params, errors, now, *last_send):
+            self.__count("suppressed", command)
+            return False
+
+        self.__connection.mav.command_long_send(
+            target_system, target_component, command, 0, *params
+        )
+        self.__last_sends[command] = (now, params, errors)
+        self.__pending[command] = PendingCommand(params, target_system, target_component, now)
+        return True
+
+    def update(self) -> None:
+        """
+        Receives the COMMAND_ACK messages already buffered, then retransmits or expires
+        the pending commands whose acknowledgement timed out.
+        Call regularly, other received messages are discarded.
+        """
+        now = time.monotonic()
+
+        message = self.__connection.recv_msg()
+        while message is not None:
+            if message.get_type() == "COMMAND_ACK":
+                self.__acknowledge(message, now)
+
+            message = self.__connection.recv_msg()
+
+        for command, pending in list(self.__pending.items()):
+            if now - pending.sent_time < self.__ack_timeout:
+                continue
+
+            if pending.confirmation >= self.__max_retransmits or not is_idempotent(
+                command, pending.params
+            ):
+                del self.__pending[command]
+                self.__count("expired", command)
+                continue
+
+            pending.confirmation += 1
+            pending.sent_time = now
+            self.__connection.mav.command_long_send(
+                pending.target_system,
+                pending.target_component,
+                command,
+                pending.confirmation,
+                *pending.params,
+            )
+            self.__count("retransmitted", command)
+
+    def get_pending_count(self) -> int:
+        """
+        Number of commands waiting for their acknowledgement.
+        """
+        return len(self.__pending)
+
+    def get_suppressed_counts(self) -> "dict[int, int]":
+        """
+        Number of suppressed sends of each command.
+        """
+        return dict(self.__counts["suppressed"])
+
+    def get_retransmit_counts(self) -> "dict[int, int]":
+        """
+        Number of retransmits of each command.
+        """
+        return dict(self.__counts["retransmitted"])
+
+    def get_expired_counts(self) -> "dict[int, int]":
+        """
+        Number of sends of each command that were never acknowledged.
+        """
+        return dict(self.__counts["expired"])
+
+    def get_round_trip_times(self) -> "dict[int, float]":
+        """
+        Smoothed round trip time in seconds of each acknowledged command.
+        Only acknowledgements of commands that were not retransmitted are measured,
+        as it is unknown which transmission the others acknowledge.
+        """
+        return dict(self.__round_trip_times)
+
+    def get_ack_results(self) -> "dict[int, int]":
+        """
+        MAV_RESULT of the last acknowledgement of each command.
+        """
+        return dict(self.__ack_results)
+
+    def __is_repeat(
+        self,
+        command: int,
+        params: "tuple[float, ...]",
+        errors: "tuple[float, ...]",
+        now: float,
+        last_time: float,
+        last_params: "tuple[float, ...]",
+        last_errors: "tuple[float, ...]",
+    ) -> bool:
+        """
+        Whether the command would only repeat its last send.
+        """
+        elapsed = now - last_time
+        if elapsed < self.__min_interval:
+            return True
+
+        tolerance = self.__tolerances.get(command)
+        if tolerance is None:
+            return False
+
+        is_unchanged = all(
+            abs(param - last_param) <= tolerance for param, last_param in zip(params, last_params)
+        ) and all(
+            error * last_error > 0.0 and abs(error) <= abs(last_error) + tolerance
+            for error, last_error in zip(errors, last_errors)
+        )
+
+        # Retransmits take care of an unchanged pending command
+        if (
+            command in self.__pending
+            and self.__max_retransmits > 0
+            and is_idempotent(command, params)
+        ):
+            return is_unchanged
+
+        return is_unchanged and elapsed < self.__repeat_interval
+
+    def __acknowledge(
+        self, message: "mavutil.mavlink.MAVLink_command_ack_message", now: float
+    ) -> None:
+        """
+        Completes the pending command that the acknowledgement is for.
+        """
+        pending = self.__pending.pop(message.command, None)
+        if pending is None:
+            return
+
+        self.__ack_results[message.command] = message.result
+
+        if pending.confirmation > 0:
+            return
+
+        round_trip_time = now - pending.sent_time
+        smoothed = self.__round_trip_times.get(message.command, round_trip_time)
+        self.__round_trip_times[message.command] = smoothed + ROUND_TRIP_TIME_WEIGHT * (
+            round_trip_time - smoothed
+        )
+
+    def __count(self, name: str, command: int) -> None:
+        """
+        Increments the count of the command.
+        """
+        counts = self.__counts[name]
+        counts[command] = counts.get(command, 0) + 1
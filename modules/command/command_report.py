@@ -0,0 +1,146 @@
+"""
+Command results traced back to the telemetry that caused them.
+"""
+
+import collections
+import math
+import time
+
+
+# Stages of the pipeline in order, from the telemetry worker receiving the newest message
+# of a sample to main receiving the result of the command it caused
+STAGES = ("parse", "queue_wait", "decision", "send", "report")
+TOTAL = "total"
+
+DEFAULT_LATENCY_CAPACITY = 1000  # reports
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+
+class CommandReport:
+    """
+    Result of a command, which is the result string when converted with str().
+
+    Carries the trace of the telemetry sample that caused it, in monotonic seconds.
+    Trace times are None if unknown.
+    """
+
+    __slots__ = (
+        "message",
+        "sequence",
+        "ingest_time",
+        "publish_time",
+        "receive_time",
+        "decision_time",
+        "sent_time",
+    )
+
+    def __init__(
+        self,
+        message: str,
+        sequence: "int | None" = None,
+        ingest_time: "float | None" = None,
+        publish_time: "float | None" = None,
+        receive_time: "float | None" = None,
+        decision_time: "float | None" = None,
+        sent_time: "float | None" = None,
+    ) -> None:
+        """
+        message: Result string.
+        sequence: Sequence number of the telemetry sample.
+        ingest_time: When the telemetry worker received the newest message of the sample.
+        publish_time: When the telemetry worker output the sample.
+        receive_time: When the command worker started deciding on the sample.
+        decision_time: When the command was about to be sent.
+        sent_time: When the command send returned.
+        """
+        self.message = message
+        self.sequence = sequence
+        self.ingest_time = ingest_time
+        self.publish_time = publish_time
+        self.receive_time = receive_time
+        self.decision_time = decision_time
+        self.sent_time = sent_time
+
+    def __str__(self) -> str:
+        return self.message
+
+    def stage_latencies(self, arrival_time: float) -> "dict[str, float] | None":
+        """
+        Time spent in each stage and in total in seconds.
+
+        arrival_time: When main received the report.
+
+        Returns None if any trace time is unknown.
+        """
+        times = (
+            self.ingest_time,
+            self.publish_time,
+            self.receive_time,
+            self.decision_time,
+            self.sent_time,
+            arrival_time,
+        )
+        if None in times:
+            return None
+
+        latencies = {stage: times[i + 1] - times[i] for i, stage in enumerate(STAGES)}
+        latencies[TOTAL] = arrival_time - self.ingest_time
+        return latencies
+
+
+class LatencyRecorder:
+    """
+    Keeps the stage latencies of the most recent reports for percentiles.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_LATENCY_CAPACITY) -> None:
+        """
+        capacity: Number of most recent reports kept.
+        """
+        self.__latencies = {
+            stage: collections.deque(maxlen=capacity) for stage in STAGES + (TOTAL,)
+        }
+
+    def add(self, report: CommandReport, arrival_time: "float | None" = None) -> bool:
+        """
+        Records the latencies of the report.
+
+        arrival_time: When main received the report in monotonic seconds, None for now.
+
+        Returns False if the report is not fully traced, in which case it is not recorded.
+        """
+        if arrival_time is None:
+            arrival_time = time.monotonic()
+
+        latencies = report.stage_latencies(arrival_time)
+        if latencies is None:
+            return False
+
+        for stage, latency in latencies.items():
+            self.__latencies[stage].append(latency)
+
+        return True
+
+    def percentiles(
+        self, percentiles: "tuple[float, ...]" = DEFAULT_PERCENTILES
+    ) -> "dict[str, list[float]]":
+        """
+        Nearest rank percentiles of each stage and the total in seconds.
+
+        percentiles: Percentiles to compute, in (0, 100].
+
+        Returns the percentiles of each stage, empty lists if nothing has been recorded.
+        """
+        result = {}
+        for stage, latencies in self.__latencies.items():
+            ordered = sorted(latencies)
+            if len(ordered) == 0:
+                result[stage] = []
+                continue
+
+            result[stage] = [
+                ordered[max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)]
+                for percentile in percentiles
+            ]
+
+        return result
@@ -7,32 +7,45 @@ import pathlib
 
 from pymavlink import mavutil
 
+from utilities.workers import latest_value_channel
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import command
+from . import waypoint_mission
+from ..telemetry import telemetry_history
 from ..common.modules.logger import logger
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+TELEMETRY_BATCH_SIZE = 10
+TELEMETRY_BATCH_WAIT = 0.1  # seconds
+OUTPUT_WAIT = 1.0  # seconds
+MISSION_ARRIVAL_RADIUS = 1.0  # m
+
+
 def command_worker(
     connection: mavutil.mavfile,
     target: command.Position,
+    history: telemetry_history.TelemetryHistory | None,
+    mission_path: str | None,
+    telemetry_queue: (
+        queue_proxy_wrapper.QueueProxyWrapper | latest_value_channel.LatestValueChannel
+    ),
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
-    local_logger: logger.Logger,
     controller: worker_controller.WorkerController,
-    telemetry_queue: queue_proxy_wrapper.QueueProxyWrapper,
 ) -> None:
     """
     Worker process.
 
     connection: Connection to Drone using MavLink
     target: current position of drone
-    output_queue: queue of things to send to main
-    local_logger: instance of logger class that writes in logs files
+    history: history store recorded by telemetry worker, None if not recorded
+    mission_path: CSV file of waypoints to visit instead of the target, None to only fly to the target
+    telemetry_queue: queue or latest value channel from telemetry worker
+    output_queue: queue of things to send to main, waited on until reports fit
     controller: Controls interactivity of workers
-    telemetry_queue: queue from telemetry worker
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -54,8 +67,19 @@ def command_worker(
     # =============================================================================================
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
+    mission = None
+    if mission_path is not None:
+        result, mission = waypoint_mission.WaypointMission.load(
+            mission_path, MISSION_ARRIVAL_RADIUS
+        )
+        if not result:
+            local_logger.error(f"Could not load mission {mission_path}")
+            return
+
     # Instantiate class object (command.Command)
-    value, command_object = command.Command.create(connection, target, local_logger)
+    value, command_object = command.Command.create(
+        connection, target, local_logger, history, mission
+    )
 
     if not value:
         local_logger.error("Could not create command instance")
@@ -64,13 +88,36 @@ def command_worker(
         while not controller.is_exit_requested():
             controller.check_pause()
 
-            data = telemetry_queue.queue.get()
-            if data is not None:
+            # Match acknowledgements and retransmit unacknowledged commands
+            command_object.dispatcher.update()
+
+            # Take every sample already waiting in one transfer
+            batch = telemetry_queue.get_many(TELEMETRY_BATCH_SIZE, TELEMETRY_BATCH_WAIT)
+
+            changes = []
+            for data in batch:
+                # Skip sentinels
+                if data is None:
+                    continue
+
                 local_logger.info("Received telemetry data")
 
-            result, change = command_object.run(data)
-            if result and data is not None:
-                output_queue.queue.put(change)
+                result, change = command_object.run(data)
+                if result:
+                    changes.append(change)
+
+            # Reports are lossless, so wait for space, checking for exit in between
+            while len(changes) > 0 and not controller.is_exit_requested():
+                count = output_queue.put_many(changes, OUTPUT_WAIT)
+                if count < len(changes):
+                    local_logger.warning("Output queue full, waiting to put reports")
+                changes = changes[count:]
+
+        dispatcher = command_object.dispatcher
+        local_logger.info(f"Suppressed commands: {dispatcher.get_suppressed_counts()}")
+        local_logger.info(f"Retransmitted commands: {dispatcher.get_retransmit_counts()}")
+        local_logger.info(f"Expired commands: {dispatcher.get_expired_counts()}")
+        local_logger.info(f"Command round trip times: {dispatcher.get_round_trip_times()} s")
 
 
 # =================================================================================================
@@ -0,0 +1,356 @@
+"""
+Offline batch simulation of the Command decision logic.
+
+Run as a module to sweep the altitude tolerance and maximum angle:
+python -m modules.command.policy_simulator
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+from pymavlink import mavutil
+
+from . import command_dispatcher
+
+
+# Vehicle response to the commands Command sends, as in the mock command drone
+CLIMB_RATE = 1.0  # m/s
+TURN_RATE = math.radians(5)  # rad/s
+
+DEFAULT_ALTITUDE_TOLERANCE = 0.5  # m
+DEFAULT_MAX_ANGLE = math.radians(5)
+DEFAULT_DURATION = 120.0  # seconds
+DEFAULT_TELEMETRY_PERIOD = 0.5  # seconds
+
+# Indices of the state columns
+X, Y, Z, YAW = range(4)
+
+
+class SimulationResult:
+    """
+    Metrics of each simulated trajectory.
+    """
+
+    __slots__ = ("convergence_times", "command_counts", "reversal_counts")
+
+    def __init__(
+        self, convergence_times: np.ndarray, command_counts: np.ndarray, reversal_counts: np.ndarray
+    ) -> None:
+        """
+        convergence_times: Time in seconds from which the drone stayed within both tolerances
+            until the end, NaN if it was not within them at the end.
+        command_counts: Number of commands sent.
+        reversal_counts: Number of commands that reversed the direction of the previous
+            command of the same kind, a measure of oscillation.
+        """
+        self.convergence_times = convergence_times
+        self.command_counts = command_counts
+        self.reversal_counts = reversal_counts
+
+    def summary(self) -> "dict[str, float]":
+        """
+        Fraction converged, median convergence time of those converged,
+        and mean command and reversal counts.
+        """
+        converged = ~np.isnan(self.convergence_times)
+        return {
+            "converged": float(np.mean(converged)),
+            "convergence_time": (
+                float(np.median(self.convergence_times[converged])) if converged.any() else math.nan
+            ),
+            "commands": float(np.mean(self.command_counts)),
+            "reversals": float(np.mean(self.reversal_counts)),
+        }
+
+
+def random_trajectories(
+    count: int,
+    generator: np.random.Generator,
+    area: float = 50.0,
+    max_altitude: float = 50.0,
+    max_drift: float = 0.0,
+) -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Random starting states and drift velocities.
+
+    count: Number of trajectories.
+    generator: Source of randomness.
+    area: Side in metres of the square the starting positions are in, centred on the origin.
+    max_altitude: Highest starting altitude in metres.
+    max_drift: Largest horizontal drift speed in m/s in either axis, such as from wind.
+
+    Returns the starting states of x, y, z, yaw, and the velocities of x, y, z.
+    """
+    states = np.empty((count, 4))
+    states[:, X] = generator.uniform(-area / 2, area / 2, count)
+    states[:, Y] = generator.uniform(-area / 2, area / 2, count)
+    states[:, Z] = generator.uniform(0.0, max_altitude, count)
+    states[:, YAW] = generator.uniform(-math.pi, math.pi, count)
+
+    velocities = np.zeros((count, 3))
+    velocities[:, :2] = generator.uniform(-max_drift, max_drift, (count, 2))
+    return states, velocities
+
+
+def simulate(
+    states: np.ndarray,
+    velocities: np.ndarray,
+    target: "tuple[float, float, float]",
+    generator: np.random.Generator,
+    altitude_tolerance: "float | np.ndarray" = DEFAULT_ALTITUDE_TOLERANCE,
+    max_angle: "float | np.ndarray" = DEFAULT_MAX_ANGLE,
+    duration: float = DEFAULT_DURATION,
+    telemetry_period: float = DEFAULT_TELEMETRY_PERIOD,
+    noise: "tuple[float, float]" = (0.0, 0.0),
+) -> SimulationResult:
+    """
+    Runs the decision logic of Command on every trajectory at once, one step per telemetry sample.
+
+    Each step the drone decides on noisy telemetry exactly as Command.run does,
+    changing altitude first and otherwise yaw, with sends suppressed as the default
+    CommandDispatcher would. Commands are assumed to be acknowledged immediately.
+    The drone climbs towards the last altitude sent and turns by the last relative yaw sent
+    at the rates of the mock drone, while drifting at its constant velocity.
+
+    states: Starting x, y, z in metres and yaw in radians of each trajectory, not modified.
+    velocities: Drift velocity of x, y, z in m/s of each trajectory.
+    target: Position Command flies to.
+    generator: Source of telemetry noise.
+    altitude_tolerance: Tolerance in metres, for all trajectories or each trajectory.
+    max_angle: Tolerance of yaw in radians, for all trajectories or each trajectory.
+    duration: Simulated time in seconds.
+    telemetry_period: Time in seconds between telemetry samples.
+    noise: Standard deviation of the telemetry position in metres and yaw in radians.
+    """
+    count = len(states)
+    states = states.copy()
+    altitude_tolerance = np.broadcast_to(altitude_tolerance, (count,))
+    max_angle = np.broadcast_to(max_angle, (count,))
+    target_x, target_y, target_z = target
+
+    # Setpoints the drone is flying to, the current state until commanded
+    altitude_setpoints = states[:, Z].copy()
+    yaw_setpoints = states[:, YAW].copy()
+
+    # Last send of each command, as tracked by the dispatcher
+    last_send_times = np.full((2, count), -math.inf)
+    last_params = np.full((2, count, 7), math.nan)
+    # Errors sent with each command, only altitude is sent with its height difference
+    last_errors = np.full((2, count), math.nan)
+    no_errors = np.full(count, math.nan)
+    last_signs = np.zeros((2, count))
+    tolerances = [
+        command_dispatcher.DEFAULT_TOLERANCES[mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT],
+        command_dispatcher.DEFAULT_TOLERANCES[mavutil.mavlink.MAV_CMD_CONDITION_YAW],
+    ]
+
+    command_counts = np.zeros(count, np.int64)
+    reversal_counts = np.zeros(count, np.int64)
+    converged_since = np.full(count, math.nan)
+    params = np.zeros((count, 7))
+
+    for step in range(int(duration / telemetry_period)):
+        now = step * telemetry_period
+
+        # Telemetry
+        measured = states + generator.normal(0.0, 1.0, states.shape) * (
+            noise[0],
+            noise[0],
+            noise[0],
+            noise[1],
+        )
+        height_diffs = target_z - measured[:, Z]
+        yaw_diffs = wrap_angles(
+            np.arctan2(target_y - measured[:, Y], target_x - measured[:, X]) - measured[:, YAW]
+        )
+
+        # Decision, altitude takes priority even when its send is suppressed
+        wants_altitude = np.abs(height_diffs) > altitude_tolerance
+        wants_yaw = ~wants_altitude & (np.abs(yaw_diffs) > max_angle)
+
+        params[:] = 0.0
+        params[:, 0] = 1.0
+        params[:, 6] = target_z
+        sent_altitude = dispatch(
+            wants_altitude,
+            params,
+            height_diffs,
+            now,
+            0,
+            last_send_times,
+            last_params,
+            last_errors,
+            tolerances[0],
+        )
+
+        yaw_degrees = np.degrees(yaw_diffs)
+        params[:] = 0.0
+        params[:, 0] = yaw_degrees
+        params[:, 1] = math.degrees(TURN_RATE)
+        params[:, 2] = np.where(yaw_degrees >= 0, -1.0, 1.0)
+        params[:, 3] = 1.0
+        sent_yaw = dispatch(
+            wants_yaw,
+            params,
+            no_errors,
+            now,
+            1,
+            last_send_times,
+            last_params,
+            last_errors,
+            tolerances[1],
+        )
+
+        altitude_setpoints[sent_altitude] = target_z
+        yaw_setpoints[sent_yaw] = states[sent_yaw, YAW] + yaw_diffs[sent_yaw]
+
+        command_counts += sent_altitude
+        command_counts += sent_yaw
+        for kind, sent, diffs in ((0, sent_altitude, height_diffs), (1, sent_yaw, yaw_diffs)):
+            signs = np.sign(diffs)
+            reversal_counts += sent & (last_signs[kind] * signs < 0)
+            last_signs[kind] = np.where(sent, signs, last_signs[kind])
+
+        # Convergence of the true state
+        within = (np.abs(target_z - states[:, Z]) <= altitude_tolerance) & (
+            np.abs(
+                wrap_angles(
+                    np.arctan2(target_y - states[:, Y], target_x - states[:, X]) - states[:, YAW]
+                )
+            )
+            <= max_angle
+        )
+        converged_since = np.where(
+            within, np.where(np.isnan(converged_since), now, converged_since), math.nan
+        )
+
+        # Vehicle response until the next sample
+        climb = CLIMB_RATE * telemetry_period
+        states[:, Z] += np.clip(altitude_setpoints - states[:, Z], -climb, climb)
+        turn = TURN_RATE * telemetry_period
+        yaw_errors = yaw_setpoints - states[:, YAW]
+        states[:, YAW] = wrap_angles(states[:, YAW] + np.clip(yaw_errors, -turn, turn))
+        yaw_setpoints = states[:, YAW] + yaw_errors - np.clip(yaw_errors, -turn, turn)
+        states[:, :3] += velocities * telemetry_period
+
+    return SimulationResult(converged_since, command_counts, reversal_counts)
+
+
+def sweep(
+    altitude_tolerances: "list[float]",
+    max_angles: "list[float]",
+    states: np.ndarray,
+    velocities: np.ndarray,
+    target: "tuple[float, float, float]",
+    generator: np.random.Generator,
+    **kwargs: object,
+) -> "dict[tuple[float, float], dict[str, float]]":
+    """
+    Simulates every combination of the tolerances over the same trajectories in one batch.
+
+    altitude_tolerances: Altitude tolerances in metres.
+    max_angles: Maximum angles in radians.
+    kwargs: Other arguments of simulate().
+
+    Returns the summary of each combination of altitude tolerance and maximum angle.
+    """
+    combinations = list(itertools.product(altitude_tolerances, max_angles))
+    count = len(states)
+
+    result = simulate(
+        np.tile(states, (len(combinations), 1)),
+        np.tile(velocities, (len(combinations), 1)),
+        target,
+        generator,
+        np.repeat([altitude_tolerance for altitude_tolerance, _ in combinations], count),
+        np.repeat([max_angle for _, max_angle in combinations], count),
+        **kwargs,
+    )
+
+    summaries = {}
+    for i, combination in enumerate(combinations):
+        trajectories = slice(i * count, (i + 1) * count)
+        summaries[combination] = SimulationResult(
+            result.convergence_times[trajectories],
+            result.command_counts[trajectories],
+            result.reversal_counts[trajectories],
+        ).summary()
+
+    return summaries
+
+
+def wrap_angles(angles: np.ndarray) -> np.ndarray:
+    """
+    Wraps angles in radians to [-pi, pi).
+    """
+    return (angles + math.pi) % (2 * math.pi) - math.pi
+
+
+def dispatch(
+    wanted: np.ndarray,
+    params: np.ndarray,
+    errors: np.ndarray,
+    now: float,
+    kind: int,
+    last_send_times: np.ndarray,
+    last_params: np.ndarray,
+    last_errors: np.ndarray,
+    tolerance: float,
+) -> np.ndarray:
+    """
+    Applies the default CommandDispatcher suppression to the wanted sends of one command.
+    Errors are NaN for a command sent without its error.
+
+    Returns which trajectories sent, and records those sends.
+    """
+    elapsed = now - last_send_times[kind]
+    corrected = np.isnan(errors) | (
+        (errors * last_errors[kind] > 0.0)
+        & (np.abs(errors) <= np.abs(last_errors[kind]) + tolerance)
+    )
+    unchanged = np.all(np.abs(params - last_params[kind]) <= tolerance, axis=1) & corrected
+    repeat = (elapsed < command_dispatcher.DEFAULT_MIN_INTERVAL) | (
+        unchanged & (elapsed < command_dispatcher.DEFAULT_REPEAT_INTERVAL)
+    )
+
+    sent = wanted & ~repeat
+    last_send_times[kind, sent] = now
+    last_params[kind, sent] = params[sent]
+    last_errors[kind, sent] = errors[sent]
+    return sent
+
+
+def main() -> int:
+    """
+    Sweeps the tolerances over random trajectories and prints the summaries.
+    """
+    generator = np.random.default_rng(0)
+    states, velocities = random_trajectories(1000, generator, max_drift=0.2)
+
+    summaries = sweep(
+        [0.25, 0.5, 1.0],
+        [math.radians(angle) for angle in (2, 5, 10)],
+        states,
+        velocities,
+        (10.0, 20.0, 30.0),
+        generator,
+        noise=(0.1, math.radians(1)),
+    )
+
+    print("altitude_tolerance max_angle converged convergence_time commands reversals")
+    for (altitude_tolerance, max_angle), summary in summaries.items():
+        print(
+            f"{altitude_tolerance:18.2f} {math.degrees(max_angle):9.1f} "
+            f"{summary['converged']:9.2f} {summary['convergence_time']:16.1f} "
+            f"{summary['commands']:8.1f} {summary['reversals']:9.1f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
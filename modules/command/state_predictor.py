@@ -0,0 +1,74 @@
+"""
+Prediction of the current state of the drone from delayed telemetry.
+"""
+
+import math
+import time
+
+from ..telemetry import telemetry
+
+
+DEFAULT_MAX_HORIZON = 1.0  # seconds
+
+
+class StatePredictor:
+    """
+    Extrapolates telemetry to the time a command takes effect, assuming constant velocity
+    and angular rates.
+
+    The horizon is the age of the sample since the telemetry worker received it,
+    or since its state time if it was already propagated, such as an estimate,
+    plus any latency until the command reaches the drone, up to the maximum horizon.
+    Samples without an ingest or state time are not extrapolated.
+    """
+
+    def __init__(self, max_horizon: float = DEFAULT_MAX_HORIZON) -> None:
+        """
+        max_horizon: Longest time in seconds to extrapolate, as constant rates drift.
+        """
+        assert max_horizon >= 0.0, "Horizon must not be negative"
+
+        self.__max_horizon = max_horizon
+
+    def predict(
+        self, data: telemetry.TelemetryData, send_latency: float = 0.0
+    ) -> "tuple[telemetry.TelemetryData, float]":
+        """
+        Predicts the state at the time a command sent now would take effect.
+
+        data: Sample to extrapolate from.
+        send_latency: Time in seconds for a command to reach the drone.
+
+        Returns a copy of the sample extrapolated, and the horizon in seconds.
+        Fields without a rate are copied unchanged.
+        """
+        predicted = telemetry.TelemetryData(*(getattr(data, name) for name in data.__slots__))
+        state_time = data.ingest_time if data.state_time is None else data.state_time
+        if state_time is None:
+            return predicted, 0.0
+
+        horizon = min(time.monotonic() - state_time + send_latency, self.__max_horizon)
+        horizon = max(horizon, 0.0)
+
+        for name, rate_name in (
+            ("x", "x_velocity"),
+            ("y", "y_velocity"),
+            ("z", "z_velocity"),
+        ):
+            value = getattr(data, name)
+            rate = getattr(data, rate_name)
+            if value is not None and rate is not None:
+                setattr(predicted, name, value + rate * horizon)
+
+        for name, rate_name in (
+            ("roll", "roll_speed"),
+            ("pitch", "pitch_speed"),
+            ("yaw", "yaw_speed"),
+        ):
+            value = getattr(data, name)
+            rate = getattr(data, rate_name)
+            if value is not None and rate is not None:
+                angle = value + rate * horizon
+                setattr(predicted, name, (angle + math.pi) % (2 * math.pi) - math.pi)
+
+        return predicted, horizon
@@ -0,0 +1,256 @@
+"""
+Missions of many waypoints, visited in order of proximity.
+"""
+
+import csv
+import math
+
+
+class WaypointIndex:  # pylint: disable=too-many-instance-attributes
+    """
+    KD-tree of waypoints that supports removing visited waypoints.
+
+    Each node is a waypoint, split on x, y and z in turn.
+    Nodes count the waypoints left in their subtree so that searches skip visited subtrees,
+    keeping lookups O(log n) on average as the mission progresses.
+    """
+
+    def __init__(self, waypoints: "list[tuple[float, float, float]]") -> None:
+        """
+        waypoints: Positions in metres, indexed by their position in the list.
+        """
+        count = len(waypoints)
+        self.__waypoints = waypoints
+        self.__axes = [0] * count
+        self.__lefts = [-1] * count
+        self.__rights = [-1] * count
+        self.__parents = [-1] * count
+        self.__remaining = [0] * count
+        self.__visited = [False] * count
+
+        self.__root = self.__build(list(range(count)), 0, -1)
+
+    def __len__(self) -> int:
+        """
+        Number of waypoints not visited yet.
+        """
+        if self.__root == -1:
+            return 0
+
+        return self.__remaining[self.__root]
+
+    def is_visited(self, index: int) -> bool:
+        """
+        Whether the waypoint has been removed.
+        """
+        return self.__visited[index]
+
+    def remove(self, index: int) -> None:
+        """
+        Marks the waypoint as visited, excluding it from searches.
+        """
+        if self.__visited[index]:
+            return
+
+        self.__visited[index] = True
+        node = index
+        while node != -1:
+            self.__remaining[node] -= 1
+            node = self.__parents[node]
+
+    def nearest(self, position: "tuple[float, float, float]") -> "int | None":
+        """
+        Index of the nearest waypoint not visited yet, None if all are visited.
+        """
+        best = [None, math.inf]
+        self.__nearest(self.__root, position, best)
+        return best[0]
+
+    def within(self, position: "tuple[float, float, float]", radius: float) -> "list[int]":
+        """
+        Indices of the waypoints not visited yet within the radius in metres.
+        """
+        indices = []
+        self.__within(self.__root, position, radius * radius, indices)
+        return indices
+
+    def __build(self, indices: "list[int]", depth: int, parent: int) -> int:
+        """
+        Builds the subtree of the waypoints by splitting at the median.
+
+        Returns the root of the subtree, -1 if empty.
+        """
+        if len(indices) == 0:
+            return -1
+
+        axis = depth % 3
+        indices.sort(key=lambda index: self.__waypoints[index][axis])
+        median = len(indices) // 2
+        node = indices[median]
+
+        self.__axes[node] = axis
+        self.__parents[node] = parent
+        self.__remaining[node] = len(indices)
+        self.__lefts[node] = self.__build(indices[:median], depth + 1, node)
+        self.__rights[node] = self.__build(indices[median + 1 :], depth + 1, node)
+        return node
+
+    def __distance_squared(self, index: int, position: "tuple[float, float, float]") -> float:
+        """
+        Squared distance from the waypoint to the position.
+        """
+        waypoint = self.__waypoints[index]
+        return (
+            (waypoint[0] - position[0]) ** 2
+            + (waypoint[1] - position[1]) ** 2
+            + (waypoint[2] - position[2]) ** 2
+        )
+
+    def __nearest(
+        self, node: int, position: "tuple[float, float, float]", best: "list[int | float | None]"
+    ) -> None:
+        """
+        Updates the best index and squared distance with the subtree.
+        """
+        if node == -1 or self.__remaining[node] == 0:
+            return
+
+        if not self.__visited[node]:
+            distance_squared = self.__distance_squared(node, position)
+            if distance_squared < best[1]:
+                best[0] = node
+                best[1] = distance_squared
+
+        axis = self.__axes[node]
+        offset = position[axis] - self.__waypoints[node][axis]
+        if offset < 0:
+            near, far = self.__lefts[node], self.__rights[node]
+        else:
+            near, far = self.__rights[node], self.__lefts[node]
+
+        self.__nearest(near, position, best)
+        # The other side can only be closer if the splitting plane is
+        if offset * offset < best[1]:
+            self.__nearest(far, position, best)
+
+    def __within(
+        self,
+        node: int,
+        position: "tuple[float, float, float]",
+        radius_squared: float,
+        indices: "list[int]",
+    ) -> None:
+        """
+        Appends the indices in the subtree within the radius.
+        """
+        if node == -1 or self.__remaining[node] == 0:
+            return
+
+        if not self.__visited[node] and self.__distance_squared(node, position) <= radius_squared:
+            indices.append(node)
+
+        axis = self.__axes[node]
+        offset = position[axis] - self.__waypoints[node][axis]
+        if offset <= 0 or offset * offset <= radius_squared:
+            self.__within(self.__lefts[node], position, radius_squared, indices)
+        if offset >= 0 or offset * offset <= radius_squared:
+            self.__within(self.__rights[node], position, radius_squared, indices)
+
+
+class WaypointMission:
+    """
+    Active target of a mission, advanced as the drone arrives at waypoints.
+
+    The mission starts at the first waypoint. Every waypoint the drone comes within
+    the arrival radius of is visited, and once the active target is visited
+    the nearest waypoint not visited yet becomes the target.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls, waypoints: "list[tuple[float, float, float]]", arrival_radius: float
+    ) -> "tuple[True, WaypointMission] | tuple[False, None]":
+        """
+        waypoints: Positions in metres in the local frame, starting with the first target.
+        arrival_radius: Distance in metres from a waypoint at which it is visited.
+        """
+        if len(waypoints) == 0 or arrival_radius <= 0.0:
+            return False, None
+
+        return True, WaypointMission(cls.__create_key, waypoints, arrival_radius)
+
+    @classmethod
+    def load(
+        cls, path: str, arrival_radius: float
+    ) -> "tuple[True, WaypointMission] | tuple[False, None]":
+        """
+        Creates a mission from a CSV file with one waypoint of x, y, z in metres per row.
+        Blank rows and rows starting with # are skipped.
+        """
+        waypoints = []
+        try:
+            with open(path, encoding="utf-8", newline="") as file:
+                for row in csv.reader(file):
+                    if len(row) == 0 or row[0].strip().startswith("#"):
+                        continue
+
+                    x, y, z = (float(value) for value in row)
+                    waypoints.append((x, y, z))
+        except (OSError, ValueError):
+            return False, None
+
+        return cls.create(waypoints, arrival_radius)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        waypoints: "list[tuple[float, float, float]]",
+        arrival_radius: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WaypointMission.__create_key, "Use create() method"
+
+        self.__waypoints = waypoints
+        self.__arrival_radius = arrival_radius
+        self.__index = WaypointIndex(waypoints)
+        self.__target: "int | None" = 0
+
+    def get_target(self) -> "tuple[float, float, float] | None":
+        """
+        Position of the active target, None once every waypoint is visited.
+        """
+        if self.__target is None:
+            return None
+
+        return self.__waypoints[self.__target]
+
+    def get_remaining(self) -> int:
+        """
+        Number of waypoints not visited yet.
+        """
+        return len(self.__index)
+
+    def update(self, x: float, y: float, z: float) -> bool:
+        """
+        Visits the waypoints within the arrival radius of the drone.
+
+        x, y, z: Position of the drone in metres.
+
+        Returns whether the active target changed.
+        """
+        if self.__target is None:
+            return False
+
+        position = (x, y, z)
+        for index in self.__index.within(position, self.__arrival_radius):
+            self.__index.remove(index)
+
+        if not self.__index.is_visited(self.__target):
+            return False
+
+        self.__target = self.__index.nearest(position)
+        return True
@@ -18,7 +18,6 @@ from ..common.modules.logger import logger
 # =================================================================================================
 def heartbeat_receiver_worker(
     connection: mavutil.mavfile,
-    local_logger: logger.Logger,
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
 ) -> None:
@@ -26,7 +25,6 @@ def heartbeat_receiver_worker(
     Worker process.
 
     connection: connection between drone and worker
-    local_logger: logs info, errors, etc. if they occur
     output_queue: deals with the queue of outputs to main process
     controller: controlls worker process
     """
@@ -65,7 +63,7 @@ def heartbeat_receiver_worker(
             value, status = receiver.run()
             if not value:
                 local_logger.warning("Failed to receive Heartbeat")
-            output_queue.queue.put(status)
+            output_queue.put(status)
         connection.close()
 
 
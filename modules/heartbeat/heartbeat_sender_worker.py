@@ -4,10 +4,10 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
+from utilities.workers import periodic_scheduler
 from utilities.workers import worker_controller
 from . import heartbeat_sender
 from ..common.modules.logger import logger
@@ -16,18 +16,19 @@ from ..common.modules.logger import logger
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+HEARTBEAT_PERIOD = 1.0  # seconds
+
+
 def heartbeat_sender_worker(
     connection: mavutil.mavfile,
-    controller: worker_controller.WorkerController,
-    local_logger: logger.Logger,
     # Add other necessary worker arguments here
+    controller: worker_controller.WorkerController,
 ) -> None:
     """
     Worker process.
 
     connection: Establishes communication between workers using pymavlink library
     controller: How the main process communicates with the workers
-    local_logger: Logs the results of heartbeat messages in log files
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -57,20 +58,27 @@ def heartbeat_sender_worker(
         local_logger.error("Failed to establish heartbeat sender", True)
         return
 
+    def send_heartbeat() -> None:
+        """
+        Sends a heartbeat and logs it.
+        """
+        sender_instance.run()
+        local_logger.info("Heartbeat sent")
+
+    # A late heartbeat is not made up for, the next one is sent on time
+    scheduler = periodic_scheduler.PeriodicScheduler()
+    scheduler.add("heartbeat", send_heartbeat, HEARTBEAT_PERIOD)
+
     # Main loop: do work.
     while not controller.is_exit_requested():
         # check if controller is paused
         controller.check_pause()
 
-        # send heartbeat signal through running instance
-        start = time.time()
-        result = sender_instance.run()
-        time_elapsed = time.time() - start
-        local_logger.info("Heartbeat sent")
+        # send heartbeat signal on every tick
+        scheduler.wait()
+        scheduler.run_pending()
 
-        # create a system for time to be exactly one second
-        sleep_time = 1 - time_elapsed
-        time.sleep(sleep_time)
+    local_logger.info(f"Skipped heartbeats: {scheduler.get_skipped_counts()['heartbeat']}")
 
 
 # =================================================================================================
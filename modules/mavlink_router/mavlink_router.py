@@ -0,0 +1,248 @@
+"""
+Single owner of the MAVLink connection that routes messages to subscribers.
+"""
+
+import threading
+import time
+from multiprocessing import connection as mp_connection
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from . import message_statistics
+from ..common.modules.logger import logger
+
+
+class OutboundMav:
+    """
+    Stands in for `mavfile.mav` in subscribers.
+    Any `*_send()` call is queued for the router to send on the real connection.
+    """
+
+    def __init__(self, outbound_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        self.__outbound_queue = outbound_queue
+
+    def __getattr__(self, name: str) -> "(...) -> None":  # type: ignore
+        if not name.endswith("_send"):
+            raise AttributeError(name)
+
+        def send(*args: object, **kwargs: object) -> None:
+            self.__outbound_queue.put((name, args, kwargs))
+
+        return send
+
+
+class MavlinkSubscriber:
+    """
+    Stands in for `mavutil.mavfile` in workers.
+    Receives the messages routed to it and queues sends for the router.
+    """
+
+    __POLL_TIMEOUT = 0.1  # seconds
+
+    def __init__(
+        self,
+        inbound_queue: "queue_proxy_wrapper.QueueProxyWrapper | None",
+        outbound_queue: queue_proxy_wrapper.QueueProxyWrapper,
+        statistics: message_statistics.MessageStatistics | None = None,
+    ) -> None:
+        """
+        inbound_queue: Messages routed to this subscriber, None if it only sends.
+        outbound_queue: Sends to the router.
+        statistics: Records each message as it is received by the worker, None to not record.
+        """
+        self.__inbound_queue = inbound_queue
+        self.__statistics = statistics
+        self.mav = OutboundMav(outbound_queue)
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Returns the next routed message without waiting, None if there is none.
+        """
+        if self.__inbound_queue is None:
+            return None
+
+        messages = self.__inbound_queue.get_many(1)
+        if len(messages) == 0 or messages[0] is None:
+            return None
+
+        self.__record(messages[0])
+        return messages[0]
+
+    def recv_match(
+        self,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Same as `mavfile.recv_match()` without conditions.
+        Messages of other types are discarded.
+
+        type: Message type or types to return, None for any.
+        blocking: Whether to wait for a message.
+        timeout: Time waiting in seconds, None waits forever.
+
+        Returns the message, None if there was none in time.
+        """
+        if isinstance(type, str):
+            type = [type]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            max_wait = 0.0
+            if blocking:
+                max_wait = self.__POLL_TIMEOUT
+                if deadline is not None:
+                    max_wait = max(min(deadline - time.monotonic(), max_wait), 0.0)
+
+            messages = (
+                [] if self.__inbound_queue is None else self.__inbound_queue.get_many(1, max_wait)
+            )
+            for message in messages:
+                # Skip sentinels
+                if message is None:
+                    continue
+
+                self.__record(message)
+                if type is None or message.get_type() in type:
+                    return message
+
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return None
+
+    def close(self) -> None:
+        """
+        Does nothing, the router owns the connection.
+        """
+
+    def __record(self, message: "mavutil.mavlink.MAVLink_message") -> None:
+        """
+        Records the arrival of the message if recording.
+        """
+        if self.__statistics is not None:
+            self.__statistics.record(message.get_type())
+
+
+class MavlinkRouter:
+    """
+    Reads and parses every message once and routes it by type to subscriber queues.
+    Sends are funnelled from subscribers through the outbound queue.
+
+    Receiving and sending may be on different threads. `mavfile` is not thread safe,
+    as parsing and sending both update the sequence, packet counters and signing state,
+    so every use of the connection is under a lock. Receiving waits for the connection
+    to be readable without the lock, so sends are not held up by a quiet connection.
+    """
+
+    __private_key = object()
+    __OUTBOUND_BATCH_SIZE = 10
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+        outbound_queue: queue_proxy_wrapper.QueueProxyWrapper,
+        local_logger: logger.Logger,
+        statistics: message_statistics.MessageStatistics | None = None,
+    ) -> "tuple[True, MavlinkRouter] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a MavlinkRouter object.
+
+        connection: Connection owned by the router.
+        routes: Subscriber queues for each message type, other types are discarded.
+        outbound_queue: Sends queued by subscribers.
+        local_logger: Logger of the router worker.
+        statistics: Records each message as it is received from the connection, None to not record.
+        """
+        if len(routes) == 0:
+            local_logger.error("Router has no routes", True)
+            return False, None
+
+        return True, cls(
+            cls.__private_key, connection, routes, outbound_queue, local_logger, statistics
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+        outbound_queue: queue_proxy_wrapper.QueueProxyWrapper,
+        local_logger: logger.Logger,
+        statistics: message_statistics.MessageStatistics | None,
+    ) -> None:
+        assert key is MavlinkRouter.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__routes = routes
+        self.__outbound_queue = outbound_queue
+        self.__local_logger = local_logger
+        self.__statistics = statistics
+        self.__connection_lock = threading.Lock()
+
+    def receive(self, timeout: float) -> int:
+        """
+        Waits for a message and routes it along with every other message already buffered.
+
+        timeout: Time waiting in seconds for the first message.
+
+        Returns the number of messages routed.
+        """
+        # Connections without a descriptor, such as serial ports on Windows,
+        # can only be waited on with the lock held
+        fd = self.__connection.fd
+        if fd is not None and len(mp_connection.wait([fd], timeout)) == 0:
+            return 0
+
+        messages = []
+        with self.__connection_lock:
+            if fd is None:
+                message = self.__connection.recv_match(blocking=True, timeout=timeout)
+            else:
+                message = self.__connection.recv_msg()
+
+            while message is not None:
+                messages.append(message)
+                message = self.__connection.recv_msg()
+
+        count = 0
+        for message in messages:
+            message_type = message.get_type()
+            if self.__statistics is not None:
+                self.__statistics.record(message_type)
+
+            for subscriber_queue in self.__routes.get(message_type, ()):
+                subscriber_queue.put(message)
+                count += 1
+
+        return count
+
+    def send(self, timeout: float) -> int:
+        """
+        Waits for queued sends and sends them on the connection.
+
+        timeout: Time waiting in seconds for the first send.
+
+        Returns the number of messages sent.
+        """
+        count = 0
+        for send in self.__outbound_queue.get_many(self.__OUTBOUND_BATCH_SIZE, timeout):
+            # Skip sentinels
+            if send is None:
+                continue
+
+            name, args, kwargs = send
+            try:
+                with self.__connection_lock:
+                    getattr(self.__connection.mav, name)(*args, **kwargs)
+            # Catching all exceptions for library call
+            # pylint: disable-next=broad-exception-caught
+            except Exception as e:
+                self.__local_logger.error(f"Failed to send {name}: {e}")
+                continue
+
+            count += 1
+
+        return count
@@ -0,0 +1,118 @@
+"""
+Router worker that owns the MAVLink connection.
+"""
+
+import multiprocessing.synchronize
+import os
+import pathlib
+import threading
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import mavlink_router
+from . import message_statistics
+from ..common.modules.logger import logger
+
+
+HEARTBEAT_TIMEOUT = 30  # seconds
+# Period of the ground station heartbeats sent while waiting for the drone
+HEARTBEAT_PERIOD = 1  # seconds
+RECEIVE_TIMEOUT = 0.1  # seconds
+SEND_TIMEOUT = 0.1  # seconds
+
+
+def wait_for_drone(
+    connection: mavutil.mavfile, controller: worker_controller.WorkerController
+) -> bool:
+    """
+    Sends a ground station heartbeat every period until the drone's heartbeat arrives,
+    as the drone may wait for a heartbeat before it sends anything.
+
+    Returns whether the drone connected before the timeout, False if exit was requested.
+    """
+    deadline = time.monotonic() + HEARTBEAT_TIMEOUT
+    while not controller.is_exit_requested():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0.0:
+            return False
+
+        connection.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+        )
+        if connection.wait_heartbeat(timeout=min(HEARTBEAT_PERIOD, remaining)) is not None:
+            return True
+
+    return False
+
+
+def mavlink_router_worker(
+    connection_string: str,
+    routes: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+    statistics: message_statistics.MessageStatistics | None,
+    ready: multiprocessing.synchronize.Event,
+    outbound_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    connection_string: MAVLink connection to open, only this worker reads and writes it.
+    routes: Subscriber queues for each message type.
+    statistics: Records each message received from the connection, None to not record.
+    ready: Set once the drone has connected, so main can hold back the other workers.
+    outbound_queue: Sends queued by subscribers.
+    controller: How the main process communicates to this worker process.
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    connection = mavutil.mavlink_connection(connection_string)
+    # Wait for the "drone" to connect
+    if not wait_for_drone(connection, controller):
+        local_logger.error("No heartbeat from drone", True)
+        connection.close()
+        return
+
+    result, router = mavlink_router.MavlinkRouter.create(
+        connection, routes, outbound_queue, local_logger, statistics
+    )
+    if not result:
+        local_logger.error("Could not create router", True)
+        connection.close()
+        return
+
+    # Get Pylance to stop complaining
+    assert router is not None
+
+    # Sends are on their own thread so they do not wait for a message to be received
+    def send_loop() -> None:
+        while not controller.is_exit_requested():
+            controller.check_pause()
+            router.send(SEND_TIMEOUT)
+
+    sender = threading.Thread(target=send_loop)
+    sender.start()
+
+    ready.set()
+    local_logger.info("Drone connected", True)
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        router.receive(RECEIVE_TIMEOUT)
+
+    sender.join()
+    connection.close()
@@ -0,0 +1,141 @@
+"""
+Arrival rate and jitter of MAVLink messages.
+"""
+
+import multiprocessing as mp
+import time
+
+
+DEFAULT_EWMA_WEIGHT = 0.1
+
+# Inter-arrival histogram: bucket 0 is under 1 ms, bucket i is [2^(i-1), 2^i) ms,
+# and the last bucket is everything longer
+HISTOGRAM_BUCKET_COUNT = 16
+
+
+class MessageStatisticsSnapshot:
+    """
+    Statistics of a message type at the time of the snapshot.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        rate: float,
+        jitter: float,
+        age: "float | None",
+        histogram: "list[int]",
+    ) -> None:
+        """
+        count: Number of messages.
+        rate: Average arrival rate in Hz, 0 before 2 messages.
+        jitter: Average deviation of the inter-arrival time from its average in seconds.
+        age: Time since the last message in seconds, None if there has been none.
+        histogram: Number of inter-arrival times in each bucket.
+        """
+        self.count = count
+        self.rate = rate
+        self.jitter = jitter
+        self.age = age
+        self.histogram = histogram
+
+    def __str__(self) -> str:
+        age = "never" if self.age is None else f"{self.age:.3f} s"
+        return (
+            f"{self.count} messages, {self.rate:.2f} Hz, jitter {self.jitter * 1000:.1f} ms, "
+            f"last {age} ago, histogram {self.histogram}"
+        )
+
+
+class MessageStatistics:
+    """
+    Per message type counters, arrival rate, jitter and inter-arrival histogram
+    in preallocated shared arrays, recorded by workers and read by main.
+
+    Each message type must be recorded by only 1 process.
+    Snapshots are read without locking, so a snapshot taken during a record
+    may mix the values from before and after it.
+    """
+
+    # Float columns of each message type
+    __LAST_ARRIVAL = 0
+    __INTERVAL = 1
+    __JITTER = 2
+    __FLOAT_COLUMNS = 3
+
+    def __init__(
+        self, message_types: "list[str]", ewma_weight: float = DEFAULT_EWMA_WEIGHT
+    ) -> None:
+        """
+        message_types: Types recorded, other types are ignored.
+        ewma_weight: Weight of the newest inter-arrival time in the averages, in (0, 1].
+        """
+        assert 0.0 < ewma_weight <= 1.0, "Weight must be in (0, 1]"
+
+        self.__indices = {message_type: i for i, message_type in enumerate(message_types)}
+        self.__ewma_weight = ewma_weight
+
+        self.__counts = mp.RawArray("Q", len(message_types))
+        self.__floats = mp.RawArray("d", len(message_types) * self.__FLOAT_COLUMNS)
+        self.__histograms = mp.RawArray("Q", len(message_types) * HISTOGRAM_BUCKET_COUNT)
+
+    def record(self, message_type: str, arrival_time: "float | None" = None) -> None:
+        """
+        Records the arrival of a message.
+
+        message_type: Type of the message.
+        arrival_time: Monotonic time in seconds, None for now.
+        """
+        i = self.__indices.get(message_type)
+        if i is None:
+            return
+
+        if arrival_time is None:
+            arrival_time = time.monotonic()
+
+        floats = self.__floats
+        offset = i * self.__FLOAT_COLUMNS
+        count = self.__counts[i]
+
+        if count > 0:
+            interval = arrival_time - floats[offset + self.__LAST_ARRIVAL]
+
+            bucket = min(int(interval * 1000).bit_length(), HISTOGRAM_BUCKET_COUNT - 1)
+            self.__histograms[i * HISTOGRAM_BUCKET_COUNT + bucket] += 1
+
+            if count == 1:
+                floats[offset + self.__INTERVAL] = interval
+            else:
+                average = floats[offset + self.__INTERVAL]
+                floats[offset + self.__JITTER] += self.__ewma_weight * (
+                    abs(interval - average) - floats[offset + self.__JITTER]
+                )
+                floats[offset + self.__INTERVAL] = average + self.__ewma_weight * (
+                    interval - average
+                )
+
+        floats[offset + self.__LAST_ARRIVAL] = arrival_time
+        self.__counts[i] = count + 1
+
+    def snapshot(self) -> "dict[str, MessageStatisticsSnapshot]":
+        """
+        Returns the statistics of each message type.
+        """
+        now = time.monotonic()
+
+        snapshots = {}
+        for message_type, i in self.__indices.items():
+            offset = i * self.__FLOAT_COLUMNS
+            count = self.__counts[i]
+            interval = self.__floats[offset + self.__INTERVAL]
+            start = i * HISTOGRAM_BUCKET_COUNT
+
+            snapshots[message_type] = MessageStatisticsSnapshot(
+                count,
+                1.0 / interval if interval > 0.0 else 0.0,
+                self.__floats[offset + self.__JITTER],
+                now - self.__floats[offset + self.__LAST_ARRIVAL] if count > 0 else None,
+                list(self.__histograms[start : start + HISTOGRAM_BUCKET_COUNT]),
+            )
+
+        return snapshots
@@ -2,18 +2,66 @@
 Telemetry gathering logic.
 """
 
+import selectors
+import struct
 import time
+from collections.abc import Callable, Generator
 
 from pymavlink import mavutil
 
+from . import telemetry_alignment
+from . import telemetry_extractors
 from ..common.modules.logger import logger
 
 
 class TelemetryData:  # pylint: disable=too-many-instance-attributes
     """
     Python struct to represent Telemtry Data. Contains the most recent attitude and position reading.
+
+    Attributes are slots, and the fixed binary layout from to_bytes() is used for pickling,
+    shared memory and recordings.
+    The trace fields follow a sample through the pipeline to measure its latency.
     """
 
+    # Field and struct format in layout order, after a bitmask of which fields are not None
+    __FIELD_FORMATS = (
+        ("time_since_boot", "I"),  # ms
+        ("x", "d"),  # m
+        ("y", "d"),  # m
+        ("z", "d"),  # m
+        ("x_velocity", "d"),  # m/s
+        ("y_velocity", "d"),  # m/s
+        ("z_velocity", "d"),  # m/s
+        ("roll", "d"),  # rad
+        ("pitch", "d"),  # rad
+        ("yaw", "d"),  # rad
+        ("roll_speed", "d"),  # rad/s
+        ("pitch_speed", "d"),  # rad/s
+        ("yaw_speed", "d"),  # rad/s
+        ("attitude_time_since_boot", "I"),  # ms
+        ("position_time_since_boot", "I"),  # ms
+        # Trace
+        ("sequence", "Q"),
+        ("ingest_time", "d"),  # monotonic s
+        ("publish_time", "d"),  # monotonic s
+        ("state_time", "d"),  # monotonic s
+    )
+    __STRUCT = struct.Struct("=I" + "".join(field_format for _, field_format in __FIELD_FORMATS))
+    # Largest value of each unsigned integer field, None for floating point fields
+    __INTEGER_MAXIMUMS = tuple(
+        (1 << (8 * struct.calcsize(field_format))) - 1 if field_format in "IQ" else None
+        for _, field_format in __FIELD_FORMATS
+    )
+
+    __slots__ = tuple(name for name, _ in __FIELD_FORMATS)
+
+    # Telemetry fields, then trace fields
+    FIELDS = __slots__[:-4]
+    TRACE_FIELDS = __slots__[-4:]
+
+    # Size in bytes of the binary layout
+    SIZE = __STRUCT.size
+
     def __init__(
         self,
         time_since_boot: int | None = None,  # ms
@@ -29,6 +77,12 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         roll_speed: float | None = None,  # rad/s
         pitch_speed: float | None = None,  # rad/s
         yaw_speed: float | None = None,  # rad/s
+        attitude_time_since_boot: int | None = None,  # ms
+        position_time_since_boot: int | None = None,  # ms
+        sequence: int | None = None,
+        ingest_time: float | None = None,  # monotonic s
+        publish_time: float | None = None,  # monotonic s
+        state_time: float | None = None,  # monotonic s
     ) -> None:
         self.time_since_boot = time_since_boot
         self.x = x
@@ -43,51 +97,122 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         self.roll_speed = roll_speed
         self.pitch_speed = pitch_speed
         self.yaw_speed = yaw_speed
+        # Source timestamps, time_since_boot is the most recent of these
+        self.attitude_time_since_boot = attitude_time_since_boot
+        self.position_time_since_boot = position_time_since_boot
+        # Trace: number of the sample in the stream, when its newest message was received
+        # by the telemetry worker and when the telemetry worker output it
+        self.sequence = sequence
+        self.ingest_time = ingest_time
+        self.publish_time = publish_time
+        # When the state was estimated for if it was propagated past its ingest time,
+        # None if it is as measured
+        self.state_time = state_time
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the binary layout of the data.
+        """
+        buffer = bytearray(self.SIZE)
+        self.pack_into(buffer)
+        return bytes(buffer)
+
+    def pack_into(self, buffer: "bytearray | memoryview", offset: int = 0) -> None:
+        """
+        Writes the binary layout of the data into the buffer.
+
+        Integer fields such as times are rounded, as they may be computed as floats.
+
+        buffer: Writable buffer such as shared memory, with at least SIZE bytes after the offset.
+        offset: Position in bytes to write at.
+
+        Raises ValueError if an integer field is negative or too large for its format.
+        """
+        present = 0
+        values = []
+        for i, name in enumerate(self.__slots__):
+            value = getattr(self, name)
+            if value is None:
+                values.append(0)
+                continue
+
+            maximum = self.__INTEGER_MAXIMUMS[i]
+            if maximum is not None:
+                value = round(value)
+                if not 0 <= value <= maximum:
+                    raise ValueError(f"{name} of {value} is outside of [0, {maximum}]")
+
+            present |= 1 << i
+            values.append(value)
+
+        self.__STRUCT.pack_into(buffer, offset, present, *values)
+
+    @classmethod
+    def from_bytes(cls, data: "bytes | bytearray | memoryview", offset: int = 0) -> "TelemetryData":
+        """
+        Reads data from its binary layout.
+
+        data: Buffer with at least SIZE bytes after the offset.
+        offset: Position in bytes to read from.
+        """
+        present, *values = cls.__STRUCT.unpack_from(data, offset)
+        return cls(*(value if present & (1 << i) else None for i, value in enumerate(values)))
+
+    def __reduce__(self) -> "tuple[object, tuple[bytes]]":
+        # Pickle as the binary layout rather than field by field
+        return TelemetryData.from_bytes, (self.to_bytes(),)
 
     def __str__(self) -> str:
-        return f"""{{
-            time_since_boot: {self.time_since_boot},
-            x: {self.x},
-            y: {self.y},
-            z: {self.z},
-            x_velocity: {self.x_velocity},
-            y_velocity: {self.y_velocity},
-            z_velocity: {self.z_velocity},
-            roll: {self.roll},
-            pitch: {self.pitch},
-            yaw: {self.yaw},
-            roll_speed: {self.roll_speed},
-            pitch_speed: {self.pitch_speed},
-            yaw_speed: {self.yaw_speed}
-        }}"""
+        fields = ", ".join(f"{name}: {getattr(self, name)}" for name in self.__slots__)
+        return f"{{{fields}}}"
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
-class Telemetry:
+class Telemetry:  # pylint: disable=too-many-instance-attributes
     """
     Telemetry class to read position and attitude (orientation).
     """
 
     __private_key = object()
 
+    __FIELD_INDICES = {name: i for i, name in enumerate(TelemetryData.FIELDS)}
+    # Sources of time_since_boot, which is the most recent of them
+    __SOURCE_TIME_INDICES = tuple(
+        i for i, name in enumerate(TelemetryData.FIELDS) if name.endswith("_time_since_boot")
+    )
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        extractor_table: "dict[str, dict[str, str | tuple[str, float]]] | None" = None,
     ) -> "tuple[True, Telemetry] | tuple[False, None]":
         """
         Falliable create (instantiation) method to create a Telemetry object.
+
+        extractor_table: Fields to extract from each message type, see telemetry_extractors,
+            None for ATTITUDE and LOCAL_POSITION_NED.
         """
-        return True, cls(cls.__private_key, connection, local_logger)
+        if extractor_table is None:
+            extractor_table = telemetry_extractors.DEFAULT_TABLE
+
+        result, extractors = telemetry_extractors.compile_table(
+            extractor_table, TelemetryData.FIELDS, local_logger
+        )
+        if not result:
+            return False, None
+
+        return True, cls(cls.__private_key, connection, local_logger, extractors)
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        extractors: "dict[int, Callable[[mavutil.mavlink.MAVLink_message, list], None]]",
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
 
@@ -96,6 +221,27 @@ class Telemetry:
         self.local_logger = local_logger
         self.timeout = 3
 
+        # Wake up as soon as the connection is readable if it has a file descriptor,
+        # otherwise (e.g. a router subscriber) wait in recv_match()
+        self.__selector = None
+        fd = getattr(connection, "fd", None)
+        if fd is not None:
+            self.__selector = selectors.DefaultSelector()
+            self.__selector.register(fd, selectors.EVENT_READ)
+
+        # Latest value of each field and the message IDs received, kept across yields of stream()
+        self.__extractors = extractors
+        self.__values: "list[float | int | None]" = [None] * len(TelemetryData.FIELDS)
+        self.__received_ids: "set[int]" = set()
+        self.__update_count = 0
+        # Monotonic time the latest used message was received
+        self.__ingest_time: "float | None" = None
+
+        # Only when streaming aligned, buffers readings to interpolate
+        self.__aligner: "telemetry_alignment.TelemetryAligner | None" = None
+        self.__latest_attitude_msg = None
+        self.__last_aligned_attitude_msg = None
+
     def run(
         self,
     ) -> "tuple[True, TelemetryData] | tuple[False, None]":
@@ -103,50 +249,156 @@ class Telemetry:
         Receive LOCAL_POSITION_NED and ATTITUDE messages from the drone,
         combining them together to form a single TelemetryData object.
         """
-        start_time = time.time()
-        attitude_msg = None
-        position_msg = None
+        # Wait for a fresh message of every type
+        self.__values = [None] * len(TelemetryData.FIELDS)
+        self.__received_ids = set()
+        deadline = time.monotonic() + self.timeout
 
-        while start_time + self.timeout > time.time():
-            msg = self.connection.recv_match(blocking=True, timeout=0.1)
+        while True:
+            self.__receive_buffered()
 
-            # if message is none
-            if msg is None:
-                continue
-
-            # Read MAVLink message LOCAL_POSITION_NED (32)
-            if msg.get_type() == "LOCAL_POSITION_NED":
-                position_msg = msg
-                self.local_logger.info("Received position")
-
-            # Read MAVLink message ATTITUDE (30)
-            if msg.get_type() == "ATTITUDE":
-                attitude_msg = msg
-                self.local_logger.info("Received attitude")
-
-            # Return the most recent of both, and use the most recent message's timestamp
-            if position_msg is not None and attitude_msg is not None:
-                tel_data = TelemetryData(
-                    time_since_boot=max(attitude_msg.time_boot_ms, position_msg.time_boot_ms),
-                    x=position_msg.x,
-                    y=position_msg.y,
-                    z=position_msg.z,
-                    x_velocity=position_msg.vx,
-                    y_velocity=position_msg.vy,
-                    z_velocity=position_msg.vz,
-                    roll=attitude_msg.roll,
-                    pitch=attitude_msg.pitch,
-                    yaw=attitude_msg.yaw,
-                    roll_speed=attitude_msg.rollspeed,
-                    pitch_speed=attitude_msg.pitchspeed,
-                    yaw_speed=attitude_msg.yawspeed,
-                )
+            data = self.__combine()
+            if data is not None:
                 self.local_logger.info("Created telemetry data")
-                return True, tel_data
+                return True, data
+
+            if not self.__wait(deadline):
+                break
+
         # message could not be received in time range
         self.local_logger.error("Did not receive telemetry data within timeout frame")
         return False, None
 
+    def stream(self, align: bool = False) -> "Generator[TelemetryData, None, None]":
+        """
+        Yields a TelemetryData object as soon as either LOCAL_POSITION_NED or ATTITUDE updates,
+        combined with the last seen message of the other type.
+        Ends when no message is received within the timeout.
+
+        align: Instead yield on every ATTITUDE update, with the position interpolated
+            (or extrapolated) to the time of the attitude.
+        """
+        if align and self.__aligner is None:
+            self.__aligner = telemetry_alignment.TelemetryAligner()
+
+        deadline = time.monotonic() + self.timeout
+
+        # Counted across waits, as waiting in recv_match() stores the message it receives
+        update_count = self.__update_count
+        while True:
+            self.__receive_buffered()
+
+            if self.__update_count != update_count:
+                update_count = self.__update_count
+                deadline = time.monotonic() + self.timeout
+
+                data = self.__align() if align else self.__combine()
+                if data is not None:
+                    yield data
+                    continue
+
+            if not self.__wait(deadline):
+                break
+
+        # message could not be received in time range
+        self.local_logger.error("Did not receive telemetry data within timeout frame")
+
+    def __receive_buffered(self) -> None:
+        """
+        Receives everything already buffered, keeping the newest message of each type.
+        """
+        message = self.connection.recv_msg()
+        while message is not None:
+            self.__store_message(message)
+            message = self.connection.recv_msg()
+
+    def __wait(self, deadline: float) -> bool:
+        """
+        Waits until the connection has data or the deadline passes.
+
+        Returns False if the deadline has already passed.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0.0:
+            return False
+
+        if self.__selector is not None:
+            self.__selector.select(remaining)
+            return True
+
+        message = self.connection.recv_match(blocking=True, timeout=remaining)
+        if message is not None:
+            self.__store_message(message)
+
+        return True
+
+    def __store_message(self, message: "mavutil.mavlink.MAVLink_message") -> None:
+        """
+        Extracts the fields of the message if its type is used, dispatching on its ID.
+        """
+        message_id = message.get_msgId()
+        extractor = self.__extractors.get(message_id)
+        if extractor is None:
+            return
+
+        extractor(message, self.__values)
+        self.__received_ids.add(message_id)
+        self.__update_count += 1
+        self.__ingest_time = time.monotonic()
+
+        if self.__aligner is not None:
+            if message_id == mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE:
+                self.__aligner.add_attitude(message)
+                self.__latest_attitude_msg = message
+            elif message_id == mavutil.mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED:
+                self.__aligner.add_position(message)
+
+    def __combine(self) -> "TelemetryData | None":
+        """
+        Combines the latest values, None if a message type has not been received.
+        """
+        if len(self.__received_ids) < len(self.__extractors):
+            return None
+
+        values = list(self.__values)
+
+        # Use the most recent message's timestamp
+        source_times = [values[i] for i in self.__SOURCE_TIME_INDICES if values[i] is not None]
+        values[0] = max(source_times, default=None)
+
+        data = TelemetryData(*values)
+        data.ingest_time = self.__ingest_time
+        return data
+
+    def __align(self) -> "TelemetryData | None":
+        """
+        Aligns the position to the latest attitude, None if the attitude has not updated
+        or no position has been received.
+        Other fields are the latest values.
+        """
+        attitude_msg = self.__latest_attitude_msg
+        if attitude_msg is None or attitude_msg is self.__last_aligned_attitude_msg:
+            return None
+
+        result, aligned = self.__aligner.align([attitude_msg.time_boot_ms])
+        if not result:
+            return None
+
+        self.__last_aligned_attitude_msg = attitude_msg
+
+        values = list(self.__values)
+        for name, aligned_values in aligned.items():
+            values[self.__FIELD_INDICES[name]] = float(aligned_values[0])
+
+        # Every source is valid at the time of the attitude
+        values[0] = attitude_msg.time_boot_ms
+        for i in self.__SOURCE_TIME_INDICES:
+            values[i] = attitude_msg.time_boot_ms
+
+        data = TelemetryData(*values)
+        data.ingest_time = self.__ingest_time
+        return data
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
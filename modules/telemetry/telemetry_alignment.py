@@ -0,0 +1,130 @@
+"""
+Alignment of attitude and position readings onto a common timeline.
+"""
+
+import math
+
+import numpy as np
+from pymavlink import mavutil
+
+
+DEFAULT_BUFFER_SIZE = 32  # readings of each type
+
+POSITION_FIELDS = ("x", "y", "z", "x_velocity", "y_velocity", "z_velocity")
+ATTITUDE_FIELDS = ("roll", "pitch", "yaw", "roll_speed", "pitch_speed", "yaw_speed")
+
+
+class TelemetryAligner:
+    """
+    Buffers the most recent ATTITUDE and LOCAL_POSITION_NED readings
+    and interpolates both onto any timestamps, vectorised over the timestamps.
+
+    Position and velocity are interpolated linearly, and after the newest position reading
+    the position is extrapolated with its velocity.
+    Angles are interpolated along the shorter arc and wrapped to [-pi, pi),
+    angular rates are interpolated linearly, and both are held after the newest reading.
+    Before the oldest reading of a type, the oldest is held.
+    """
+
+    # Columns of the buffers, after the time in ms
+    __POSITION_COLUMNS = 1 + len(POSITION_FIELDS)
+    __ATTITUDE_COLUMNS = 1 + len(ATTITUDE_FIELDS)
+    __ANGLE_COUNT = 3
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """
+        buffer_size: Number of readings of each type kept, at least 2 to interpolate.
+        """
+        assert buffer_size >= 2, "Interpolation requires at least 2 readings"
+
+        # Oldest to newest, the last count rows are filled
+        self.__positions = np.zeros((buffer_size, self.__POSITION_COLUMNS))
+        self.__position_count = 0
+        self.__attitudes = np.zeros((buffer_size, self.__ATTITUDE_COLUMNS))
+        self.__attitude_count = 0
+
+    def add_position(self, message: "mavutil.mavlink.MAVLink_local_position_ned_message") -> None:
+        """
+        Buffers a LOCAL_POSITION_NED reading, which must not be older than the previous one.
+        """
+        self.__position_count = self.__push(
+            self.__positions,
+            self.__position_count,
+            (
+                message.time_boot_ms,
+                message.x,
+                message.y,
+                message.z,
+                message.vx,
+                message.vy,
+                message.vz,
+            ),
+        )
+
+    def add_attitude(self, message: "mavutil.mavlink.MAVLink_attitude_message") -> None:
+        """
+        Buffers an ATTITUDE reading, which must not be older than the previous one.
+        """
+        self.__attitude_count = self.__push(
+            self.__attitudes,
+            self.__attitude_count,
+            (
+                message.time_boot_ms,
+                message.roll,
+                message.pitch,
+                message.yaw,
+                message.rollspeed,
+                message.pitchspeed,
+                message.yawspeed,
+            ),
+        )
+
+    def align(
+        self, times: "np.ndarray | list[int]"
+    ) -> "tuple[True, dict[str, np.ndarray]] | tuple[False, None]":
+        """
+        Interpolates the buffered readings onto the timestamps.
+
+        times: Timestamps in ms.
+
+        Returns each position and attitude field by name,
+        fails if there is no reading of either type yet.
+        """
+        if self.__position_count == 0 or self.__attitude_count == 0:
+            return False, None
+
+        times = np.asarray(times, np.float64)
+        aligned = {}
+
+        positions = self.__positions[-self.__position_count :]
+        position_times = positions[:, 0]
+        for i, name in enumerate(POSITION_FIELDS, 1):
+            aligned[name] = np.interp(times, position_times, positions[:, i])
+
+        # Dead reckon past the newest position, velocities are held
+        elapsed = np.maximum(times - position_times[-1], 0.0) / 1000.0
+        for i, name in enumerate(POSITION_FIELDS[:3]):
+            aligned[name] += aligned[POSITION_FIELDS[3 + i]] * elapsed
+
+        attitudes = self.__attitudes[-self.__attitude_count :]
+        attitude_times = attitudes[:, 0]
+        angles = np.unwrap(attitudes[:, 1 : 1 + self.__ANGLE_COUNT], axis=0)
+        for i, name in enumerate(ATTITUDE_FIELDS):
+            if i < self.__ANGLE_COUNT:
+                unwrapped = np.interp(times, attitude_times, angles[:, i])
+                aligned[name] = (unwrapped + math.pi) % (2 * math.pi) - math.pi
+            else:
+                aligned[name] = np.interp(times, attitude_times, attitudes[:, 1 + i])
+
+        return True, aligned
+
+    @staticmethod
+    def __push(buffer: np.ndarray, count: int, row: "tuple[float, ...]") -> int:
+        """
+        Appends the row as the newest, dropping the oldest.
+
+        Returns the new count of filled rows.
+        """
+        buffer[:-1] = buffer[1:]
+        buffer[-1] = row
+        return min(count + 1, len(buffer))
@@ -0,0 +1,193 @@
+"""
+Decimation of telemetry for consumers that want a lower rate.
+"""
+
+import enum
+import math
+
+from . import telemetry
+from ..common.modules.logger import logger
+
+
+class DecimationMode(enum.Enum):
+    """
+    How samples are reduced.
+    """
+
+    # Every sample
+    ALL = 0
+    # Every Nth sample
+    EVERY_NTH = 1
+    # The first sample at least the minimum interval after the previous output
+    MIN_INTERVAL = 2
+    # The average of the samples in each interval
+    AVERAGE = 3
+
+
+class TelemetryDecimator:  # pylint: disable=too-many-instance-attributes
+    """
+    Reduces a stream of telemetry samples to a lower rate for a single consumer.
+
+    Intervals are measured on time_since_boot, samples without it pass through
+    (except for EVERY_NTH, which only counts).
+    Averages use the circular mean for angles and the time of the last sample in the interval.
+    """
+
+    __create_key = object()
+
+    __ANGLE_FIELDS = ("roll", "pitch", "yaw")
+
+    @classmethod
+    def create(
+        cls,
+        mode: DecimationMode,
+        local_logger: logger.Logger,
+        every_n: int = 1,
+        min_interval: int = 0,
+    ) -> "tuple[True, TelemetryDecimator] | tuple[False, None]":
+        """
+        mode: How samples are reduced.
+        local_logger: Logger to log invalid settings.
+        every_n: Output 1 of every N samples, for EVERY_NTH.
+        min_interval: Interval in ms, for MIN_INTERVAL and AVERAGE.
+        """
+        if mode == DecimationMode.EVERY_NTH and every_n < 1:
+            local_logger.error("Decimation must keep at least every 1st sample", True)
+            return False, None
+
+        if mode in (DecimationMode.MIN_INTERVAL, DecimationMode.AVERAGE) and min_interval <= 0:
+            local_logger.error("Decimation interval must be positive", True)
+            return False, None
+
+        return True, TelemetryDecimator(cls.__create_key, mode, every_n, min_interval)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        mode: DecimationMode,
+        every_n: int,
+        min_interval: int,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is TelemetryDecimator.__create_key, "Use create() method"
+
+        self.__mode = mode
+        self.__every_n = every_n
+        self.__min_interval = min_interval
+
+        self.__count = 0
+        self.__interval_start: "int | None" = None
+
+        # Sums of the samples in the current interval for AVERAGE, per field
+        self.__sums: "dict[str, float]" = {}
+        self.__sample_counts: "dict[str, int]" = {}
+        self.__last_data: "telemetry.TelemetryData | None" = None
+
+    def push(self, data: telemetry.TelemetryData) -> "telemetry.TelemetryData | None":
+        """
+        Takes the next sample.
+
+        Returns the sample to output, None if there is nothing to output yet.
+        """
+        match self.__mode:
+            case DecimationMode.ALL:
+                return data
+            case DecimationMode.EVERY_NTH:
+                return self.__push_every_nth(data)
+            case DecimationMode.MIN_INTERVAL:
+                return self.__push_min_interval(data)
+            case DecimationMode.AVERAGE:
+                return self.__push_average(data)
+
+        return data
+
+    def __push_every_nth(self, data: telemetry.TelemetryData) -> "telemetry.TelemetryData | None":
+        """
+        Outputs the first sample and every Nth after.
+        """
+        is_output = self.__count % self.__every_n == 0
+        self.__count += 1
+        return data if is_output else None
+
+    def __push_min_interval(
+        self, data: telemetry.TelemetryData
+    ) -> "telemetry.TelemetryData | None":
+        """
+        Outputs the sample if the interval since the last output has elapsed.
+        """
+        if data.time_since_boot is None:
+            return data
+
+        if (
+            self.__interval_start is not None
+            and data.time_since_boot - self.__interval_start < self.__min_interval
+        ):
+            return None
+
+        self.__interval_start = data.time_since_boot
+        return data
+
+    def __push_average(self, data: telemetry.TelemetryData) -> "telemetry.TelemetryData | None":
+        """
+        Outputs the average of the previous interval once a sample after it arrives.
+        """
+        if data.time_since_boot is None:
+            return data
+
+        average = None
+        if self.__interval_start is None:
+            self.__interval_start = data.time_since_boot
+        elif data.time_since_boot - self.__interval_start >= self.__min_interval:
+            average = self.__average()
+            self.__sums = {}
+            self.__sample_counts = {}
+            self.__interval_start = data.time_since_boot
+
+        self.__accumulate(data)
+        return average
+
+    def __accumulate(self, data: telemetry.TelemetryData) -> None:
+        """
+        Adds the sample to the sums, angles as their sine and cosine.
+        """
+        for name in telemetry.TelemetryData.FIELDS:
+            value = getattr(data, name)
+            if value is None or name.endswith("time_since_boot"):
+                continue
+
+            if name in self.__ANGLE_FIELDS:
+                self.__add(f"{name}_sin", math.sin(value))
+                self.__add(f"{name}_cos", math.cos(value))
+            self.__add(name, value)
+
+        self.__last_data = data
+
+    def __add(self, key: str, value: float) -> None:
+        """
+        Adds the value to the sum of the key.
+        """
+        self.__sums[key] = self.__sums.get(key, 0.0) + value
+        self.__sample_counts[key] = self.__sample_counts.get(key, 0) + 1
+
+    def __average(self) -> telemetry.TelemetryData:
+        """
+        Average of the accumulated samples, fields never present are None.
+        The time and trace are of the last sample.
+        """
+        average = telemetry.TelemetryData(time_since_boot=self.__last_data.time_since_boot)
+        for name in telemetry.TelemetryData.TRACE_FIELDS:
+            setattr(average, name, getattr(self.__last_data, name))
+        for name, total in self.__sums.items():
+            if name not in telemetry.TelemetryData.FIELDS:
+                continue
+
+            if name in self.__ANGLE_FIELDS:
+                value = math.atan2(self.__sums[f"{name}_sin"], self.__sums[f"{name}_cos"])
+            else:
+                value = total / self.__sample_counts[name]
+
+            setattr(average, name, value)
+
+        return average
@@ -0,0 +1,58 @@
+"""
+Decimator worker that fans telemetry out to consumers at their own rates.
+"""
+
+import os
+import pathlib
+
+from utilities.workers import latest_value_channel
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import telemetry_decimator
+from ..common.modules.logger import logger
+
+
+INPUT_BATCH_SIZE = 10
+INPUT_BATCH_WAIT = 0.1  # seconds
+
+
+def telemetry_decimator_worker(
+    outputs: "list[tuple[telemetry_decimator.TelemetryDecimator, queue_proxy_wrapper.QueueProxyWrapper | latest_value_channel.LatestValueChannel]]",
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    outputs: Decimator and queue of each consumer.
+        The overflow policy of each queue decides what happens when its consumer falls behind,
+        so a slow consumer does not hold back the others unless its queue blocks.
+    input_queue: Every sample from the telemetry worker.
+    controller: How the main process communicates to this worker process.
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        for data in input_queue.get_many(INPUT_BATCH_SIZE, INPUT_BATCH_WAIT):
+            # Skip sentinels
+            if data is None:
+                continue
+
+            for decimator, output_queue in outputs:
+                output = decimator.push(data)
+                if output is not None:
+                    output_queue.put(output)
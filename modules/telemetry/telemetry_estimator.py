@@ -0,0 +1,239 @@
+"""
+Kalman filtering of telemetry.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from . import telemetry
+from ..common.modules.logger import logger
+
+
+# Standard deviation of each measured field
+DEFAULT_MEASUREMENT_NOISE = {
+    "x": 0.5,  # m
+    "y": 0.5,  # m
+    "z": 0.5,  # m
+    "x_velocity": 0.2,  # m/s
+    "y_velocity": 0.2,  # m/s
+    "z_velocity": 0.2,  # m/s
+    "yaw": math.radians(2),
+    "yaw_speed": math.radians(2),  # per second
+}
+DEFAULT_ACCELERATION_NOISE = 1.0  # m/s^2
+DEFAULT_YAW_ACCELERATION_NOISE = math.radians(10)  # per second squared
+
+# Variance of fields before their first measurement
+INITIAL_VARIANCE = 1.0e6
+
+
+class TelemetryEstimator:  # pylint: disable=too-many-instance-attributes
+    """
+    Constant velocity Kalman filter over position, velocity, yaw and yaw speed.
+
+    Each axis and yaw are a value and rate pair driven by white noise acceleration.
+    Samples are applied one field at a time, so fields missing from a sample are skipped
+    and no matrix is inverted. All matrices are preallocated and updated in place,
+    so predicting and updating allocate no arrays.
+
+    Samples are timed by their ingest time, or their arrival if untraced.
+    A sample older than the last estimate is applied as if it arrived at that estimate.
+    """
+
+    __create_key = object()
+
+    # State in value and rate pairs, named as in TelemetryData
+    STATE_FIELDS = (
+        "x",
+        "x_velocity",
+        "y",
+        "y_velocity",
+        "z",
+        "z_velocity",
+        "yaw",
+        "yaw_speed",
+    )
+    __VALUES = np.arange(0, len(STATE_FIELDS), 2)
+    __RATES = __VALUES + 1
+    __YAW = STATE_FIELDS.index("yaw")
+
+    @classmethod
+    def create(
+        cls,
+        local_logger: logger.Logger,
+        measurement_noise: "dict[str, float] | None" = None,
+        acceleration_noise: float = DEFAULT_ACCELERATION_NOISE,
+        yaw_acceleration_noise: float = DEFAULT_YAW_ACCELERATION_NOISE,
+    ) -> "tuple[True, TelemetryEstimator] | tuple[False, None]":
+        """
+        local_logger: Logger to log invalid settings.
+        measurement_noise: Standard deviation of each field in STATE_FIELDS,
+            None for the defaults. Missing fields use the default.
+        acceleration_noise: Standard deviation of acceleration in m/s^2.
+        yaw_acceleration_noise: Standard deviation of yaw acceleration in rad/s^2.
+        """
+        noise = dict(DEFAULT_MEASUREMENT_NOISE)
+        if measurement_noise is not None:
+            noise.update(measurement_noise)
+
+        unknown_fields = set(noise) - set(cls.STATE_FIELDS)
+        if len(unknown_fields) > 0:
+            local_logger.error(f"Measurement noise of unknown fields: {unknown_fields}", True)
+            return False, None
+
+        if min(noise.values()) <= 0.0 or min(acceleration_noise, yaw_acceleration_noise) <= 0.0:
+            local_logger.error("Noise must be positive", True)
+            return False, None
+
+        return True, TelemetryEstimator(
+            cls.__create_key, noise, acceleration_noise, yaw_acceleration_noise
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        measurement_noise: "dict[str, float]",
+        acceleration_noise: float,
+        yaw_acceleration_noise: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is TelemetryEstimator.__create_key, "Use create() method"
+
+        size = len(self.STATE_FIELDS)
+        self.__state = np.zeros(size)
+        self.__covariance = np.eye(size) * INITIAL_VARIANCE
+        self.__transition = np.eye(size)
+        self.__process = np.zeros((size, size))
+        self.__variances = np.array([measurement_noise[name] ** 2 for name in self.STATE_FIELDS])
+        self.__spectral_densities = np.array(
+            [acceleration_noise**2] * 3 + [yaw_acceleration_noise**2]
+        )
+
+        # Scratch space
+        self.__matrix = np.empty((size, size))
+        self.__vector = np.empty(size)
+        self.__gain = np.empty(size)
+        self.__block = np.empty(len(self.__spectral_densities))
+
+        # Time of the state in monotonic seconds, None before the first sample
+        self.__time: "float | None" = None
+        # Newest sample and its time, for the fields not filtered
+        self.__last_sample: "telemetry.TelemetryData | None" = None
+        self.__last_sample_time = 0.0
+        self.__sample_count = 0
+
+    def update(self, data: telemetry.TelemetryData, sample_time: "float | None" = None) -> None:
+        """
+        Applies the measured fields of the sample.
+
+        sample_time: When the sample was measured in monotonic seconds,
+            None for its ingest time or now if untraced.
+        """
+        if sample_time is None:
+            sample_time = data.ingest_time if data.ingest_time is not None else time.monotonic()
+
+        self.__predict(sample_time)
+
+        for i, name in enumerate(self.STATE_FIELDS):
+            value = getattr(data, name)
+            if value is not None:
+                self.__correct(i, value)
+
+        self.__last_sample = data
+        self.__last_sample_time = sample_time
+        self.__sample_count += 1
+
+    def estimate(self, estimate_time: "float | None" = None) -> "telemetry.TelemetryData | None":
+        """
+        Filtered state at the time, the other fields and trace are of the newest sample,
+        and the state time is the time of the state.
+
+        estimate_time: Time in monotonic seconds, None for now.
+
+        Returns None before the first sample.
+        """
+        if self.__last_sample is None:
+            return None
+
+        if estimate_time is None:
+            estimate_time = time.monotonic()
+
+        self.__predict(estimate_time)
+
+        data = telemetry.TelemetryData.from_bytes(self.__last_sample.to_bytes())
+        for name, value in zip(self.STATE_FIELDS, self.__state.tolist()):
+            setattr(data, name, value)
+
+        if data.time_since_boot is not None:
+            data.time_since_boot += round((self.__time - self.__last_sample_time) * 1000)
+
+        # Already propagated, so it is not extrapolated again from its ingest time
+        data.state_time = self.__time
+
+        return data
+
+    def get_sample_count(self) -> int:
+        """
+        Number of samples applied.
+        """
+        return self.__sample_count
+
+    def __predict(self, predict_time: float) -> None:
+        """
+        Advances the state and its covariance to the time, if later than the state.
+        """
+        if self.__time is None:
+            self.__time = predict_time
+            return
+
+        dt = predict_time - self.__time
+        if dt <= 0.0:
+            return
+
+        self.__time = predict_time
+
+        # State transition
+        self.__transition[self.__VALUES, self.__RATES] = dt
+        np.dot(self.__transition, self.__state, out=self.__vector)
+        self.__state[:] = self.__vector
+        self.__state[self.__YAW] = (self.__state[self.__YAW] + math.pi) % (2 * math.pi) - math.pi
+
+        # Discrete white noise acceleration of each pair
+        np.multiply(self.__spectral_densities, dt**3 / 3, out=self.__block)
+        self.__process[self.__VALUES, self.__VALUES] = self.__block
+        np.multiply(self.__spectral_densities, dt**2 / 2, out=self.__block)
+        self.__process[self.__VALUES, self.__RATES] = self.__block
+        self.__process[self.__RATES, self.__VALUES] = self.__block
+        np.multiply(self.__spectral_densities, dt, out=self.__block)
+        self.__process[self.__RATES, self.__RATES] = self.__block
+
+        # P = F P F^T + Q
+        np.matmul(self.__transition, self.__covariance, out=self.__matrix)
+        np.matmul(self.__matrix, self.__transition.T, out=self.__covariance)
+        self.__covariance += self.__process
+
+    def __correct(self, i: int, value: float) -> None:
+        """
+        Applies the measurement of a single state field.
+        """
+        innovation = value - self.__state[i]
+        if i == self.__YAW:
+            innovation = (innovation + math.pi) % (2 * math.pi) - math.pi
+
+        # K = P H^T / (H P H^T + R) where H selects the field
+        np.divide(
+            self.__covariance[:, i], self.__covariance[i, i] + self.__variances[i], out=self.__gain
+        )
+
+        np.multiply(self.__gain, innovation, out=self.__vector)
+        self.__state += self.__vector
+        self.__state[self.__YAW] = (self.__state[self.__YAW] + math.pi) % (2 * math.pi) - math.pi
+
+        # P = P - K H P
+        self.__vector[:] = self.__covariance[i]
+        np.outer(self.__gain, self.__vector, out=self.__matrix)
+        self.__covariance -= self.__matrix
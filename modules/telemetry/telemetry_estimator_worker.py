@@ -0,0 +1,89 @@
+"""
+Estimator worker that outputs filtered telemetry at a fixed rate.
+"""
+
+import os
+import pathlib
+import time
+
+from utilities.workers import latest_value_channel
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import telemetry_estimator
+from ..common.modules.logger import logger
+
+
+INPUT_BATCH_SIZE = 10
+
+
+def telemetry_estimator_worker(
+    output_period: float,
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper | latest_value_channel.LatestValueChannel,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    output_period: Time in seconds between estimates, independent of the input rate.
+        Estimates start after the first sample, and missed estimates are skipped.
+    input_queue: Samples from the telemetry worker.
+    output_queue: Filtered samples to the consumer, such as the command worker.
+    controller: How the main process communicates to this worker process.
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    result, estimator = telemetry_estimator.TelemetryEstimator.create(local_logger)
+    if not result:
+        local_logger.error("Could not create estimator")
+        return
+
+    # Get Pylance to stop complaining
+    assert estimator is not None
+
+    estimate_count = 0
+    next_estimate_time = time.monotonic() + output_period
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        # Apply whatever arrives until the next estimate is due
+        wait = max(next_estimate_time - time.monotonic(), 0.0)
+        for data in input_queue.get_many(INPUT_BATCH_SIZE, wait):
+            # Skip sentinels
+            if data is None:
+                continue
+
+            estimator.update(data)
+
+        now = time.monotonic()
+        if now < next_estimate_time:
+            continue
+
+        next_estimate_time += output_period
+        if next_estimate_time <= now:
+            next_estimate_time = now + output_period
+
+        data = estimator.estimate(now)
+        if data is None:
+            continue
+
+        data.publish_time = time.monotonic()
+        output_queue.put(data)
+        estimate_count += 1
+
+    local_logger.info(
+        f"Applied {estimator.get_sample_count()} samples, output {estimate_count} estimates"
+    )
@@ -0,0 +1,133 @@
+"""
+Table of MAVLink message fields to extract into telemetry data.
+"""
+
+import operator
+from collections.abc import Callable
+
+from pymavlink import mavutil
+
+from ..common.modules.logger import logger
+
+
+# Message type: {TelemetryData field: message field, or (message field, scale)}
+DEFAULT_TABLE = {
+    "ATTITUDE": {
+        "attitude_time_since_boot": "time_boot_ms",
+        "roll": "roll",
+        "pitch": "pitch",
+        "yaw": "yaw",
+        "roll_speed": "rollspeed",
+        "pitch_speed": "pitchspeed",
+        "yaw_speed": "yawspeed",
+    },
+    "LOCAL_POSITION_NED": {
+        "position_time_since_boot": "time_boot_ms",
+        "x": "x",
+        "y": "y",
+        "z": "z",
+        "x_velocity": "vx",
+        "y_velocity": "vy",
+        "z_velocity": "vz",
+    },
+}
+
+
+def compile_table(
+    table: "dict[str, dict[str, str | tuple[str, float]]]",
+    fields: "tuple[str, ...]",
+    local_logger: logger.Logger,
+) -> "tuple[True, dict[int, Callable[[mavutil.mavlink.MAVLink_message, list], None]]] | tuple[False, None]":
+    """
+    Compiles the table into an extractor for each message ID.
+    An extractor writes the fields of a message into a list of values in the order of fields.
+    Message types not in the table have no extractor, so they are skipped before any access.
+    Message types and fields are checked against the MAVLink definitions up front,
+    so a typo fails here rather than on the first message.
+
+    table: Fields to extract from each message type, with an optional scale to apply.
+    fields: Names of the values, the TelemetryData fields.
+    local_logger: Logger to log an invalid table.
+
+    Returns the extractors by message ID.
+    """
+    field_indices = {field: i for i, field in enumerate(fields)}
+
+    extractors = {}
+    for message_type, mapping in table.items():
+        message_id = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}", None)
+        if message_id is None:
+            local_logger.error(f"Unknown message type {message_type}", True)
+            return False, None
+
+        if len(mapping) == 0:
+            local_logger.error(f"No fields to extract from {message_type}", True)
+            return False, None
+
+        message_field_names = mavutil.mavlink.mavlink_map[message_id].fieldnames
+
+        indices = []
+        message_fields = []
+        scales = []
+        for field, source in mapping.items():
+            index = field_indices.get(field)
+            if index is None:
+                local_logger.error(f"Unknown telemetry field {field} for {message_type}", True)
+                return False, None
+
+            message_field, scale = (source, None) if isinstance(source, str) else source
+            if message_field not in message_field_names:
+                local_logger.error(f"Unknown message field {message_field} of {message_type}", True)
+                return False, None
+
+            indices.append(index)
+            message_fields.append(message_field)
+            scales.append(scale)
+
+        extractors[message_id] = make_extractor(tuple(indices), tuple(message_fields), scales)
+
+    return True, extractors
+
+
+def make_extractor(
+    indices: "tuple[int, ...]",
+    message_fields: "tuple[str, ...]",
+    scales: "list[float | None]",
+) -> "Callable[[mavutil.mavlink.MAVLink_message, list], None]":
+    """
+    Builds the extractor, getting all fields of the message in a single call.
+    """
+    getter = make_getter(message_fields)
+
+    if all(scale is None for scale in scales):
+
+        def extract(message: "mavutil.mavlink.MAVLink_message", values: list) -> None:
+            for index, value in zip(indices, getter(message)):
+                values[index] = value
+
+        return extract
+
+    factors = tuple(1.0 if scale is None else scale for scale in scales)
+
+    def extract_scaled(message: "mavutil.mavlink.MAVLink_message", values: list) -> None:
+        for index, value, factor in zip(indices, getter(message), factors):
+            values[index] = value * factor
+
+    return extract_scaled
+
+
+def make_getter(
+    message_fields: "tuple[str, ...]",
+) -> "Callable[[mavutil.mavlink.MAVLink_message], tuple]":
+    """
+    Builds a getter of the fields of a message as a tuple, even if there is only one field.
+    """
+    if len(message_fields) > 1:
+        return operator.attrgetter(*message_fields)
+
+    field_getter = operator.attrgetter(message_fields[0])
+
+    def get_field(message: "mavutil.mavlink.MAVLink_message") -> tuple:
+        return (field_getter(message),)
+
+    return get_field
@@ -0,0 +1,209 @@
+"""
+Telemetry history.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+from collections.abc import Callable
+
+import numpy as np
+
+from . import telemetry
+
+
+DEFAULT_CAPACITY = 6000  # samples, 5 minutes at 20 Hz
+
+# Columns in TelemetryData layout order, the first is the time column
+FIELDS = telemetry.TelemetryData.FIELDS
+TIME_FIELD = FIELDS[0]
+TIME_SINCE_BOOT_FIELDS = {TIME_FIELD, "attitude_time_since_boot", "position_time_since_boot"}
+
+
+class TelemetryHistory:
+    """
+    Ring buffer of the most recent telemetry samples in shared memory,
+    with one preallocated NumPy column of float64 per TelemetryData field (None is NaN).
+
+    Each sample is written twice, at its index and at its index plus the capacity,
+    so the retained samples are always a contiguous slice of the columns in time order.
+    Queries binary search the time column, so samples must be appended in time order.
+
+    Written by the telemetry worker, readable from any process it is passed to.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """
+        Constructor allocates the columns in shared memory.
+
+        capacity: Number of most recent samples retained.
+        """
+        assert capacity > 0, "History requires capacity of at least 1"
+
+        self.__capacity = capacity
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=np.dtype(np.int64).itemsize
+            + len(FIELDS) * 2 * capacity * np.dtype(np.float64).itemsize,
+        )
+        self.__lock = mp.Lock()
+
+        self.__map_arrays()
+        self.__count[0] = 0
+
+    def __getstate__(self) -> "dict[str, object]":
+        # Arrays are views of the shared memory, so they are mapped again after unpickling
+        state = self.__dict__.copy()
+        del state["_TelemetryHistory__count"]
+        del state["_TelemetryHistory__columns"]
+        return state
+
+    def __setstate__(self, state: "dict[str, object]") -> None:
+        self.__dict__.update(state)
+        self.__map_arrays()
+
+    def append(self, data: telemetry.TelemetryData) -> bool:
+        """
+        Appends the sample, overwriting the oldest if full.
+
+        Returns False if the sample has no time since boot, in which case it is not stored.
+        """
+        if data.time_since_boot is None:
+            return False
+
+        row = [
+            np.nan if value is None else value for value in (getattr(data, name) for name in FIELDS)
+        ]
+
+        with self.__lock:
+            index = int(self.__count[0]) % self.__capacity
+            self.__columns[:, index] = row
+            self.__columns[:, index + self.__capacity] = row
+            self.__count[0] += 1
+
+        return True
+
+    def size(self) -> int:
+        """
+        Number of samples retained.
+        """
+        return min(int(self.__count[0]), self.__capacity)
+
+    def at(self, time_since_boot: int) -> "telemetry.TelemetryData | None":
+        """
+        Sample in effect at the time, which is the latest at or before it.
+
+        time_since_boot: Time in ms.
+
+        Returns None if every retained sample is after the time.
+        """
+        with self.__lock:
+            start, stop = self.__window()
+            i = np.searchsorted(self.__columns[0, start:stop], time_since_boot, "right") + start - 1
+            if i < start:
+                return None
+
+            row = self.__columns[:, i].copy()
+
+        return self.__to_telemetry_data(row)
+
+    def range(self, start_time: int, end_time: int) -> "dict[str, np.ndarray]":
+        """
+        Copies the columns of the samples from start time to end time, inclusive.
+
+        start_time: Time in ms.
+        end_time: Time in ms.
+
+        Returns each field by name, all empty if there are no samples in range.
+        """
+        with self.__lock:
+            columns = self.__columns[:, self.__slice(start_time, end_time)].copy()
+
+        return dict(zip(FIELDS, columns))
+
+    def aggregate(
+        self,
+        start_time: int,
+        end_time: int,
+        function: "Callable[..., np.ndarray]" = np.nanmean,
+    ) -> "telemetry.TelemetryData | None":
+        """
+        Aggregates each field over the samples from start time to end time, inclusive.
+
+        start_time: Time in ms.
+        end_time: Time in ms.
+        function: NumPy reduction with an axis argument, such as np.nanmean, np.nanmin
+            or np.nanmax, NaN aware so fields missing from some samples are ignored.
+
+        Returns the aggregates, None if there are no samples in range.
+        Fields missing from every sample in range are None.
+        """
+        with self.__lock:
+            columns = self.__columns[:, self.__slice(start_time, end_time)]
+            if columns.shape[1] == 0:
+                return None
+
+            # Reducing a column of only NaN warns, so those fields are left as NaN
+            is_present = ~np.isnan(columns).all(axis=1)
+            row = np.full(len(FIELDS), np.nan)
+            row[is_present] = function(columns[is_present], axis=1)
+
+        return self.__to_telemetry_data(row)
+
+    def close(self) -> None:
+        """
+        Frees the shared memory.
+        Call once from main after all workers have been joined.
+        """
+        self.__shared_memory.close()
+        self.__shared_memory.unlink()
+
+    def __map_arrays(self) -> None:
+        """
+        Maps the sample count and the columns onto the shared memory.
+        """
+        buffer = self.__shared_memory.buf
+        self.__count = np.ndarray((1,), np.int64, buffer)
+        self.__columns = np.ndarray(
+            (len(FIELDS), 2 * self.__capacity),
+            np.float64,
+            buffer,
+            np.dtype(np.int64).itemsize,
+        )
+
+    def __window(self) -> "tuple[int, int]":
+        """
+        Start and stop index of the retained samples in the columns, call under the lock.
+        """
+        count = int(self.__count[0])
+        if count <= self.__capacity:
+            return 0, count
+
+        start = count % self.__capacity
+        return start, start + self.__capacity
+
+    def __slice(self, start_time: int, end_time: int) -> slice:
+        """
+        Slice of the columns from start time to end time inclusive, call under the lock.
+        """
+        start, stop = self.__window()
+        times = self.__columns[0, start:stop]
+        return slice(
+            start + np.searchsorted(times, start_time, "left"),
+            start + np.searchsorted(times, end_time, "right"),
+        )
+
+    @staticmethod
+    def __to_telemetry_data(row: np.ndarray) -> telemetry.TelemetryData:
+        """
+        Converts a row of the columns, NaN becomes None and times become integers.
+        """
+        values = []
+        for name, value in zip(FIELDS, row.tolist()):
+            if np.isnan(value):
+                values.append(None)
+            elif name in TIME_SINCE_BOOT_FIELDS:
+                values.append(int(value))
+            else:
+                values.append(value)
+
+        return telemetry.TelemetryData(*values)
@@ -4,30 +4,38 @@ Telemtry worker that gathers GPS data.
 
 import os
 import pathlib
+import time
 
 from pymavlink import mavutil
 
+from utilities.workers import latest_value_channel
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import telemetry
+from . import telemetry_history
 from ..common.modules.logger import logger
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+# Output at the attitude rate with the position interpolated to each attitude,
+# rather than on every update of either with mismatched timestamps
+ALIGN_TO_ATTITUDE = True
+
+
 def telemetry_worker(
     connection: mavutil.mavfile,
+    history: telemetry_history.TelemetryHistory | None,
+    output: queue_proxy_wrapper.QueueProxyWrapper | latest_value_channel.LatestValueChannel,
     controller: worker_controller.WorkerController,
-    local_logger: logger.Logger,
-    output: queue_proxy_wrapper.QueueProxyWrapper,
 ) -> None:
     """
     Worker process.
 
     connection: Connection to Drone using MavLink
-    output: queue of things to be acted upon by workers
-    local_logger: instance of logger class that writes in logs files
+    history: history store to record every sample into, None to not record
+    output: queue or latest value channel of things to be acted upon by workers
     controller: Controls interactivity of workers
     """
     # =============================================================================================
@@ -59,15 +67,22 @@ def telemetry_worker(
     local_logger.info("Telemetry instance created")
 
     # Main loop: do work.
-    while not controller.is_exit_requested():
-        controller.check_pause()
+    # Each update yields data, rather than waiting for a fresh pair
+    for sequence, data in enumerate(telemetry_instance.stream(ALIGN_TO_ATTITUDE)):
+        # Trace the sample to measure its latency through to main
+        data.sequence = sequence
+        data.publish_time = time.monotonic()
+        output.put(data)
+        if history is not None:
+            history.append(data)
+        local_logger.info(f"Telemetry data {data}")
 
-        value, data = telemetry_instance.run()
-        if not value:
-            local_logger.warning("Telemetry data not received, timed out")
+        if controller.is_exit_requested():
             break
-        output.queue.put(data)
-        local_logger.info(f"Telemetry data {data}")
+
+        controller.check_pause()
+    else:
+        local_logger.warning("Telemetry data not received, timed out")
 
 
 # =================================================================================================
@@ -249,10 +249,11 @@ def main() -> int:
         # Place your own arguments here
         connection,
         TARGET,
+        None,
+        None,
+        telemetry_queue,
         output_queue,
-        main_logger,
         controller,
-        telemetry_queue,
     )
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -139,7 +139,7 @@ def main() -> int:
         ),
     ).start()
 
-    heartbeat_receiver_worker.heartbeat_receiver_worker(connection, main_logger, queue, controller)
+    heartbeat_receiver_worker.heartbeat_receiver_worker(connection, queue, controller)
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
     # =============================================================================================
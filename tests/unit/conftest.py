@@ -0,0 +1,53 @@
+"""
+Skips the tests of modules that log when the common submodule is not checked out.
+"""
+
+import pathlib
+
+import pytest
+
+
+LOGGER_PATH = pathlib.Path(__file__).parents[2] / "modules" / "common" / "modules" / "logger"
+
+# Tests of modules that import the logger of the common submodule
+LOGGER_TESTS = [
+    "test_command.py",
+    "test_command_worker.py",
+    "test_heartbeat_receiver_worker.py",
+    "test_heartbeat_sender_worker.py",
+    "test_mavlink_router.py",
+    "test_mavlink_router_worker.py",
+    "test_state_predictor.py",
+    "test_telemetry.py",
+    "test_telemetry_decimator.py",
+    "test_telemetry_decimator_worker.py",
+    "test_telemetry_estimator.py",
+    "test_telemetry_extractors.py",
+    "test_telemetry_history.py",
+    "test_worker_manager.py",
+    "test_worker_supervisor.py",
+]
+
+
+# Ancestors are from pytest
+# pylint: disable-next=too-many-ancestors
+class LoggerMissingModule(pytest.Module):
+    """
+    Test module that is reported as skipped instead of imported.
+    """
+
+    def collect(self) -> "list[pytest.Item]":
+        pytest.skip(f"Logger not found at {LOGGER_PATH}, check out the common submodule")
+
+
+def pytest_pycollect_makemodule(
+    module_path: pathlib.Path, parent: pytest.Collector
+) -> "LoggerMissingModule | None":
+    """
+    Skips the logger tests visibly when the logger is missing, so the lost coverage shows
+    in the summary instead of the tests silently not being collected.
+    """
+    if module_path.name not in LOGGER_TESTS or LOGGER_PATH.is_dir():
+        return None
+
+    return LoggerMissingModule.from_parent(parent, path=module_path)
@@ -0,0 +1,42 @@
+"""
+Logger for unit tests of modules that log.
+"""
+
+
+class RecordingLogger:
+    """
+    Stands in for the logger, recording the level and message of each log instead of logging.
+    """
+
+    def __init__(self) -> None:
+        self.messages: "list[tuple[str, str]]" = []
+
+    def debug(self, message: str, _: bool = False) -> None:
+        """
+        Records the message.
+        """
+        self.messages.append(("debug", message))
+
+    def info(self, message: str, _: bool = False) -> None:
+        """
+        Records the message.
+        """
+        self.messages.append(("info", message))
+
+    def warning(self, message: str, _: bool = False) -> None:
+        """
+        Records the message.
+        """
+        self.messages.append(("warning", message))
+
+    def error(self, message: str, _: bool = False) -> None:
+        """
+        Records the message.
+        """
+        self.messages.append(("error", message))
+
+    def get_levels(self, message: str) -> "list[str]":
+        """
+        Levels the message was logged at.
+        """
+        return [level for level, logged in self.messages if logged == message]
@@ -0,0 +1,140 @@
+"""
+Test the decisions of the command logic.
+"""
+
+import pytest
+
+from modules.command import command
+from modules.command import command_dispatcher
+from modules.telemetry import telemetry
+from tests.unit import recording_logger
+from tests.unit import test_command_dispatcher
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+@pytest.fixture()
+def connection() -> test_command_dispatcher.RecordingConnection:  # type: ignore
+    """
+    Connection that records sends.
+    """
+    yield test_command_dispatcher.RecordingConnection()  # type: ignore
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> test_command_dispatcher.FakeClock:  # type: ignore
+    """
+    Replaces the time of the dispatcher.
+    """
+    fake_clock = test_command_dispatcher.FakeClock()
+    monkeypatch.setattr(command_dispatcher.time, "monotonic", fake_clock.monotonic)
+    yield fake_clock  # type: ignore
+
+
+def create_command(
+    connection: test_command_dispatcher.RecordingConnection,
+    target: command.Position,
+    local_logger: recording_logger.RecordingLogger,
+) -> command.Command:
+    """
+    Command without history or mission.
+    """
+    result, command_instance = command.Command.create(connection, target, local_logger)
+    assert result
+    assert command_instance is not None
+
+    return command_instance
+
+
+def state(
+    x: float, y: float, z: "float | None", yaw: "float | None" = 0.0
+) -> telemetry.TelemetryData:
+    """
+    Stationary state, untraced so it is not predicted forward.
+    """
+    return telemetry.TelemetryData(
+        x=x, y=y, z=z, x_velocity=0.0, y_velocity=0.0, z_velocity=0.0, yaw=yaw
+    )
+
+
+class TestRun:
+    """
+    Decisions on each sample.
+    """
+
+    def test_repeat_logged_at_debug(
+        self,
+        connection: test_command_dispatcher.RecordingConnection,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        Suppressing an unchanged command on every sample is not worth an info log each time.
+        """
+        # Setup
+        command_instance = create_command(connection, command.Position(0, 0, 30), local_logger)
+
+        # Run
+        result_first, report = command_instance.run(state(0, 0, 20))
+        result_repeat, _ = command_instance.run(state(0, 0, 20))
+
+        # Test
+        assert result_first
+        assert report is not None
+        assert str(report) == "CHANGE_ALTITUDE 10.00"
+        assert not result_repeat
+        assert len(connection.mav.sent) == 1
+        assert local_logger.get_levels("Altitude change suppressed as a repeat") == ["debug"]
+
+    def test_altitude_overshoot(
+        self,
+        connection: test_command_dispatcher.RecordingConnection,
+        local_logger: recording_logger.RecordingLogger,
+        clock: test_command_dispatcher.FakeClock,
+    ) -> None:
+        """
+        The same altitude is commanded again once the drone overshoots it,
+        even though the parameters of the command are unchanged.
+        """
+        # Setup
+        command_instance = create_command(connection, command.Position(0, 0, 30), local_logger)
+        command_instance.run(state(0, 0, 29))
+        clock.now += 0.5
+
+        # Run
+        result, report = command_instance.run(state(0, 0, 31))
+
+        # Test
+        assert result
+        assert report is not None
+        assert str(report) == "CHANGE_ALTITUDE -1.00"
+        assert len(connection.mav.sent) == 2
+
+    def test_missing_altitude(
+        self,
+        connection: test_command_dispatcher.RecordingConnection,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        Without an altitude the yaw is still corrected.
+        """
+        # Setup
+        command_instance = create_command(connection, command.Position(0, 10, 30), local_logger)
+
+        # Run
+        result, report = command_instance.run(state(0, 0, None))
+
+        # Test
+        assert result
+        assert report is not None
+        assert str(report) == "CHANGING YAW 90.00"
@@ -0,0 +1,319 @@
+"""
+Test the command dispatcher.
+"""
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.command import command_dispatcher
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+ALTITUDE = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+YAW = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+
+
+class RecordingMav:
+    """
+    Records the commands sent instead of sending them.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Records the arguments.
+        """
+        self.sent.append(args)
+
+
+class RecordingConnection:
+    """
+    Stands in for the connection, receiving the messages in the inbox.
+    """
+
+    def __init__(self) -> None:
+        self.mav = RecordingMav()
+        self.inbox = []
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Next message in the inbox, None if empty.
+        """
+        if len(self.inbox) == 0:
+            return None
+
+        return self.inbox.pop(0)
+
+
+@pytest.fixture()
+def connection() -> RecordingConnection:  # type: ignore
+    """
+    Connection that records sends.
+    """
+    yield RecordingConnection()  # type: ignore
+
+
+class FakeClock:
+    """
+    Monotonic time that only moves when advanced.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        """
+        Current time.
+        """
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:  # type: ignore
+    """
+    Replaces the time of the dispatcher.
+    """
+    fake_clock = FakeClock()
+    monkeypatch.setattr(command_dispatcher.time, "monotonic", fake_clock.monotonic)
+    yield fake_clock  # type: ignore
+
+
+class TestCommandDispatcher:
+    """
+    Suppression of repeated commands.
+    """
+
+    def test_first_send(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        The first command is always sent, as COMMAND_LONG to the target.
+        """
+        _ = clock
+        dispatcher = command_dispatcher.CommandDispatcher(connection)
+
+        # Run
+        result = dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+
+        # Test
+        assert result
+        assert connection.mav.sent == [(1, 0, ALTITUDE, 0, 1, 0, 0, 0, 0, 0, 30)]
+
+    def test_min_interval(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        Even a changed command is suppressed within the minimum interval.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(connection, 0.5, 5.0)
+        dispatcher.send(YAW, (90, 5, -1, 1, 0, 0, 0))
+
+        # Run
+        clock.now += 0.1
+        result_early = dispatcher.send(YAW, (45, 5, -1, 1, 0, 0, 0))
+        clock.now += 0.5
+        result_late = dispatcher.send(YAW, (45, 5, -1, 1, 0, 0, 0))
+
+        # Test
+        assert not result_early
+        assert result_late
+        assert dispatcher.get_suppressed_counts() == {YAW: 1}
+
+    def test_unchanged_repeat(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        An acknowledged command within tolerance is suppressed until the repeat interval.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(connection, 0.5, 5.0)
+        dispatcher.send(YAW, (90, 5, -1, 1, 0, 0, 0))
+        connection.inbox.append(mavutil.mavlink.MAVLink_command_ack_message(YAW, 0))
+        dispatcher.update()
+
+        # Run
+        clock.now += 1.0
+        result_within = dispatcher.send(YAW, (88, 5, -1, 1, 0, 0, 0))
+        clock.now += 4.0
+        result_repeat = dispatcher.send(YAW, (88, 5, -1, 1, 0, 0, 0))
+
+        # Test
+        assert not result_within
+        assert result_repeat
+        assert len(connection.mav.sent) == 2
+
+    def test_error_corrected(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        An unchanged command is suppressed while its error shrinks on the same side of 0.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(connection, 0.25, 5.0)
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30), errors=(2.0,))
+
+        # Run
+        clock.now += 0.5
+        result_closer = dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30), errors=(1.5,))
+        clock.now += 0.5
+        result_overshoot = dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30), errors=(-1.0,))
+
+        # Test
+        assert not result_closer
+        assert result_overshoot
+        assert len(connection.mav.sent) == 2
+
+    def test_error_grows(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        An unchanged command is sent again once its error grows by more than the tolerance.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(connection, 0.25, 5.0)
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30), errors=(1.0,))
+
+        # Run
+        clock.now += 0.5
+        result_within = dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30), errors=(1.4,))
+        clock.now += 0.5
+        result_grown = dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30), errors=(1.6,))
+
+        # Test
+        assert not result_within
+        assert result_grown
+
+    def test_commands_independent(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        Each command is limited separately.
+        """
+        _ = clock
+        dispatcher = command_dispatcher.CommandDispatcher(connection)
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+
+        # Run
+        result = dispatcher.send(YAW, (90, 5, -1, 1, 0, 0, 0))
+
+        # Test
+        assert result
+        assert len(dispatcher.get_suppressed_counts()) == 0
+
+
+class TestCommandAcknowledgement:
+    """
+    Pending commands, round trip time, retransmits and expiry.
+    """
+
+    def test_round_trip_time(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        An acknowledgement completes the pending command and measures the round trip.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(connection)
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+        connection.inbox.append(mavutil.mavlink.MAVLink_heartbeat_message(6, 8, 0, 0, 0, 3))
+        connection.inbox.append(mavutil.mavlink.MAVLink_command_ack_message(ALTITUDE, 0))
+
+        # Run
+        clock.now += 0.2
+        dispatcher.update()
+
+        # Test
+        assert dispatcher.get_pending_count() == 0
+        assert dispatcher.get_round_trip_times() == {ALTITUDE: pytest.approx(0.2)}
+        assert dispatcher.get_ack_results() == {ALTITUDE: 0}
+
+    def test_retransmit(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        An unacknowledged idempotent command is retransmitted with the confirmation incremented
+        instead of being sent again.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(
+            connection, ack_timeout=1.0, max_retransmits=3
+        )
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+
+        # Run
+        clock.now += 1.0
+        dispatcher.update()
+        clock.now += 5.0
+        result = dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+
+        # Test
+        assert not result
+        assert [sent[3] for sent in connection.mav.sent] == [0, 1]
+        assert dispatcher.get_retransmit_counts() == {ALTITUDE: 1}
+
+    def test_retransmits_off(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        By default an unacknowledged command expires without being retransmitted.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(connection, ack_timeout=1.0)
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+
+        # Run
+        clock.now += 1.0
+        dispatcher.update()
+
+        # Test
+        assert [sent[3] for sent in connection.mav.sent] == [0]
+        assert dispatcher.get_pending_count() == 0
+        assert dispatcher.get_expired_counts() == {ALTITUDE: 1}
+
+    def test_relative_yaw_not_retransmitted(
+        self, connection: RecordingConnection, clock: FakeClock
+    ) -> None:
+        """
+        A relative yaw would turn again if the first was executed and only its ack was lost,
+        so it expires instead, while an absolute yaw is retransmitted.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(
+            connection, ack_timeout=1.0, max_retransmits=3
+        )
+        dispatcher.send(YAW, (90, 5, -1, 1, 0, 0, 0))
+
+        # Run
+        clock.now += 1.0
+        dispatcher.update()
+        clock.now += 1.0
+        dispatcher.send(YAW, (45, 5, -1, 0, 0, 0, 0))
+        clock.now += 1.0
+        dispatcher.update()
+
+        # Test
+        assert [(sent[3], sent[7]) for sent in connection.mav.sent] == [(0, 1), (0, 0), (1, 0)]
+        assert dispatcher.get_expired_counts() == {YAW: 1}
+        assert dispatcher.get_retransmit_counts() == {YAW: 1}
+
+    def test_retransmit_not_measured(
+        self, connection: RecordingConnection, clock: FakeClock
+    ) -> None:
+        """
+        The round trip of a retransmitted command is ambiguous so it is not measured.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(
+            connection, ack_timeout=1.0, max_retransmits=3
+        )
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+        clock.now += 1.0
+        dispatcher.update()
+        connection.inbox.append(mavutil.mavlink.MAVLink_command_ack_message(ALTITUDE, 0))
+
+        # Run
+        dispatcher.update()
+
+        # Test
+        assert dispatcher.get_pending_count() == 0
+        assert len(dispatcher.get_round_trip_times()) == 0
+
+    def test_expiry(self, connection: RecordingConnection, clock: FakeClock) -> None:
+        """
+        A command expires after the maximum retransmits.
+        """
+        dispatcher = command_dispatcher.CommandDispatcher(
+            connection, ack_timeout=1.0, max_retransmits=2
+        )
+        dispatcher.send(ALTITUDE, (1, 0, 0, 0, 0, 0, 30))
+
+        # Run
+        for _ in range(3):
+            clock.now += 1.0
+            dispatcher.update()
+
+        # Test
+        assert len(connection.mav.sent) == 3
+        assert dispatcher.get_pending_count() == 0
+        assert dispatcher.get_expired_counts() == {ALTITUDE: 1}
@@ -0,0 +1,106 @@
+"""
+Test the command report latencies.
+"""
+
+import pytest
+
+from modules.command import command_report
+
+
+def traced_report(start: float) -> command_report.CommandReport:
+    """
+    Report whose stages take 1, 2, 3, 4 ms from the start.
+    """
+    return command_report.CommandReport(
+        "CHANGE_ALTITUDE 1.00",
+        0,
+        start,
+        start + 0.001,
+        start + 0.003,
+        start + 0.006,
+        start + 0.010,
+    )
+
+
+class TestCommandReport:
+    """
+    Result string and stage latencies.
+    """
+
+    def test_str_is_message(self) -> None:
+        """
+        Converts to the result string.
+        """
+        # Run
+        report = command_report.CommandReport("CHANGING YAW 10.00")
+
+        # Test
+        assert str(report) == "CHANGING YAW 10.00"
+
+    def test_stage_latencies(self) -> None:
+        """
+        Each stage is the time between consecutive trace times.
+        """
+        # Setup
+        report = traced_report(100.0)
+
+        # Run
+        latencies = report.stage_latencies(100.015)
+
+        # Test
+        assert latencies is not None
+        assert [latencies[stage] for stage in command_report.STAGES] == pytest.approx(
+            [0.001, 0.002, 0.003, 0.004, 0.005]
+        )
+        assert latencies[command_report.TOTAL] == pytest.approx(0.015)
+
+    def test_untraced(self) -> None:
+        """
+        Untraced reports have no latencies and are not recorded.
+        """
+        # Setup
+        recorder = command_report.LatencyRecorder()
+
+        # Run
+        result = recorder.add(command_report.CommandReport("CHANGING YAW 10.00"), 1.0)
+
+        # Test
+        assert not result
+        assert recorder.percentiles()[command_report.TOTAL] == []
+
+
+class TestLatencyRecorder:
+    """
+    Percentiles of recorded latencies.
+    """
+
+    def test_percentiles(self) -> None:
+        """
+        Nearest rank percentiles of 100 reports with totals of 1 to 100 ms.
+        """
+        # Setup
+        recorder = command_report.LatencyRecorder()
+        for i in range(1, 101):
+            recorder.add(traced_report(0.0), 0.010 + (i - 10) / 1000)
+
+        # Run
+        percentiles = recorder.percentiles()
+
+        # Test
+        assert percentiles[command_report.TOTAL] == pytest.approx([0.050, 0.095, 0.099])
+        assert percentiles["parse"] == pytest.approx([0.001, 0.001, 0.001])
+
+    def test_capacity(self) -> None:
+        """
+        Only the most recent reports are kept.
+        """
+        # Setup
+        recorder = command_report.LatencyRecorder(2)
+        for arrival_time in [1.0, 0.02, 0.03]:
+            recorder.add(traced_report(0.0), arrival_time)
+
+        # Run
+        percentiles = recorder.percentiles((100,))
+
+        # Test
+        assert percentiles[command_report.TOTAL] == pytest.approx([0.03])
@@ -0,0 +1,138 @@
+"""
+Test starting the command worker.
+"""
+
+import pathlib
+
+import pytest
+
+from modules.command import command
+from modules.command import command_worker
+from tests.unit import recording_logger
+from tests.unit import test_command_dispatcher
+from tests.unit import test_mavlink_router
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger(monkeypatch: pytest.MonkeyPatch) -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger created by the worker.
+    """
+    fake_logger = recording_logger.RecordingLogger()
+    monkeypatch.setattr(
+        command_worker.logger.Logger,
+        "create",
+        lambda name, enable_log_to_file: (True, fake_logger),
+    )
+    yield fake_logger  # type: ignore
+
+
+@pytest.fixture()
+def created_commands(monkeypatch: pytest.MonkeyPatch) -> "list[command.Command]":  # type: ignore
+    """
+    Commands created by the worker.
+    """
+    commands = []
+    create = command.Command.create
+
+    def record_create(*args: object) -> "tuple[bool, command.Command | None]":
+        result, command_instance = create(*args)
+        commands.append(command_instance)
+        return result, command_instance
+
+    monkeypatch.setattr(command.Command, "create", record_create)
+    yield commands  # type: ignore
+
+
+def run_worker(mission_path: "str | None") -> None:
+    """
+    Runs the worker until it reaches its loop, as exit is already requested.
+    """
+    controller = worker_controller.WorkerController()
+    controller.request_exit()
+    command_worker.command_worker(
+        test_command_dispatcher.RecordingConnection(),
+        command.Position(0, 0, 30),
+        None,
+        mission_path,
+        test_mavlink_router.ListQueue(),
+        test_mavlink_router.ListQueue(),
+        controller,
+    )
+
+
+class TestCommandWorker:
+    """
+    Loading the mission from its path.
+    """
+
+    def test_without_mission(
+        self,
+        local_logger: recording_logger.RecordingLogger,
+        created_commands: "list[command.Command]",
+    ) -> None:
+        """
+        Flies to the target.
+        """
+        _ = local_logger
+
+        # Run
+        run_worker(None)
+
+        # Test
+        assert len(created_commands) == 1
+        assert created_commands[0].mission is None
+        assert created_commands[0].target.z == 30
+
+    def test_mission(
+        self,
+        tmp_path: pathlib.Path,
+        local_logger: recording_logger.RecordingLogger,
+        created_commands: "list[command.Command]",
+    ) -> None:
+        """
+        The first waypoint replaces the target.
+        """
+        _ = local_logger
+
+        # Setup
+        mission_path = tmp_path / "mission.csv"
+        mission_path.write_text("# x, y, z\n5, 0, 10\n0, 5, 10\n", encoding="utf-8")
+
+        # Run
+        run_worker(str(mission_path))
+
+        # Test
+        assert len(created_commands) == 1
+        assert created_commands[0].mission is not None
+        assert created_commands[0].mission.get_remaining() == 2
+        assert (
+            created_commands[0].target.x,
+            created_commands[0].target.y,
+            created_commands[0].target.z,
+        ) == (5, 0, 10)
+
+    def test_missing_mission(
+        self,
+        tmp_path: pathlib.Path,
+        local_logger: recording_logger.RecordingLogger,
+        created_commands: "list[command.Command]",
+    ) -> None:
+        """
+        A mission that cannot be loaded stops the worker instead of flying to the target.
+        """
+        # Setup
+        mission_path = tmp_path / "missing.csv"
+
+        # Run
+        run_worker(str(mission_path))
+
+        # Test
+        assert len(created_commands) == 0
+        assert local_logger.get_levels(f"Could not load mission {mission_path}") == ["error"]
@@ -0,0 +1,103 @@
+"""
+Test the heartbeat receiver worker with the arguments main gives it.
+"""
+
+import threading
+import time
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.heartbeat import heartbeat_receiver_worker
+from tests.unit import recording_logger
+from tests.unit import test_mavlink_router
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+class HeartbeatConnection:
+    """
+    Stands in for the connection, receiving the heartbeats in the inbox.
+    """
+
+    def __init__(self) -> None:
+        self.inbox = []
+        self.is_closed = False
+
+    def recv_match(
+        self, type: str, blocking: bool, timeout: float  # pylint: disable=redefined-builtin
+    ) -> mavutil.mavlink.MAVLink_message | None:
+        """
+        Next heartbeat in the inbox, None after a short wait if empty.
+        """
+        assert type == "HEARTBEAT"
+        assert blocking
+        assert timeout > 0.0
+        if len(self.inbox) == 0:
+            time.sleep(0.01)
+            return None
+
+        return self.inbox.pop(0)
+
+    def close(self) -> None:
+        """
+        Records the close.
+        """
+        self.is_closed = True
+
+
+@pytest.fixture()
+def local_logger(monkeypatch: pytest.MonkeyPatch) -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger created by the worker.
+    """
+    fake_logger = recording_logger.RecordingLogger()
+    monkeypatch.setattr(
+        heartbeat_receiver_worker.logger.Logger,
+        "create",
+        lambda name, enable_log_to_file: (True, fake_logger),
+    )
+    yield fake_logger  # type: ignore
+
+
+class TestHeartbeatReceiverWorker:
+    """
+    Reporting the connection status until exit.
+    """
+
+    def test_status(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Statuses go to the output queue, given the connection, output queue and controller.
+        """
+        _ = local_logger
+
+        # Setup
+        connection = HeartbeatConnection()
+        connection.inbox.append(test_mavlink_router.heartbeat())
+        output_queue = test_mavlink_router.ListQueue()
+        controller = worker_controller.WorkerController()
+        worker = threading.Thread(
+            target=heartbeat_receiver_worker.heartbeat_receiver_worker,
+            args=(connection, output_queue, controller),
+        )
+
+        # Run
+        worker.start()
+        for _ in range(0, 100):
+            if len(output_queue.items) >= 6:
+                break
+            time.sleep(0.01)
+        controller.request_exit()
+        worker.join(1.0)
+
+        # Test
+        assert not worker.is_alive()
+        assert connection.is_closed
+        # Connected on the heartbeat, then disconnected after 5 misses
+        assert output_queue.items[0] == "Connected"
+        assert output_queue.items[5] == "Disconnected"
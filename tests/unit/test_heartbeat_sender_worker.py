@@ -0,0 +1,76 @@
+"""
+Test the heartbeat sender worker with the arguments main gives it.
+"""
+
+import threading
+import time
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.heartbeat import heartbeat_sender_worker
+from tests.unit import recording_logger
+from tests.unit import test_mavlink_router
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger(monkeypatch: pytest.MonkeyPatch) -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger created by the worker.
+    """
+    fake_logger = recording_logger.RecordingLogger()
+    monkeypatch.setattr(
+        heartbeat_sender_worker.logger.Logger,
+        "create",
+        lambda name, enable_log_to_file: (True, fake_logger),
+    )
+    yield fake_logger  # type: ignore
+
+
+class TestHeartbeatSenderWorker:
+    """
+    Sending heartbeats until exit.
+    """
+
+    def test_send(
+        self, monkeypatch: pytest.MonkeyPatch, local_logger: recording_logger.RecordingLogger
+    ) -> None:
+        """
+        A ground station heartbeat every period, with the connection and controller only.
+        """
+        _ = local_logger
+
+        # Setup
+        monkeypatch.setattr(heartbeat_sender_worker, "HEARTBEAT_PERIOD", 0.05)
+        connection = test_mavlink_router.PipeConnection()
+        controller = worker_controller.WorkerController()
+        worker = threading.Thread(
+            target=heartbeat_sender_worker.heartbeat_sender_worker,
+            args=(connection, controller),
+        )
+
+        # Run
+        worker.start()
+        time.sleep(0.22)
+        controller.request_exit()
+        worker.join(1.0)
+        connection.close()
+
+        # Test
+        assert not worker.is_alive()
+        # Once on start and every period after, including the one it was waiting for on exit
+        assert 3 <= len(connection.mav.sent) <= 6
+        assert connection.mav.sent[0][0] == (
+            mavutil.mavlink.MAV_TYPE_GCS,
+            mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+            0,
+            0,
+            0,
+        )
@@ -0,0 +1,99 @@
+"""
+Test the latest value channel.
+"""
+
+import pytest
+
+from utilities.workers import latest_value_channel
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def channel() -> latest_value_channel.LatestValueChannel:  # type: ignore
+    """
+    Creates a channel with 2 keys and frees it afterwards.
+    """
+    latest = latest_value_channel.LatestValueChannel(("attitude", "position"))
+    yield latest  # type: ignore
+    latest.close()
+
+
+class TestLatestValueChannel:
+    """
+    Overwrite on put, read latest on get.
+    """
+
+    def test_nothing_put(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Getting before any put fails without waiting.
+        """
+        # Run
+        result, sequence, value = channel.get("attitude", 0, 0.0)
+
+        # Test
+        assert not result
+        assert sequence == 0
+        assert value is None
+
+    def test_overwrite(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        Only the last put is returned, with the number of puts as the sequence number.
+        """
+        # Setup
+        channel.put(1.0, "attitude")
+        channel.put(2.0, "attitude")
+
+        # Run
+        result, sequence, value = channel.get("attitude")
+
+        # Test
+        assert result
+        assert sequence == 2
+        assert value == 2.0
+
+    def test_nothing_new(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        A reader that has seen the latest sequence number times out.
+        """
+        # Setup
+        sequence = channel.put("first", "position")
+
+        # Run
+        result, actual_sequence, _ = channel.get("position", sequence, 0.01)
+
+        # Test
+        assert not result
+        assert actual_sequence == sequence
+
+    def test_keys_independent(self, channel: latest_value_channel.LatestValueChannel) -> None:
+        """
+        A put only changes its own key.
+        """
+        # Run
+        channel.put("attitude", "attitude")
+
+        # Test
+        assert channel.sequence("attitude") == 1
+        assert channel.sequence("position") == 0
+
+    def test_get_many(self) -> None:
+        """
+        A batch read returns each new value once.
+        """
+        # Setup
+        latest = latest_value_channel.LatestValueChannel()
+
+        # Run
+        count = latest.put_many([1, 2, 3])
+        first = latest.get_many(10)
+        second = latest.get_many(10, 0.01)
+        latest.close()
+
+        # Test
+        assert count == 3
+        assert first == [3]
+        assert len(second) == 0
@@ -0,0 +1,401 @@
+"""
+Test the MAVLink router and its subscribers.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.mavlink_router import mavlink_router
+from modules.mavlink_router import message_statistics
+from tests.unit import recording_logger
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+class ListQueue:
+    """
+    Stands in for a queue, without waiting.
+    """
+
+    def __init__(self) -> None:
+        self.items = []
+
+    def put(self, item: object) -> None:
+        """
+        Appends the item.
+        """
+        self.items.append(item)
+
+    def get_many(self, max_count: int, _: float = 0.0) -> "list[object]":
+        """
+        Removes and returns the oldest items.
+        """
+        items = self.items[:max_count]
+        self.items = self.items[max_count:]
+        return items
+
+
+class RecordingMav:
+    """
+    Records the messages sent, and whether the connection was being received at the time.
+    """
+
+    def __init__(self, connection: "PipeConnection") -> None:
+        self.__connection = connection
+        self.sent = []
+
+    def heartbeat_send(self, *args: object) -> None:
+        """
+        Records the arguments.
+        """
+        self.sent.append((args, self.__connection.is_receiving))
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Always fails.
+        """
+        raise ValueError(args)
+
+
+class PipeConnection:
+    """
+    Stands in for the connection, readable when there are messages in the inbox.
+    """
+
+    def __init__(self, receive_delay: float = 0.0) -> None:
+        self.__read_fd, self.__write_fd = os.pipe()
+        self.__receive_delay = receive_delay
+        self.fd = self.__read_fd
+        self.mav = RecordingMav(self)
+        self.inbox = []
+        self.is_receiving = False
+
+    def deliver(self, message: "mavutil.mavlink.MAVLink_message") -> None:
+        """
+        Adds the message to the inbox and makes the connection readable.
+        """
+        self.inbox.append(message)
+        os.write(self.__write_fd, b"\0")
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Next message in the inbox, None if empty.
+        """
+        self.is_receiving = True
+        time.sleep(self.__receive_delay)
+        self.is_receiving = False
+
+        if len(self.inbox) == 0:
+            return None
+
+        os.read(self.__read_fd, 1)
+        return self.inbox.pop(0)
+
+    def close(self) -> None:
+        """
+        Closes the pipe.
+        """
+        os.close(self.__read_fd)
+        os.close(self.__write_fd)
+
+
+class DescriptorlessConnection(PipeConnection):
+    """
+    Stands in for a connection that cannot be waited on, such as a serial port on Windows.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fd = None
+        self.timeouts = []
+
+    def recv_match(
+        self, blocking: bool = False, timeout: "float | None" = None
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Records the timeout and returns the next message.
+        """
+        assert blocking
+        self.timeouts.append(timeout)
+        return self.recv_msg()
+
+
+def heartbeat() -> "mavutil.mavlink.MAVLink_heartbeat_message":
+    """
+    Heartbeat of a quadcopter.
+    """
+    return mavutil.mavlink.MAVLink_heartbeat_message(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA, 0, 0, 0, 3
+    )
+
+
+def attitude() -> "mavutil.mavlink.MAVLink_attitude_message":
+    """
+    Level attitude.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+@pytest.fixture()
+def connection() -> PipeConnection:  # type: ignore
+    """
+    Connection with an empty inbox.
+    """
+    pipe_connection = PipeConnection()
+    yield pipe_connection  # type: ignore
+    pipe_connection.close()
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+class TestMavlinkRouter:
+    """
+    Routing of received messages and sending of queued sends.
+    """
+
+    def test_create_without_routes(self, connection: PipeConnection) -> None:
+        """
+        A router must route something.
+        """
+        # Run
+        result, router = mavlink_router.MavlinkRouter.create(
+            connection, {}, ListQueue(), recording_logger.RecordingLogger()
+        )
+
+        # Test
+        assert not result
+        assert router is None
+
+    def test_receive_routes_by_type(
+        self, connection: PipeConnection, local_logger: recording_logger.RecordingLogger
+    ) -> None:
+        """
+        Every buffered message is routed to the queues of its type, others are discarded.
+        """
+        # Setup
+        heartbeat_queue = ListQueue()
+        telemetry_queue = ListQueue()
+        statistics = message_statistics.MessageStatistics(["HEARTBEAT", "ATTITUDE"])
+        result, router = mavlink_router.MavlinkRouter.create(
+            connection,
+            {"HEARTBEAT": [heartbeat_queue, telemetry_queue], "ATTITUDE": [telemetry_queue]},
+            ListQueue(),
+            local_logger,
+            statistics,
+        )
+        assert result
+        assert router is not None
+
+        connection.deliver(heartbeat())
+        connection.deliver(mavutil.mavlink.MAVLink_command_ack_message(0, 0))
+        connection.deliver(attitude())
+
+        # Run
+        count = router.receive(0.1)
+
+        # Test
+        assert count == 3
+        assert [message.get_type() for message in heartbeat_queue.items] == ["HEARTBEAT"]
+        assert [message.get_type() for message in telemetry_queue.items] == [
+            "HEARTBEAT",
+            "ATTITUDE",
+        ]
+        assert statistics.snapshot()["HEARTBEAT"].count == 1
+        assert statistics.snapshot()["ATTITUDE"].count == 1
+
+    def test_receive_timeout(
+        self, connection: PipeConnection, local_logger: recording_logger.RecordingLogger
+    ) -> None:
+        """
+        Nothing is routed from a quiet connection, and it is not read.
+        """
+        # Setup
+        result, router = mavlink_router.MavlinkRouter.create(
+            connection, {"HEARTBEAT": [ListQueue()]}, ListQueue(), local_logger
+        )
+        assert result
+        assert router is not None
+
+        # Run
+        start_time = time.monotonic()
+        count = router.receive(0.05)
+        elapsed_time = time.monotonic() - start_time
+
+        # Test
+        assert count == 0
+        assert elapsed_time >= 0.05
+        assert not connection.is_receiving
+
+    def test_receive_without_descriptor(
+        self, local_logger: recording_logger.RecordingLogger
+    ) -> None:
+        """
+        Connections without a descriptor wait in the connection.
+        """
+        # Setup
+        descriptorless_connection = DescriptorlessConnection()
+        heartbeat_queue = ListQueue()
+        result, router = mavlink_router.MavlinkRouter.create(
+            descriptorless_connection, {"HEARTBEAT": [heartbeat_queue]}, ListQueue(), local_logger
+        )
+        assert result
+        assert router is not None
+
+        descriptorless_connection.deliver(heartbeat())
+
+        # Run
+        count = router.receive(0.1)
+
+        # Test
+        assert count == 1
+        assert descriptorless_connection.timeouts == [0.1]
+        descriptorless_connection.close()
+
+    def test_send(
+        self, connection: PipeConnection, local_logger: recording_logger.RecordingLogger
+    ) -> None:
+        """
+        Queued sends are sent, sentinels are skipped and failures are logged.
+        """
+        # Setup
+        outbound_queue = ListQueue()
+        result, router = mavlink_router.MavlinkRouter.create(
+            connection, {"HEARTBEAT": [ListQueue()]}, outbound_queue, local_logger
+        )
+        assert result
+        assert router is not None
+
+        subscriber = mavlink_router.MavlinkSubscriber(None, outbound_queue)
+        subscriber.mav.heartbeat_send(6, 8, 0, 0, 0)
+        outbound_queue.put(None)
+        subscriber.mav.command_long_send(1, 0)
+
+        # Run
+        count = router.send(0.0)
+
+        # Test
+        assert count == 1
+        assert connection.mav.sent == [((6, 8, 0, 0, 0), False)]
+        assert local_logger.messages[0][0] == "error"
+
+    def test_send_while_receiving(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Sends from another thread wait for the connection to be done receiving.
+        """
+        # Setup
+        slow_connection = PipeConnection(0.01)
+        outbound_queue = ListQueue()
+        result, router = mavlink_router.MavlinkRouter.create(
+            slow_connection, {"HEARTBEAT": [ListQueue()]}, outbound_queue, local_logger
+        )
+        assert result
+        assert router is not None
+
+        for _ in range(0, 20):
+            slow_connection.deliver(heartbeat())
+
+        def send_loop() -> None:
+            for _ in range(0, 20):
+                outbound_queue.put(("heartbeat_send", (6, 8, 0, 0, 0), {}))
+                router.send(0.0)
+                time.sleep(0.005)
+
+        sender = threading.Thread(target=send_loop)
+
+        # Run
+        sender.start()
+        count = 0
+        while count < 20:
+            count += router.receive(0.1)
+        sender.join()
+
+        # Test
+        assert len(slow_connection.mav.sent) == 20
+        assert not any(is_receiving for _, is_receiving in slow_connection.mav.sent)
+        slow_connection.close()
+
+
+class TestMavlinkSubscriber:
+    """
+    Stand-in for the connection in workers.
+    """
+
+    def test_recv_match_type(self) -> None:
+        """
+        Messages of other types are discarded and recorded.
+        """
+        # Setup
+        inbound_queue = ListQueue()
+        statistics = message_statistics.MessageStatistics(["HEARTBEAT", "ATTITUDE"])
+        subscriber = mavlink_router.MavlinkSubscriber(inbound_queue, ListQueue(), statistics)
+        inbound_queue.put(attitude())
+        inbound_queue.put(None)
+        inbound_queue.put(heartbeat())
+
+        # Run
+        message = subscriber.recv_match("HEARTBEAT", blocking=True, timeout=0.1)
+
+        # Test
+        assert message is not None
+        assert message.get_type() == "HEARTBEAT"
+        assert statistics.snapshot()["ATTITUDE"].count == 1
+        assert statistics.snapshot()["HEARTBEAT"].count == 1
+
+    def test_recv_match_timeout(self) -> None:
+        """
+        None once the timeout has passed.
+        """
+        # Setup
+        subscriber = mavlink_router.MavlinkSubscriber(ListQueue(), ListQueue())
+
+        # Run
+        start_time = time.monotonic()
+        message = subscriber.recv_match(blocking=True, timeout=0.05)
+        elapsed_time = time.monotonic() - start_time
+
+        # Test
+        assert message is None
+        assert elapsed_time >= 0.05
+
+    def test_recv_msg_send_only(self) -> None:
+        """
+        Subscribers that only send never receive.
+        """
+        # Setup
+        subscriber = mavlink_router.MavlinkSubscriber(None, ListQueue())
+
+        # Run
+        message = subscriber.recv_msg()
+
+        # Test
+        assert message is None
+
+    def test_outbound_mav_only_sends(self) -> None:
+        """
+        Only `*_send()` calls are forwarded.
+        """
+        # Setup
+        outbound_queue = ListQueue()
+        subscriber = mavlink_router.MavlinkSubscriber(None, outbound_queue)
+
+        # Run
+        subscriber.mav.heartbeat_send(6, 8, 0, 0, 0, mavlink_version=3)
+
+        # Test
+        assert outbound_queue.items == [("heartbeat_send", (6, 8, 0, 0, 0), {"mavlink_version": 3})]
+        with pytest.raises(AttributeError):
+            _ = subscriber.mav.heartbeat_encode
@@ -0,0 +1,178 @@
+"""
+Test the router worker with a fake connection.
+"""
+
+import multiprocessing as mp
+import threading
+import time
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.mavlink_router import mavlink_router_worker
+from tests.unit import recording_logger
+from tests.unit import test_mavlink_router
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+class FakeDroneConnection(test_mavlink_router.PipeConnection):
+    """
+    Connection to a drone that may not send its heartbeat,
+    and otherwise only sends it after receiving a heartbeat, as the mock drones do.
+    """
+
+    def __init__(self, is_connected: bool) -> None:
+        super().__init__()
+        self.__is_connected = is_connected
+        self.is_closed = False
+
+    def wait_heartbeat(
+        self, timeout: "float | None" = None
+    ) -> mavutil.mavlink.MAVLink_message | None:
+        """
+        A heartbeat if connected and a heartbeat was sent, None after the timeout otherwise.
+        """
+        assert timeout is not None
+        assert timeout <= mavlink_router_worker.HEARTBEAT_PERIOD
+        if not self.__is_connected or len(self.mav.sent) == 0:
+            time.sleep(timeout)
+            return None
+
+        return test_mavlink_router.heartbeat()
+
+    def close(self) -> None:
+        """
+        Records the close.
+        """
+        super().close()
+        self.is_closed = True
+
+
+@pytest.fixture()
+def local_logger(monkeypatch: pytest.MonkeyPatch) -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger created by the worker.
+    """
+    fake_logger = recording_logger.RecordingLogger()
+    monkeypatch.setattr(
+        mavlink_router_worker.logger.Logger,
+        "create",
+        lambda name, enable_log_to_file: (True, fake_logger),
+    )
+    yield fake_logger  # type: ignore
+
+
+def start_worker(
+    monkeypatch: pytest.MonkeyPatch,
+    connection: FakeDroneConnection,
+    routes: "dict[str, list[test_mavlink_router.ListQueue]]",
+    ready: "mp.Event",  # type: ignore
+    outbound_queue: test_mavlink_router.ListQueue,
+    controller: worker_controller.WorkerController,
+) -> threading.Thread:
+    """
+    Runs the worker on a thread with the connection.
+    """
+    monkeypatch.setattr(
+        mavlink_router_worker.mavutil, "mavlink_connection", lambda connection_string: connection
+    )
+    worker = threading.Thread(
+        target=mavlink_router_worker.mavlink_router_worker,
+        args=("tcp:localhost:12345", routes, None, ready, outbound_queue, controller),
+    )
+    worker.start()
+    return worker
+
+
+class TestMavlinkRouterWorker:
+    """
+    Connecting, routing and sending until exit.
+    """
+
+    def test_not_connected(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        Without a heartbeat the worker is never ready and closes the connection.
+        """
+        # Setup
+        monkeypatch.setattr(mavlink_router_worker, "HEARTBEAT_TIMEOUT", 0.2)
+        monkeypatch.setattr(mavlink_router_worker, "HEARTBEAT_PERIOD", 0.05)
+        connection = FakeDroneConnection(False)
+        ready = mp.Event()
+        controller = worker_controller.WorkerController()
+
+        # Run
+        worker = start_worker(
+            monkeypatch,
+            connection,
+            {"HEARTBEAT": [test_mavlink_router.ListQueue()]},
+            ready,
+            test_mavlink_router.ListQueue(),
+            controller,
+        )
+        worker.join(1.0)
+
+        # Test
+        assert not worker.is_alive()
+        assert not ready.is_set()
+        assert connection.is_closed
+        assert ("error", "No heartbeat from drone") in local_logger.messages
+        # A ground station heartbeat every period while waiting
+        assert 3 <= len(connection.mav.sent) <= 5
+
+    def test_route_and_send(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        Once ready, messages are routed and sends are sent until exit is requested.
+        """
+        _ = local_logger
+
+        # Setup
+        connection = FakeDroneConnection(True)
+        heartbeat_queue = test_mavlink_router.ListQueue()
+        outbound_queue = test_mavlink_router.ListQueue()
+        ready = mp.Event()
+        controller = worker_controller.WorkerController()
+
+        # Run
+        worker = start_worker(
+            monkeypatch,
+            connection,
+            {"HEARTBEAT": [heartbeat_queue]},
+            ready,
+            outbound_queue,
+            controller,
+        )
+        assert ready.wait(1.0)
+
+        connection.deliver(test_mavlink_router.heartbeat())
+        outbound_queue.put(("heartbeat_send", (6, 8, 0, 0, 0), {}))
+        for _ in range(0, 100):
+            if len(heartbeat_queue.items) > 0 and len(connection.mav.sent) > 1:
+                break
+            time.sleep(0.01)
+
+        controller.request_exit()
+        worker.join(1.0)
+
+        # Test
+        assert not worker.is_alive()
+        assert len(heartbeat_queue.items) == 1
+        # The ground station heartbeat the drone waits for, then the queued send
+        assert [args for args, _ in connection.mav.sent] == [
+            (mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0),
+            (6, 8, 0, 0, 0),
+        ]
+        assert connection.is_closed
@@ -0,0 +1,82 @@
+"""
+Test the message statistics.
+"""
+
+import pytest
+
+from modules.mavlink_router import message_statistics
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def statistics() -> message_statistics.MessageStatistics:  # type: ignore
+    """
+    Records HEARTBEAT and ATTITUDE, with every inter-arrival time fully weighted.
+    """
+    yield message_statistics.MessageStatistics(["HEARTBEAT", "ATTITUDE"], 1.0)  # type: ignore
+
+
+class TestMessageStatistics:
+    """
+    Counts, rate, jitter and histogram of each message type.
+    """
+
+    def test_nothing_recorded(self, statistics: message_statistics.MessageStatistics) -> None:
+        """
+        Empty before any message.
+        """
+        # Run
+        snapshot = statistics.snapshot()["HEARTBEAT"]
+
+        # Test
+        assert snapshot.count == 0
+        assert snapshot.rate == 0.0
+        assert snapshot.age is None
+        assert sum(snapshot.histogram) == 0
+
+    def test_rate_and_histogram(self, statistics: message_statistics.MessageStatistics) -> None:
+        """
+        Messages 0.5 s apart are 2 Hz and land in the [256, 512) ms bucket.
+        """
+        # Setup
+        for arrival_time in [10.0, 10.5, 11.0]:
+            statistics.record("HEARTBEAT", arrival_time)
+
+        # Run
+        snapshot = statistics.snapshot()["HEARTBEAT"]
+
+        # Test
+        assert snapshot.count == 3
+        assert snapshot.rate == pytest.approx(2.0)
+        assert snapshot.jitter == pytest.approx(0.0)
+        assert snapshot.histogram[9] == 2
+        assert statistics.snapshot()["ATTITUDE"].count == 0
+
+    def test_jitter(self, statistics: message_statistics.MessageStatistics) -> None:
+        """
+        Jitter is the deviation of the latest inter-arrival time from the previous average.
+        """
+        # Setup
+        for arrival_time in [0.0, 0.1, 0.3]:
+            statistics.record("ATTITUDE", arrival_time)
+
+        # Run
+        snapshot = statistics.snapshot()["ATTITUDE"]
+
+        # Test
+        assert snapshot.jitter == pytest.approx(0.1)
+        assert snapshot.rate == pytest.approx(5.0)
+
+    def test_other_types_ignored(self, statistics: message_statistics.MessageStatistics) -> None:
+        """
+        Types not given at construction are not recorded.
+        """
+        # Run
+        statistics.record("LOCAL_POSITION_NED", 1.0)
+
+        # Test
+        assert "LOCAL_POSITION_NED" not in statistics.snapshot()
@@ -0,0 +1,166 @@
+"""
+Test the periodic scheduler.
+"""
+
+import pytest
+
+from utilities.workers import periodic_scheduler
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+class FakeClock:
+    """
+    Monotonic time that only moves when advanced or slept.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        """
+        Current time.
+        """
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Advances the time, failing on negative sleeps as time.sleep() does.
+        """
+        assert seconds >= 0.0, "Negative sleep"
+        self.now += seconds
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:  # type: ignore
+    """
+    Replaces the time of the scheduler.
+    """
+    fake_clock = FakeClock()
+    monkeypatch.setattr(periodic_scheduler.time, "monotonic", fake_clock.monotonic)
+    monkeypatch.setattr(periodic_scheduler.time, "sleep", fake_clock.sleep)
+    yield fake_clock  # type: ignore
+
+
+@pytest.fixture()
+def scheduler(clock: FakeClock) -> periodic_scheduler.PeriodicScheduler:  # type: ignore
+    """
+    Empty schedule on the fake clock.
+    """
+    _ = clock
+    yield periodic_scheduler.PeriodicScheduler()  # type: ignore
+
+
+class TestPeriodicScheduler:
+    """
+    Jobs run on absolute deadlines.
+    """
+
+    def test_no_drift(
+        self, scheduler: periodic_scheduler.PeriodicScheduler, clock: FakeClock
+    ) -> None:
+        """
+        Time taken by the job does not delay the following ticks.
+        """
+        # Setup
+        run_times = []
+
+        def job() -> None:
+            run_times.append(clock.now)
+            clock.now += 0.3
+
+        scheduler.add("job", job, 1.0)
+
+        # Run
+        for _ in range(3):
+            scheduler.wait()
+            scheduler.run_pending()
+
+        # Test
+        assert run_times == [1000.0, 1001.0, 1002.0]
+
+    def test_skip(self, scheduler: periodic_scheduler.PeriodicScheduler, clock: FakeClock) -> None:
+        """
+        A stall longer than the period runs once and stays on the original ticks.
+        """
+        # Setup
+        run_times = []
+        scheduler.add("job", lambda: run_times.append(clock.now), 1.0)
+        scheduler.run_pending()
+
+        # Run
+        clock.now += 2.5
+        count = scheduler.run_pending()
+        scheduler.wait()
+        scheduler.run_pending()
+
+        # Test
+        assert count == 1
+        assert run_times == [1000.0, 1002.5, 1003.0]
+        assert scheduler.get_skipped_counts() == {"job": 1}
+
+    def test_catch_up(
+        self, scheduler: periodic_scheduler.PeriodicScheduler, clock: FakeClock
+    ) -> None:
+        """
+        A stall longer than the period runs every missed tick.
+        """
+        # Setup
+        scheduler.add("job", lambda: None, 1.0, periodic_scheduler.MissedTickPolicy.CATCH_UP)
+        scheduler.run_pending()
+
+        # Run
+        clock.now += 2.5
+        count = scheduler.run_pending()
+
+        # Test
+        assert count == 2
+        assert scheduler.time_until_next() == pytest.approx(0.5)
+        assert scheduler.get_skipped_counts() == {"job": 0}
+
+    def test_multiple_jobs(
+        self, scheduler: periodic_scheduler.PeriodicScheduler, clock: FakeClock
+    ) -> None:
+        """
+        Jobs of different periods share one loop in order of deadline.
+        """
+        # Setup
+        runs = []
+        scheduler.add("fast", lambda: runs.append(("fast", clock.now)), 0.5)
+        scheduler.add("slow", lambda: runs.append(("slow", clock.now)), 2.0, delay=1.0)
+
+        # Run
+        while clock.now < 1002.0:
+            scheduler.wait()
+            scheduler.run_pending()
+
+        # Test
+        assert [name for name, _ in runs].count("fast") == 5
+        assert ("slow", 1001.0) in runs
+        assert runs[-1] == ("fast", 1002.0)
+
+    def test_add_invalid(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Names are unique and periods positive.
+        """
+        # Run and test
+        assert scheduler.add("job", lambda: None, 1.0)
+        assert not scheduler.add("job", lambda: None, 1.0)
+        assert not scheduler.add("other", lambda: None, 0.0)
+        assert scheduler.time_until_next() == 0.0
+
+    def test_wait_empty(
+        self, scheduler: periodic_scheduler.PeriodicScheduler, clock: FakeClock
+    ) -> None:
+        """
+        Without jobs, waits for at most the maximum.
+        """
+        # Run
+        scheduler.wait(0.25)
+
+        # Test
+        assert scheduler.time_until_next() is None
+        assert clock.now == 1000.25
@@ -0,0 +1,103 @@
+"""
+Test the batch simulator of the Command decision logic.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from modules.command import policy_simulator
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+TARGET = (10.0, 20.0, 30.0)
+
+
+@pytest.fixture()
+def generator() -> np.random.Generator:  # type: ignore
+    """
+    Seeded source of noise.
+    """
+    yield np.random.default_rng(0)  # type: ignore
+
+
+class TestSimulate:
+    """
+    Metrics of noiseless trajectories.
+    """
+
+    def test_at_target(self, generator: np.random.Generator) -> None:
+        """
+        Nothing to do, converged from the start.
+        """
+        # Setup
+        states = np.array([[0.0, 0.0, 30.0, math.atan2(20, 10)]])
+
+        # Run
+        result = policy_simulator.simulate(states, np.zeros((1, 3)), TARGET, generator)
+
+        # Test
+        assert result.convergence_times[0] == 0.0
+        assert result.command_counts[0] == 0
+
+    def test_climb(self, generator: np.random.Generator) -> None:
+        """
+        One altitude command, then within tolerance after climbing 4.5 m at 1 m/s.
+        """
+        # Setup
+        states = np.array([[10.0, 20.0, 25.0, 0.0]])
+
+        # Run
+        result = policy_simulator.simulate(states, np.zeros((1, 3)), TARGET, generator)
+
+        # Test
+        assert result.convergence_times[0] == pytest.approx(4.5)
+        assert result.command_counts[0] == 1
+        assert result.reversal_counts[0] == 0
+
+    def test_turn_after_climb(self, generator: np.random.Generator) -> None:
+        """
+        Altitude first, then yaw towards the target, which is resent as the relative angle
+        keeps changing by more than its tolerance while turning.
+        """
+        # Setup
+        states = np.array([[0.0, 0.0, 28.0, 0.0]])
+
+        # Run
+        result = policy_simulator.simulate(states, np.zeros((1, 3)), TARGET, generator)
+
+        # Test
+        assert result.command_counts[0] > 2
+        assert result.reversal_counts[0] == 0
+        # Climbing 1.5 m, then turning 63 degrees at 5 deg/s to within 5 degrees
+        assert result.convergence_times[0] == pytest.approx(13.5, abs=0.5)
+
+
+class TestSweep:
+    """
+    Every combination of tolerances is summarised.
+    """
+
+    def test_combinations(self, generator: np.random.Generator) -> None:
+        """
+        Looser yaw tolerance needs no more commands.
+        """
+        # Setup
+        states, velocities = policy_simulator.random_trajectories(100, generator)
+
+        # Run
+        summaries = policy_simulator.sweep(
+            [0.5, 1.0], [math.radians(5), math.radians(10)], states, velocities, TARGET, generator
+        )
+
+        # Test
+        assert len(summaries) == 4
+        assert summaries[(0.5, math.radians(10))]["commands"] <= (
+            summaries[(0.5, math.radians(5))]["commands"]
+        )
+        assert summaries[(1.0, math.radians(10))]["converged"] == 1.0
@@ -0,0 +1,189 @@
+"""
+Test the queue proxy wrapper.
+"""
+
+import multiprocessing as mp
+import threading
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+MAXSIZE = 4
+
+
+@pytest.fixture(params=list(queue_proxy_wrapper.QueueBackend))
+def wrapper(request: pytest.FixtureRequest) -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Creates a bounded queue for each backend.
+    """
+    with mp.Manager() as mp_manager:
+        queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, MAXSIZE, request.param)
+        yield queue  # type: ignore
+        queue.close()
+
+
+class TestBatch:
+    """
+    Bulk put and get.
+    """
+
+    def test_round_trip(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A batch comes out in the order it went in.
+        """
+        # Setup
+        expected = [1, 2, 3]
+
+        # Run
+        count = wrapper.put_many(expected)
+        actual = wrapper.get_many(MAXSIZE)
+
+        # Test
+        assert count == len(expected)
+        assert actual == expected
+
+    def test_put_many_partial(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Only the items that fit are put.
+        """
+        # Setup
+        items = list(range(MAXSIZE + 2))
+
+        # Run
+        count = wrapper.put_many(items, 0.01)
+
+        # Test
+        assert count == MAXSIZE
+        assert wrapper.get_many(len(items)) == items[:MAXSIZE]
+
+    def test_put_many_block(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Without a maximum wait, the blocking policy waits until every item is put.
+        """
+        # Setup
+        items = list(range(MAXSIZE + 2))
+        taken = []
+        consumer = threading.Timer(0.05, lambda: taken.extend(wrapper.get_many(2)))
+        consumer.start()
+
+        # Run
+        count = wrapper.put_many(items)
+        consumer.join()
+
+        # Test
+        assert count == len(items)
+        assert taken + wrapper.get_many(MAXSIZE) == items
+        assert wrapper.get_dropped_count() == 0
+
+    def test_get_many_max_batch(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        No more than the maximum batch is taken.
+        """
+        # Setup
+        wrapper.put_many([1, 2, 3])
+
+        # Run
+        first = wrapper.get_many(2)
+        second = wrapper.get_many(2)
+
+        # Test
+        assert first == [1, 2]
+        assert second == [3]
+
+    def test_get_many_empty(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Nothing arrives in time.
+        """
+        # Run
+        actual = wrapper.get_many(MAXSIZE, 0.01)
+
+        # Test
+        assert actual == []
+
+    def test_fill_and_drain(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Sentinels fill the queue and draining empties it.
+        """
+        # Run
+        wrapper.fill_queue_with_sentinel()
+        is_full = wrapper.queue.full()
+        wrapper.drain_queue()
+
+        # Test
+        assert is_full
+        assert wrapper.queue.empty()
+
+
+class TestOverflowPolicy:
+    """
+    Putting into a full queue.
+    """
+
+    def test_drop_newest(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        The items that do not fit are discarded and counted.
+        """
+        # Setup
+        wrapper.overflow_policy = queue_proxy_wrapper.OverflowPolicy.DROP_NEWEST
+        wrapper.put_many(list(range(MAXSIZE)))
+
+        # Run
+        wrapper.put(MAXSIZE)
+        wrapper.put_many([MAXSIZE + 1, MAXSIZE + 2])
+
+        # Test
+        assert wrapper.get_dropped_count() == 3
+        assert wrapper.get_many(MAXSIZE) == list(range(MAXSIZE))
+
+    def test_drop_oldest(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        The oldest items are discarded and counted to make space for the new ones.
+        """
+        # Setup
+        wrapper.overflow_policy = queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST
+        wrapper.put_many(list(range(MAXSIZE)))
+
+        # Run
+        wrapper.put(MAXSIZE)
+        count = wrapper.put_many([MAXSIZE + 1, MAXSIZE + 2])
+
+        # Test
+        assert count == 2
+        assert wrapper.get_dropped_count() == 3
+        assert wrapper.get_many(MAXSIZE) == list(range(3, MAXSIZE + 3))
+
+    def test_block_timeout_then_drop(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        The item is discarded and counted after waiting.
+        """
+        # Setup
+        wrapper.overflow_policy = queue_proxy_wrapper.OverflowPolicy.BLOCK_TIMEOUT_THEN_DROP
+        wrapper.overflow_timeout = 0.01
+        wrapper.put_many(list(range(MAXSIZE)))
+
+        # Run
+        wrapper.put(MAXSIZE)
+
+        # Test
+        assert wrapper.get_dropped_count() == 1
+
+    def test_sentinel_not_dropped(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Filling with sentinels does not count as overflow.
+        """
+        # Setup
+        wrapper.overflow_policy = queue_proxy_wrapper.OverflowPolicy.DROP_NEWEST
+        wrapper.put_many(list(range(MAXSIZE)))
+
+        # Run
+        wrapper.fill_queue_with_sentinel()
+
+        # Test
+        assert wrapper.get_dropped_count() == 0
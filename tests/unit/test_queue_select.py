@@ -0,0 +1,84 @@
+"""
+Test waiting on multiple queues.
+"""
+
+import multiprocessing as mp
+import threading
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_select
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+MAXSIZE = 4
+PUT_DELAY = 0.05  # seconds
+
+
+@pytest.fixture(params=[True, False], ids=["notifier", "polling"])
+def queues(request: pytest.FixtureRequest) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":  # type: ignore
+    """
+    Creates 2 shared memory queues, with or without a shared notifier.
+    """
+    notifier = mp.Condition() if request.param else None
+    wrappers = [
+        queue_proxy_wrapper.QueueProxyWrapper(
+            None, MAXSIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY, notifier=notifier
+        )
+        for _ in range(2)
+    ]
+    yield wrappers  # type: ignore
+    for wrapper in wrappers:
+        wrapper.close()
+
+
+class TestWaitAny:
+    """
+    Wait until one of the queues is readable.
+    """
+
+    def test_already_readable(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Returns immediately with the first readable queue.
+        """
+        # Setup
+        queues[1].put("item")
+
+        # Run
+        result, index = queue_select.wait_any(queues, 0.0)
+
+        # Test
+        assert result
+        assert index == 1
+
+    def test_put_later(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Wakes up when another thread puts.
+        """
+        # Setup
+        timer = threading.Timer(PUT_DELAY, queues[0].put, args=("item",))
+        timer.start()
+
+        # Run
+        result, index = queue_select.wait_any(queues, 5.0)
+        timer.join()
+
+        # Test
+        assert result
+        assert index == 0
+
+    def test_timeout(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Nothing is put in time.
+        """
+        # Run
+        result, index = queue_select.wait_any(queues, PUT_DELAY)
+
+        # Test
+        assert not result
+        assert index is None
@@ -0,0 +1,113 @@
+"""
+Test the shared memory queue.
+"""
+
+import multiprocessing as mp
+import queue
+
+import pytest
+
+from utilities.workers import shared_memory_queue
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+MAXSIZE = 3
+SLOT_SIZE = 256  # bytes
+
+
+@pytest.fixture()
+def ring() -> shared_memory_queue.SharedMemoryQueue:  # type: ignore
+    """
+    Creates a small shared memory queue and frees it afterwards.
+    """
+    ring_queue = shared_memory_queue.SharedMemoryQueue(MAXSIZE, SLOT_SIZE)
+    yield ring_queue  # type: ignore
+    ring_queue.unlink()
+
+
+def put_range(ring_queue: shared_memory_queue.SharedMemoryQueue, count: int) -> None:
+    """
+    Puts 0 to count - 1 into the queue, for running in another process.
+    """
+    for i in range(count):
+        ring_queue.put(i)
+
+
+class TestSharedMemoryQueue:
+    """
+    Queue interface of the ring buffer.
+    """
+
+    def test_fifo_order(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items come out in the order they went in, across the wraparound.
+        """
+        # Setup
+        expected = [1, "two", {"three": 3.0}, None, (5,)]
+
+        # Run
+        actual = []
+        for item in expected:
+            ring.put(item)
+            actual.append(ring.get())
+
+        # Test
+        assert actual == expected
+        assert ring.empty()
+
+    def test_full(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Putting into a full queue raises once all slots are used.
+        """
+        # Setup
+        for i in range(MAXSIZE):
+            ring.put_nowait(i)
+
+        # Run and test
+        assert ring.full()
+        assert ring.qsize() == MAXSIZE
+        with pytest.raises(queue.Full):
+            ring.put_nowait(MAXSIZE)
+        with pytest.raises(queue.Full):
+            ring.put(MAXSIZE, timeout=0.01)
+
+    def test_empty(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Getting from an empty queue raises.
+        """
+        # Run and test
+        with pytest.raises(queue.Empty):
+            ring.get_nowait()
+        with pytest.raises(queue.Empty):
+            ring.get(timeout=0.01)
+
+    def test_item_too_large(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        An item that does not fit in a slot is rejected without using a slot.
+        """
+        # Run and test
+        with pytest.raises(ValueError):
+            ring.put(b"x" * SLOT_SIZE)
+
+        assert ring.empty()
+
+    def test_other_process(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        A producer in another process can fill the queue more than once over.
+        """
+        # Setup
+        count = MAXSIZE * 4
+        expected = list(range(count))
+
+        # Run
+        producer = mp.Process(target=put_range, args=(ring, count))
+        producer.start()
+        actual = [ring.get(timeout=5) for _ in range(count)]
+        producer.join()
+
+        # Test
+        assert actual == expected
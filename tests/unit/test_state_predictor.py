@@ -0,0 +1,155 @@
+"""
+Test extrapolating telemetry to the time a command takes effect.
+"""
+
+import math
+
+import pytest
+
+from modules.command import state_predictor
+from modules.telemetry import telemetry
+from tests.unit import test_command_dispatcher
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> test_command_dispatcher.FakeClock:  # type: ignore
+    """
+    Replaces the time of the predictor.
+    """
+    fake_clock = test_command_dispatcher.FakeClock()
+    monkeypatch.setattr(state_predictor.time, "monotonic", fake_clock.monotonic)
+    yield fake_clock  # type: ignore
+
+
+def moving(ingest_time: "float | None") -> telemetry.TelemetryData:
+    """
+    Sample moving at 1, 2 and -1 m/s and turning at 1 rad/s.
+    """
+    data = telemetry.TelemetryData(
+        time_since_boot=500,
+        x=10.0,
+        y=20.0,
+        z=-30.0,
+        x_velocity=1.0,
+        y_velocity=2.0,
+        z_velocity=-1.0,
+        roll=0.0,
+        yaw=0.5,
+        yaw_speed=1.0,
+    )
+    data.ingest_time = ingest_time
+    return data
+
+
+class TestStatePredictor:
+    """
+    Constant rate extrapolation over the age of the sample and the send latency.
+    """
+
+    def test_extrapolate(self, clock: test_command_dispatcher.FakeClock) -> None:
+        """
+        Extrapolated over the age plus the send latency, other fields are copied.
+        """
+        # Setup
+        predictor = state_predictor.StatePredictor()
+        data = moving(clock.now - 0.2)
+
+        # Run
+        predicted, horizon = predictor.predict(data, 0.1)
+
+        # Test
+        assert horizon == pytest.approx(0.3)
+        assert predicted.x == pytest.approx(10.3)
+        assert predicted.y == pytest.approx(20.6)
+        assert predicted.z == pytest.approx(-30.3)
+        assert predicted.yaw == pytest.approx(0.8)
+        assert predicted.roll == 0.0
+        assert predicted.pitch is None
+        assert predicted.time_since_boot == 500
+        assert predicted.x_velocity == 1.0
+        # The sample itself is unchanged
+        assert data.x == 10.0
+
+    def test_max_horizon(self, clock: test_command_dispatcher.FakeClock) -> None:
+        """
+        Old samples are only extrapolated up to the maximum horizon.
+        """
+        # Setup
+        predictor = state_predictor.StatePredictor(0.5)
+
+        # Run
+        predicted, horizon = predictor.predict(moving(clock.now - 10.0), 0.1)
+
+        # Test
+        assert horizon == pytest.approx(0.5)
+        assert predicted.x == pytest.approx(10.5)
+
+    def test_propagated(self, clock: test_command_dispatcher.FakeClock) -> None:
+        """
+        An estimate already propagated past its ingest time is only extrapolated
+        from its state time.
+        """
+        # Setup
+        predictor = state_predictor.StatePredictor()
+        data = moving(clock.now - 0.5)
+        data.state_time = clock.now - 0.1
+
+        # Run
+        predicted, horizon = predictor.predict(data, 0.1)
+
+        # Test
+        assert horizon == pytest.approx(0.2)
+        assert predicted.x == pytest.approx(10.2)
+
+    def test_future_ingest_time(self, clock: test_command_dispatcher.FakeClock) -> None:
+        """
+        The horizon is never negative.
+        """
+        # Setup
+        predictor = state_predictor.StatePredictor()
+
+        # Run
+        predicted, horizon = predictor.predict(moving(clock.now + 1.0))
+
+        # Test
+        assert horizon == 0.0
+        assert predicted.x == 10.0
+
+    def test_angle_wraps(self, clock: test_command_dispatcher.FakeClock) -> None:
+        """
+        Angles turning past pi wrap to [-pi, pi).
+        """
+        # Setup
+        predictor = state_predictor.StatePredictor()
+        data = moving(clock.now - 0.5)
+        data.yaw = math.pi - 0.25
+
+        # Run
+        predicted, _ = predictor.predict(data)
+
+        # Test
+        assert predicted.yaw == pytest.approx(-math.pi + 0.25)
+
+    def test_untraced(self, clock: test_command_dispatcher.FakeClock) -> None:
+        """
+        Samples without an ingest time are copied without extrapolating.
+        """
+        _ = clock
+
+        # Setup
+        predictor = state_predictor.StatePredictor()
+        data = moving(None)
+
+        # Run
+        predicted, horizon = predictor.predict(data, 0.1)
+
+        # Test
+        assert horizon == 0.0
+        assert predicted is not data
+        for name in telemetry.TelemetryData.FIELDS:
+            assert getattr(predicted, name) == getattr(data, name)
@@ -0,0 +1,398 @@
+"""
+Test gathering telemetry from a connection.
+"""
+
+import pickle
+import sys
+import threading
+import time
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.telemetry import telemetry
+from tests.unit import recording_logger
+from tests.unit import test_mavlink_router
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+TIMEOUT = 0.2  # seconds
+# Delay before delivering a message to a waiting telemetry
+DELIVERY_DELAY = 0.05  # seconds
+# Longest time from a message being delivered to its sample, far above the selector wakeup
+# so a loaded machine does not fail it, but far below polling
+MAX_WAKEUP_LATENCY = 0.02  # seconds
+
+
+class SubscriberConnection:
+    """
+    Stands in for a router subscriber, which has no descriptor to wait on,
+    so every message arrives while waiting in recv_match().
+    """
+
+    def __init__(self, messages: "list[mavutil.mavlink.MAVLink_message]") -> None:
+        self.fd = None
+        self.messages = list(messages)
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Nothing is ever buffered.
+        """
+        return None
+
+    def recv_match(
+        self, blocking: bool = False, timeout: "float | None" = None
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Next message, None once there are no more.
+        """
+        _ = blocking, timeout
+        if len(self.messages) == 0:
+            return None
+
+        return self.messages.pop(0)
+
+
+def attitude(time_boot_ms: int, yaw: float) -> "mavutil.mavlink.MAVLink_attitude_message":
+    """
+    Level attitude with the yaw.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(time_boot_ms, 0.0, 0.0, yaw, 0.0, 0.0, 0.1)
+
+
+def position(time_boot_ms: int, x: float) -> "mavutil.mavlink.MAVLink_local_position_ned_message":
+    """
+    Position along x, moving at 1 m/s.
+    """
+    return mavutil.mavlink.MAVLink_local_position_ned_message(
+        time_boot_ms, x, 2.0, -3.0, 1.0, 0.0, 0.0
+    )
+
+
+def deliver_later(
+    connection: test_mavlink_router.PipeConnection,
+    messages: "list[mavutil.mavlink.MAVLink_message]",
+) -> "list[float]":
+    """
+    Delivers each message after the delivery delay, on another thread.
+
+    Returns the monotonic time of each delivery, filled in as they are delivered.
+    """
+    delivery_times = []
+
+    def deliver() -> None:
+        for message in messages:
+            time.sleep(DELIVERY_DELAY)
+            delivery_times.append(time.monotonic())
+            connection.deliver(message)
+
+    threading.Thread(target=deliver).start()
+    return delivery_times
+
+
+def create_telemetry(
+    connection: object, local_logger: recording_logger.RecordingLogger
+) -> telemetry.Telemetry:
+    """
+    Telemetry with a short timeout.
+    """
+    result, telemetry_instance = telemetry.Telemetry.create(connection, local_logger)
+    assert result
+    assert telemetry_instance is not None
+
+    telemetry_instance.timeout = TIMEOUT
+    return telemetry_instance
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+class TestStream:
+    """
+    Yielding on every update until the timeout.
+    """
+
+    def test_subscriber(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Messages received while waiting are updates, and yield once both types have arrived.
+        """
+        # Setup
+        connection = SubscriberConnection(
+            [attitude(100, 0.5), position(110, 1.0), attitude(120, 0.6), position(130, 1.1)]
+        )
+        telemetry_instance = create_telemetry(connection, local_logger)
+
+        # Run
+        samples = list(telemetry_instance.stream())
+
+        # Test
+        assert [sample.time_since_boot for sample in samples] == [110, 120, 130]
+        assert samples[0].yaw == pytest.approx(0.5)
+        assert samples[0].x == pytest.approx(1.0)
+        assert samples[1].yaw == pytest.approx(0.6)
+        assert samples[2].x == pytest.approx(1.1)
+        assert samples[0].ingest_time is not None
+        assert local_logger.get_levels("Did not receive telemetry data within timeout frame") == [
+            "error"
+        ]
+
+    def test_subscriber_aligned(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Yields on every attitude after the first position, with the position at its time.
+        """
+        # Setup
+        connection = SubscriberConnection(
+            [attitude(100, 0.5), position(100, 1.0), attitude(200, 0.6), position(200, 1.1)]
+        )
+        telemetry_instance = create_telemetry(connection, local_logger)
+
+        # Run
+        samples = list(telemetry_instance.stream(True))
+
+        # Test
+        assert [sample.time_since_boot for sample in samples] == [100, 200]
+        assert samples[0].x == pytest.approx(1.0)
+        # Extrapolated from the position at 100 ms at 1 m/s
+        assert samples[1].x == pytest.approx(1.1)
+        assert samples[1].position_time_since_boot == 200
+
+    def test_descriptor(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Buffered messages are received after waiting on the descriptor.
+        """
+        # Setup
+        connection = test_mavlink_router.PipeConnection()
+        connection.deliver(attitude(100, 0.5))
+        connection.deliver(position(110, 1.0))
+        telemetry_instance = create_telemetry(connection, local_logger)
+
+        # Run
+        samples = list(telemetry_instance.stream())
+
+        # Test
+        assert len(samples) == 1
+        assert samples[0].time_since_boot == 110
+        connection.close()
+
+    def test_descriptor_wakeup(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Waiting on the descriptor wakes up as soon as a message arrives,
+        instead of after a polling timeout.
+        """
+        # Setup
+        connection = test_mavlink_router.PipeConnection()
+        telemetry_instance = create_telemetry(connection, local_logger)
+        delivery_times = deliver_later(connection, [attitude(100, 0.5), position(110, 1.0)])
+
+        # Run
+        sample_times = []
+        samples = []
+        for sample in telemetry_instance.stream():
+            sample_times.append(time.monotonic())
+            samples.append(sample)
+
+        # Test
+        assert [sample.time_since_boot for sample in samples] == [110]
+        assert sample_times[0] - delivery_times[1] < MAX_WAKEUP_LATENCY
+        assert samples[0].ingest_time - delivery_times[1] < MAX_WAKEUP_LATENCY
+        connection.close()
+
+    def test_timeout(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Ends without yielding if nothing arrives.
+        """
+        # Setup
+        telemetry_instance = create_telemetry(SubscriberConnection([]), local_logger)
+
+        # Run
+        samples = list(telemetry_instance.stream())
+
+        # Test
+        assert len(samples) == 0
+
+
+class TestRun:
+    """
+    Waiting for a fresh message of every type.
+    """
+
+    def test_combined(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Combined once both types have arrived, timed by the most recent.
+        """
+        # Setup
+        connection = SubscriberConnection([position(110, 1.0), attitude(100, 0.5)])
+        telemetry_instance = create_telemetry(connection, local_logger)
+
+        # Run
+        result, data = telemetry_instance.run()
+
+        # Test
+        assert result
+        assert data is not None
+        assert data.time_since_boot == 110
+        assert data.attitude_time_since_boot == 100
+        assert data.position_time_since_boot == 110
+
+    def test_descriptor_wakeup(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Returns as soon as the last type arrives, waiting on the descriptor.
+        """
+        # Setup
+        connection = test_mavlink_router.PipeConnection()
+        telemetry_instance = create_telemetry(connection, local_logger)
+        delivery_times = deliver_later(connection, [position(110, 1.0), attitude(100, 0.5)])
+
+        # Run
+        result, data = telemetry_instance.run()
+        return_time = time.monotonic()
+
+        # Test
+        assert result
+        assert data is not None
+        assert data.time_since_boot == 110
+        assert return_time - delivery_times[1] < MAX_WAKEUP_LATENCY
+        connection.close()
+
+    def test_timeout(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Fails if a type does not arrive in time.
+        """
+        # Setup
+        connection = SubscriberConnection([attitude(100, 0.5)])
+        telemetry_instance = create_telemetry(connection, local_logger)
+
+        # Run
+        result, data = telemetry_instance.run()
+
+        # Test
+        assert not result
+        assert data is None
+
+
+class TestTelemetryData:
+    """
+    Binary layout used for pickling, shared memory and recordings.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Every field, including the trace, survives packing.
+        """
+        # Setup
+        data = telemetry.TelemetryData(
+            110, 1.0, 2.0, -3.0, 0.1, 0.2, 0.3, 0.01, 0.02, 0.5, 0.03, 0.04, 0.05, 100, 110
+        )
+        data.sequence = 7
+        data.ingest_time = 1000.25
+        data.publish_time = 1000.5
+
+        # Run
+        actual = telemetry.TelemetryData.from_bytes(data.to_bytes())
+
+        # Test
+        assert len(data.to_bytes()) == telemetry.TelemetryData.SIZE
+        for name in telemetry.TelemetryData.FIELDS + telemetry.TelemetryData.TRACE_FIELDS:
+            assert getattr(actual, name) == getattr(data, name)
+
+    def test_none_fields(self) -> None:
+        """
+        Missing fields are None after unpacking, not 0, even where 0 is a valid value.
+        """
+        # Setup
+        data = telemetry.TelemetryData(time_since_boot=0, x=0.0, yaw=None)
+
+        # Run
+        actual = telemetry.TelemetryData.from_bytes(data.to_bytes())
+
+        # Test
+        assert actual.time_since_boot == 0
+        assert actual.x == 0.0
+        assert actual.y is None
+        assert actual.yaw is None
+        assert actual.sequence is None
+        assert actual.ingest_time is None
+
+    def test_presence_bitmask(self) -> None:
+        """
+        The layout starts with a bitmask of the fields present, in layout order.
+        """
+        # Setup
+        data = telemetry.TelemetryData(x=1.0)
+        data.publish_time = 5.0
+
+        # Run
+        present = int.from_bytes(data.to_bytes()[:4], sys.byteorder)
+
+        # Test
+        slots = telemetry.TelemetryData.FIELDS + telemetry.TelemetryData.TRACE_FIELDS
+        assert present == (1 << slots.index("x")) | (1 << slots.index("publish_time"))
+
+    def test_pack_into_offset(self) -> None:
+        """
+        Packs into and unpacks from the middle of a buffer.
+        """
+        # Setup
+        buffer = bytearray(8 + telemetry.TelemetryData.SIZE)
+        data = telemetry.TelemetryData(time_since_boot=42, z=-10.0)
+
+        # Run
+        data.pack_into(buffer, 8)
+        actual = telemetry.TelemetryData.from_bytes(buffer, 8)
+
+        # Test
+        assert buffer[:8] == bytearray(8)
+        assert actual.time_since_boot == 42
+        assert actual.z == -10.0
+
+    def test_float_time_rounded(self) -> None:
+        """
+        Times computed as floats are rounded to whole ms.
+        """
+        # Setup
+        data = telemetry.TelemetryData(time_since_boot=1234.6, attitude_time_since_boot=99.4)
+
+        # Run
+        actual = telemetry.TelemetryData.from_bytes(data.to_bytes())
+
+        # Test
+        assert actual.time_since_boot == 1235
+        assert actual.attitude_time_since_boot == 99
+
+    def test_negative_time(self) -> None:
+        """
+        Times before boot cannot be represented.
+        """
+        # Setup
+        data = telemetry.TelemetryData(time_since_boot=-1)
+
+        # Run and test
+        with pytest.raises(ValueError):
+            data.to_bytes()
+
+    def test_pickle(self) -> None:
+        """
+        Pickled as the binary layout.
+        """
+        # Setup
+        data = telemetry.TelemetryData(time_since_boot=10, yaw=1.5)
+        data.sequence = 3
+
+        # Run
+        actual = pickle.loads(pickle.dumps(data))
+
+        # Test
+        assert actual.time_since_boot == 10
+        assert actual.yaw == 1.5
+        assert actual.sequence == 3
+        assert actual.x is None
@@ -0,0 +1,165 @@
+"""
+Test the alignment of attitude and position readings.
+"""
+
+import math
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.telemetry import telemetry_alignment
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def aligner() -> telemetry_alignment.TelemetryAligner:  # type: ignore
+    """
+    Aligner with a small buffer.
+    """
+    yield telemetry_alignment.TelemetryAligner(4)  # type: ignore
+
+
+def position(
+    time_boot_ms: int, x: float, vx: float = 0.0
+) -> "mavutil.mavlink.MAVLink_local_position_ned_message":
+    """
+    Position along x.
+    """
+    return mavutil.mavlink.MAVLink_local_position_ned_message(
+        time_boot_ms, x, 0.0, -10.0, vx, 0.0, 0.0
+    )
+
+
+def attitude(
+    time_boot_ms: int, yaw: float, yaw_speed: float = 0.0
+) -> "mavutil.mavlink.MAVLink_attitude_message":
+    """
+    Level attitude with the yaw.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(
+        time_boot_ms, 0.0, 0.0, yaw, 0.0, 0.0, yaw_speed
+    )
+
+
+class TestTelemetryAligner:
+    """
+    Interpolation of both types onto common timestamps.
+    """
+
+    def test_requires_both_types(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Fails until there is a reading of each type.
+        """
+        # Setup
+        aligner.add_attitude(attitude(100, 0.0))
+
+        # Run
+        result, aligned = aligner.align([100])
+
+        # Test
+        assert not result
+        assert aligned is None
+
+    def test_interpolate(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Linear between readings, vectorised over the timestamps.
+        """
+        # Setup
+        aligner.add_position(position(100, 0.0, 1.0))
+        aligner.add_position(position(200, 1.0, 3.0))
+        aligner.add_attitude(attitude(100, 0.0, 0.0))
+        aligner.add_attitude(attitude(200, 0.2, 0.4))
+
+        # Run
+        result, aligned = aligner.align([100, 125, 150])
+
+        # Test
+        assert result
+        assert aligned is not None
+        assert aligned["x"].tolist() == pytest.approx([0.0, 0.25, 0.5])
+        assert aligned["x_velocity"].tolist() == pytest.approx([1.0, 1.5, 2.0])
+        assert aligned["z"].tolist() == pytest.approx([-10.0, -10.0, -10.0])
+        assert aligned["yaw"].tolist() == pytest.approx([0.0, 0.05, 0.1])
+        assert aligned["yaw_speed"].tolist() == pytest.approx([0.0, 0.1, 0.2])
+        assert set(aligned) == set(
+            telemetry_alignment.POSITION_FIELDS + telemetry_alignment.ATTITUDE_FIELDS
+        )
+
+    def test_extrapolate_position(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Past the newest position, it moves at the newest velocity.
+        """
+        # Setup
+        aligner.add_position(position(100, 0.0, 2.0))
+        aligner.add_position(position(200, 0.2, 2.0))
+        aligner.add_attitude(attitude(450, 0.3, 0.1))
+
+        # Run
+        result, aligned = aligner.align([450])
+
+        # Test
+        assert result
+        assert aligned is not None
+        assert aligned["x"][0] == pytest.approx(0.7)
+        assert aligned["x_velocity"][0] == pytest.approx(2.0)
+        # Attitude is held, not extrapolated
+        assert aligned["yaw"][0] == pytest.approx(0.3)
+
+    def test_hold_before_oldest(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Before the oldest reading, the oldest is held.
+        """
+        # Setup
+        aligner.add_position(position(100, 1.0, 5.0))
+        aligner.add_attitude(attitude(100, 0.5))
+
+        # Run
+        result, aligned = aligner.align([50])
+
+        # Test
+        assert result
+        assert aligned is not None
+        assert aligned["x"][0] == pytest.approx(1.0)
+        assert aligned["yaw"][0] == pytest.approx(0.5)
+
+    def test_yaw_wraps(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Yaw is interpolated along the shorter arc across +-pi and wrapped to [-pi, pi).
+        """
+        # Setup
+        aligner.add_position(position(100, 0.0))
+        aligner.add_attitude(attitude(100, math.pi - 0.1))
+        aligner.add_attitude(attitude(200, -math.pi + 0.1))
+
+        # Run
+        result, aligned = aligner.align([125, 150, 175])
+
+        # Test
+        assert result
+        assert aligned is not None
+        assert aligned["yaw"][0] == pytest.approx(math.pi - 0.05)
+        assert aligned["yaw"][1] == pytest.approx(-math.pi)
+        assert aligned["yaw"][2] == pytest.approx(-math.pi + 0.05)
+
+    def test_oldest_dropped(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Only the most recent readings up to the buffer size are kept.
+        """
+        # Setup
+        for i in range(0, 6):
+            aligner.add_position(position(100 * i, float(i)))
+        aligner.add_attitude(attitude(0, 0.0))
+
+        # Run
+        result, aligned = aligner.align([0])
+
+        # Test
+        assert result
+        assert aligned is not None
+        # The oldest kept is at 200 ms, and is held before it
+        assert aligned["x"][0] == pytest.approx(2.0)
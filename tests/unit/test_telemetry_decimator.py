@@ -0,0 +1,198 @@
+"""
+Test reducing telemetry to a lower rate.
+"""
+
+import math
+
+import pytest
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_decimator
+from tests.unit import recording_logger
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+def create_decimator(
+    mode: telemetry_decimator.DecimationMode,
+    local_logger: recording_logger.RecordingLogger,
+    every_n: int = 1,
+    min_interval: int = 0,
+) -> telemetry_decimator.TelemetryDecimator:
+    """
+    Decimator that must be valid.
+    """
+    result, decimator = telemetry_decimator.TelemetryDecimator.create(
+        mode, local_logger, every_n, min_interval
+    )
+    assert result
+    assert decimator is not None
+
+    return decimator
+
+
+def sample(time_since_boot: "int | None", x: float, yaw: float = 0.0) -> telemetry.TelemetryData:
+    """
+    Sample with a position along x and a yaw.
+    """
+    return telemetry.TelemetryData(time_since_boot=time_since_boot, x=x, yaw=yaw)
+
+
+class TestCreate:
+    """
+    Validation of the settings.
+    """
+
+    def test_every_nth_zero(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Every 0th sample is not a rate.
+        """
+        # Run
+        result, decimator = telemetry_decimator.TelemetryDecimator.create(
+            telemetry_decimator.DecimationMode.EVERY_NTH, local_logger, every_n=0
+        )
+
+        # Test
+        assert not result
+        assert decimator is None
+
+    def test_interval_zero(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Intervals must be positive.
+        """
+        # Run
+        result, decimator = telemetry_decimator.TelemetryDecimator.create(
+            telemetry_decimator.DecimationMode.AVERAGE, local_logger
+        )
+
+        # Test
+        assert not result
+        assert decimator is None
+
+
+class TestPush:
+    """
+    Samples output by each mode.
+    """
+
+    def test_all(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Every sample is output as is.
+        """
+        # Setup
+        decimator = create_decimator(telemetry_decimator.DecimationMode.ALL, local_logger)
+        samples = [sample(100 * i, float(i)) for i in range(0, 3)]
+
+        # Run
+        outputs = [decimator.push(data) for data in samples]
+
+        # Test
+        assert outputs == samples
+
+    def test_every_nth(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        The first sample and every Nth after.
+        """
+        # Setup
+        decimator = create_decimator(
+            telemetry_decimator.DecimationMode.EVERY_NTH, local_logger, every_n=3
+        )
+
+        # Run
+        outputs = [decimator.push(sample(100 * i, float(i))) for i in range(0, 7)]
+
+        # Test
+        assert [output.x for output in outputs if output is not None] == [0.0, 3.0, 6.0]
+
+    def test_min_interval(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Samples within the interval of the previous output are dropped.
+        """
+        # Setup
+        decimator = create_decimator(
+            telemetry_decimator.DecimationMode.MIN_INTERVAL, local_logger, min_interval=100
+        )
+        times = [0, 40, 80, 120, 150, 230]
+
+        # Run
+        outputs = [decimator.push(sample(time, float(time))) for time in times]
+
+        # Test
+        assert [output.time_since_boot for output in outputs if output is not None] == [
+            0,
+            120,
+            230,
+        ]
+
+    def test_min_interval_without_time(
+        self, local_logger: recording_logger.RecordingLogger
+    ) -> None:
+        """
+        Samples without a time pass through.
+        """
+        # Setup
+        decimator = create_decimator(
+            telemetry_decimator.DecimationMode.MIN_INTERVAL, local_logger, min_interval=100
+        )
+        decimator.push(sample(0, 0.0))
+        data = sample(None, 1.0)
+
+        # Run
+        output = decimator.push(data)
+
+        # Test
+        assert output is data
+
+    def test_average(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        The average of each interval is output once the next interval starts,
+        with the time and trace of its last sample.
+        """
+        # Setup
+        decimator = create_decimator(
+            telemetry_decimator.DecimationMode.AVERAGE, local_logger, min_interval=100
+        )
+        samples = [sample(0, 1.0), sample(50, 3.0), sample(100, 10.0)]
+        samples[1].sequence = 7
+
+        # Run
+        outputs = [decimator.push(data) for data in samples]
+
+        # Test
+        assert outputs[0] is None
+        assert outputs[1] is None
+        average = outputs[2]
+        assert average is not None
+        assert average.x == pytest.approx(2.0)
+        assert average.time_since_boot == 50
+        assert average.sequence == 7
+        assert average.y is None
+
+    def test_average_angles(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Angles are averaged on the circle, so yaws either side of +-pi average to pi.
+        """
+        # Setup
+        decimator = create_decimator(
+            telemetry_decimator.DecimationMode.AVERAGE, local_logger, min_interval=100
+        )
+        decimator.push(sample(0, 0.0, math.pi - 0.1))
+        decimator.push(sample(50, 0.0, -math.pi + 0.1))
+
+        # Run
+        average = decimator.push(sample(100, 0.0))
+
+        # Test
+        assert average is not None
+        assert abs(average.yaw) == pytest.approx(math.pi)
@@ -0,0 +1,79 @@
+"""
+Test fanning telemetry out through the decimator worker.
+"""
+
+import threading
+import time
+
+import pytest
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_decimator
+from modules.telemetry import telemetry_decimator_worker
+from tests.unit import recording_logger
+from tests.unit import test_mavlink_router
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger(monkeypatch: pytest.MonkeyPatch) -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger created by the worker.
+    """
+    fake_logger = recording_logger.RecordingLogger()
+    monkeypatch.setattr(
+        telemetry_decimator_worker.logger.Logger,
+        "create",
+        lambda name, enable_log_to_file: (True, fake_logger),
+    )
+    yield fake_logger  # type: ignore
+
+
+class TestTelemetryDecimatorWorker:
+    """
+    Each consumer gets the samples of its own decimator.
+    """
+
+    def test_fan_out(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Every sample is pushed to every decimator, and sentinels are skipped.
+        """
+        # Setup
+        _, every_sample = telemetry_decimator.TelemetryDecimator.create(
+            telemetry_decimator.DecimationMode.ALL, local_logger
+        )
+        _, every_other = telemetry_decimator.TelemetryDecimator.create(
+            telemetry_decimator.DecimationMode.EVERY_NTH, local_logger, every_n=2
+        )
+        input_queue = test_mavlink_router.ListQueue()
+        all_queue = test_mavlink_router.ListQueue()
+        other_queue = test_mavlink_router.ListQueue()
+        controller = worker_controller.WorkerController()
+
+        for i in range(0, 5):
+            input_queue.put(telemetry.TelemetryData(time_since_boot=100 * i))
+        input_queue.put(None)
+
+        worker = threading.Thread(
+            target=telemetry_decimator_worker.telemetry_decimator_worker,
+            args=([(every_sample, all_queue), (every_other, other_queue)], input_queue, controller),
+        )
+
+        # Run
+        worker.start()
+        for _ in range(0, 100):
+            if len(input_queue.items) == 0:
+                break
+            time.sleep(0.01)
+        controller.request_exit()
+        worker.join(1.0)
+
+        # Test
+        assert not worker.is_alive()
+        assert [data.time_since_boot for data in all_queue.items] == [0, 100, 200, 300, 400]
+        assert [data.time_since_boot for data in other_queue.items] == [0, 200, 400]
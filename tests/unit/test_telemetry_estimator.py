@@ -0,0 +1,304 @@
+"""
+Test filtering telemetry.
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_estimator
+from modules.telemetry import telemetry_estimator_worker
+from tests.unit import recording_logger
+from tests.unit import test_mavlink_router
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+SAMPLE_PERIOD = 0.05  # s
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+@pytest.fixture()
+def estimator(
+    local_logger: recording_logger.RecordingLogger,
+) -> telemetry_estimator.TelemetryEstimator:  # type: ignore
+    """
+    Estimator with the default noise.
+    """
+    result, estimator_instance = telemetry_estimator.TelemetryEstimator.create(local_logger)
+    assert result
+    assert estimator_instance is not None
+
+    yield estimator_instance  # type: ignore
+
+
+def wrap(angle: float) -> float:
+    """
+    Angle in [-pi, pi).
+    """
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+class TestCreate:
+    """
+    Validation of the settings.
+    """
+
+    def test_unknown_field(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Only state fields are measured.
+        """
+        # Run
+        result, estimator_instance = telemetry_estimator.TelemetryEstimator.create(
+            local_logger, {"roll": 0.1}
+        )
+
+        # Test
+        assert not result
+        assert estimator_instance is None
+
+    def test_zero_noise(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Noise must be positive.
+        """
+        # Run
+        result, estimator_instance = telemetry_estimator.TelemetryEstimator.create(
+            local_logger, acceleration_noise=0.0
+        )
+
+        # Test
+        assert not result
+        assert estimator_instance is None
+
+
+class TestTelemetryEstimator:
+    """
+    Filtering samples into estimates.
+    """
+
+    def test_no_samples(self, estimator: telemetry_estimator.TelemetryEstimator) -> None:
+        """
+        There is nothing to estimate before the first sample.
+        """
+        # Run
+        data = estimator.estimate(1.0)
+
+        # Test
+        assert data is None
+
+    def test_converges(self, estimator: telemetry_estimator.TelemetryEstimator) -> None:
+        """
+        On a noisy constant velocity track, the estimate is closer to the truth than the samples.
+        """
+        # Setup
+        rng = np.random.default_rng(0)
+        velocity = 2.0
+        sample_errors = []
+
+        # Run
+        for i in range(0, 200):
+            sample_time = i * SAMPLE_PERIOD
+            x = 1.0 + velocity * sample_time
+            noisy_x = x + rng.normal(0.0, 0.5)
+            sample_errors.append(abs(noisy_x - x))
+            estimator.update(
+                telemetry.TelemetryData(
+                    time_since_boot=round(sample_time * 1000),
+                    x=noisy_x,
+                    x_velocity=velocity + rng.normal(0.0, 0.2),
+                ),
+                sample_time,
+            )
+
+        data = estimator.estimate(200 * SAMPLE_PERIOD)
+
+        # Test
+        assert data is not None
+        assert data.x == pytest.approx(1.0 + velocity * 200 * SAMPLE_PERIOD, abs=0.3)
+        assert data.x_velocity == pytest.approx(velocity, abs=0.1)
+        assert abs(data.x - (1.0 + velocity * 200 * SAMPLE_PERIOD)) < np.mean(sample_errors)
+        assert estimator.get_sample_count() == 200
+
+    def test_missing_field_skipped(self, estimator: telemetry_estimator.TelemetryEstimator) -> None:
+        """
+        A field missing from a sample is not measured, so it keeps its estimate.
+        """
+        # Setup
+        estimator.update(telemetry.TelemetryData(time_since_boot=0, x=5.0, x_velocity=0.0), 0.0)
+
+        # Run
+        estimator.update(telemetry.TelemetryData(time_since_boot=50, y=3.0), SAMPLE_PERIOD)
+        data = estimator.estimate(SAMPLE_PERIOD)
+
+        # Test
+        assert data is not None
+        assert data.x == pytest.approx(5.0)
+        assert data.y == pytest.approx(3.0, abs=0.01)
+        # Never measured
+        assert data.z == 0.0
+
+    def test_yaw_crosses_pi(self, estimator: telemetry_estimator.TelemetryEstimator) -> None:
+        """
+        Yaw turning through +-pi is tracked along the shorter arc and stays wrapped.
+        """
+        # Setup
+        yaw_speed = 1.0
+
+        # Run
+        for i in range(0, 40):
+            sample_time = i * SAMPLE_PERIOD
+            estimator.update(
+                telemetry.TelemetryData(
+                    time_since_boot=round(sample_time * 1000),
+                    yaw=wrap(math.pi - 1.0 + yaw_speed * sample_time),
+                    yaw_speed=yaw_speed,
+                ),
+                sample_time,
+            )
+
+        data = estimator.estimate(40 * SAMPLE_PERIOD)
+
+        # Test
+        assert data is not None
+        expected_yaw = wrap(math.pi - 1.0 + yaw_speed * 40 * SAMPLE_PERIOD)
+        assert expected_yaw < 0.0
+        assert -math.pi <= data.yaw < math.pi
+        assert wrap(data.yaw - expected_yaw) == pytest.approx(0.0, abs=0.01)
+        assert data.yaw_speed == pytest.approx(yaw_speed, abs=0.01)
+
+    def test_stale_sample(self, estimator: telemetry_estimator.TelemetryEstimator) -> None:
+        """
+        A sample older than the last estimate is applied at the time of that estimate.
+        """
+        # Setup
+        estimator.update(telemetry.TelemetryData(time_since_boot=1000, x=0.0, x_velocity=0.0), 1.0)
+        estimator.estimate(2.0)
+
+        # Run
+        estimator.update(telemetry.TelemetryData(time_since_boot=1500, x=10.0), 1.5)
+        data = estimator.estimate(2.0)
+
+        # Test
+        assert data is not None
+        assert estimator.get_sample_count() == 2
+        assert data.x > 0.0
+        # The stale sample is aged to the state, which did not go back in time
+        assert data.time_since_boot == 2000
+
+    def test_estimate_at_fixed_times(
+        self, estimator: telemetry_estimator.TelemetryEstimator
+    ) -> None:
+        """
+        Between samples, each estimate is predicted forward to its time.
+        """
+        # Setup
+        estimator.update(telemetry.TelemetryData(time_since_boot=0, x=0.0, x_velocity=2.0), 0.0)
+        estimator.update(
+            telemetry.TelemetryData(time_since_boot=100, x=0.2, x_velocity=2.0, ingest_time=0.1)
+        )
+
+        # Run
+        outputs = [estimator.estimate(0.1 + 0.02 * i) for i in range(1, 4)]
+
+        # Test
+        assert [data.time_since_boot for data in outputs if data is not None] == [120, 140, 160]
+        # Marked as propagated to the estimate time, while the trace is of the newest sample
+        assert [data.state_time for data in outputs if data is not None] == pytest.approx(
+            [0.12, 0.14, 0.16]
+        )
+        assert [data.ingest_time for data in outputs if data is not None] == [0.1, 0.1, 0.1]
+        assert [data.x for data in outputs if data is not None] == pytest.approx(
+            [0.24, 0.28, 0.32], abs=0.01
+        )
+
+
+@pytest.fixture()
+def worker_logger(monkeypatch: pytest.MonkeyPatch) -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger created by the worker.
+    """
+    fake_logger = recording_logger.RecordingLogger()
+    monkeypatch.setattr(
+        telemetry_estimator_worker.logger.Logger,
+        "create",
+        lambda name, enable_log_to_file: (True, fake_logger),
+    )
+    yield fake_logger  # type: ignore
+
+
+def run_worker(
+    output_period: float, input_queue: test_mavlink_router.ListQueue, duration: float
+) -> "list[telemetry.TelemetryData]":
+    """
+    Runs the worker in a thread for the duration.
+
+    Returns the estimates output.
+    """
+    output_queue = test_mavlink_router.ListQueue()
+    controller = worker_controller.WorkerController()
+    worker = threading.Thread(
+        target=telemetry_estimator_worker.telemetry_estimator_worker,
+        args=(output_period, input_queue, output_queue, controller),
+    )
+
+    worker.start()
+    time.sleep(duration)
+    controller.request_exit()
+    worker.join(1.0)
+
+    assert not worker.is_alive()
+    return output_queue.items
+
+
+class TestTelemetryEstimatorWorker:
+    """
+    Estimates are output at a fixed rate.
+    """
+
+    def test_no_samples(self, worker_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Nothing is output before the first sample.
+        """
+        _ = worker_logger
+
+        # Run
+        outputs = run_worker(0.01, test_mavlink_router.ListQueue(), 0.1)
+
+        # Test
+        assert len(outputs) == 0
+
+    def test_fixed_rate(self, worker_logger: recording_logger.RecordingLogger) -> None:
+        """
+        A single sample is followed by an estimate every period, and sentinels are skipped.
+        """
+        _ = worker_logger
+
+        # Setup
+        input_queue = test_mavlink_router.ListQueue()
+        input_queue.put(telemetry.TelemetryData(time_since_boot=0, x=1.0, x_velocity=0.0))
+        input_queue.put(None)
+
+        # Run
+        outputs = run_worker(0.02, input_queue, 0.2)
+
+        # Test
+        # Up to the 10 periods, allowing for scheduling
+        assert 3 <= len(outputs) <= 10
+        times = [data.time_since_boot for data in outputs]
+        assert times == sorted(times)
+        assert all(data.publish_time is not None for data in outputs)
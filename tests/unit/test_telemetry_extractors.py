@@ -0,0 +1,164 @@
+"""
+Test compiling the table of message fields to extract.
+"""
+
+import pytest
+
+from pymavlink import mavutil
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_extractors
+from tests.unit import recording_logger
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+FIELDS = telemetry.TelemetryData.FIELDS
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+def attitude() -> "mavutil.mavlink.MAVLink_attitude_message":
+    """
+    Attitude with distinct values.
+    """
+    return mavutil.mavlink.MAVLink_attitude_message(100, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6)
+
+
+class TestCompileTable:
+    """
+    Extractors of the default table and validation of invalid tables.
+    """
+
+    def test_default_table(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Each message type writes only its own fields.
+        """
+        # Setup
+        result, extractors = telemetry_extractors.compile_table(
+            telemetry_extractors.DEFAULT_TABLE, FIELDS, local_logger
+        )
+        assert result
+        assert extractors is not None
+
+        values = [None] * len(FIELDS)
+
+        # Run
+        extractors[mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE](attitude(), values)
+
+        # Test
+        assert set(extractors) == {
+            mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE,
+            mavutil.mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED,
+        }
+        extracted = dict(zip(FIELDS, values))
+        assert extracted["attitude_time_since_boot"] == 100
+        assert extracted["roll"] == pytest.approx(0.1)
+        assert extracted["yaw_speed"] == pytest.approx(0.6)
+        assert extracted["x"] is None
+        assert extracted["position_time_since_boot"] is None
+
+    def test_single_field(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        A single field is extracted once.
+        """
+        # Setup
+        result, extractors = telemetry_extractors.compile_table(
+            {"ATTITUDE": {"yaw": "yaw"}}, FIELDS, local_logger
+        )
+        assert result
+        assert extractors is not None
+
+        values = [None] * len(FIELDS)
+
+        # Run
+        extractors[mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE](attitude(), values)
+
+        # Test
+        assert values[FIELDS.index("yaw")] == pytest.approx(0.3)
+        assert sum(value is not None for value in values) == 1
+
+    def test_scaled(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Scales apply only to their own field.
+        """
+        # Setup
+        result, extractors = telemetry_extractors.compile_table(
+            {"ATTITUDE": {"yaw": ("yaw", 10.0), "roll": "roll"}}, FIELDS, local_logger
+        )
+        assert result
+        assert extractors is not None
+
+        values = [None] * len(FIELDS)
+
+        # Run
+        extractors[mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE](attitude(), values)
+
+        # Test
+        assert values[FIELDS.index("yaw")] == pytest.approx(3.0)
+        assert values[FIELDS.index("roll")] == pytest.approx(0.1)
+
+    def test_unknown_message_type(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Message types must be MAVLink messages.
+        """
+        # Run
+        result, extractors = telemetry_extractors.compile_table(
+            {"NOT_A_MESSAGE": {"yaw": "yaw"}}, FIELDS, local_logger
+        )
+
+        # Test
+        assert not result
+        assert extractors is None
+        assert local_logger.get_levels("Unknown message type NOT_A_MESSAGE") == ["error"]
+
+    def test_no_fields(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Every message type must have a field to extract.
+        """
+        # Run
+        result, extractors = telemetry_extractors.compile_table(
+            {"ATTITUDE": {}}, FIELDS, local_logger
+        )
+
+        # Test
+        assert not result
+        assert extractors is None
+        assert local_logger.get_levels("No fields to extract from ATTITUDE") == ["error"]
+
+    def test_unknown_telemetry_field(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Fields must be TelemetryData fields.
+        """
+        # Run
+        result, extractors = telemetry_extractors.compile_table(
+            {"ATTITUDE": {"heading": "yaw"}}, FIELDS, local_logger
+        )
+
+        # Test
+        assert not result
+        assert extractors is None
+        assert local_logger.get_levels("Unknown telemetry field heading for ATTITUDE") == ["error"]
+
+    def test_unknown_message_field(self, local_logger: recording_logger.RecordingLogger) -> None:
+        """
+        Message fields must be in the MAVLink definition of the message.
+        """
+        # Run
+        result, extractors = telemetry_extractors.compile_table(
+            {"ATTITUDE": {"yaw": ("heading", 1.0)}}, FIELDS, local_logger
+        )
+
+        # Test
+        assert not result
+        assert extractors is None
+        assert local_logger.get_levels("Unknown message field heading of ATTITUDE") == ["error"]
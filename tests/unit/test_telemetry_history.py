@@ -0,0 +1,230 @@
+"""
+Test the shared memory history of telemetry samples.
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_history
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+CAPACITY = 4
+
+
+@pytest.fixture()
+def history() -> telemetry_history.TelemetryHistory:  # type: ignore
+    """
+    Empty history with a small capacity.
+    """
+    telemetry_history_instance = telemetry_history.TelemetryHistory(CAPACITY)
+    yield telemetry_history_instance  # type: ignore
+    telemetry_history_instance.close()
+
+
+def sample(time_since_boot: int, x: float) -> telemetry.TelemetryData:
+    """
+    Sample with only a position along x, and the attitude missing.
+    """
+    return telemetry.TelemetryData(
+        time_since_boot=time_since_boot, x=x, position_time_since_boot=time_since_boot
+    )
+
+
+class TestAppend:
+    """
+    Storing samples in the ring buffer.
+    """
+
+    def test_without_time(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Samples without a time cannot be queried, so they are not stored.
+        """
+        # Run
+        result = history.append(telemetry.TelemetryData(x=1.0))
+
+        # Test
+        assert not result
+        assert history.size() == 0
+
+    def test_overwrites_oldest(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Only the most recent samples up to the capacity are retained, in time order.
+        """
+        # Setup
+        for i in range(0, CAPACITY + 2):
+            history.append(sample(100 * i, float(i)))
+
+        # Run
+        columns = history.range(0, 10000)
+
+        # Test
+        assert history.size() == CAPACITY
+        assert columns["time_since_boot"].tolist() == [200.0, 300.0, 400.0, 500.0]
+        assert columns["x"].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+class TestAt:
+    """
+    Sample in effect at a time.
+    """
+
+    def test_between_samples(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        The latest sample at or before the time, with missing fields as None.
+        """
+        # Setup
+        history.append(sample(100, 1.0))
+        history.append(sample(200, 2.0))
+
+        # Run
+        data_exact = history.at(200)
+        data_between = history.at(150)
+
+        # Test
+        assert data_exact is not None
+        assert data_exact.x == 2.0
+        assert data_between is not None
+        assert data_between.x == 1.0
+        assert data_between.time_since_boot == 100
+        assert isinstance(data_between.time_since_boot, int)
+        assert data_between.yaw is None
+
+    def test_empty(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        None before any sample.
+        """
+        # Run
+        data = history.at(100)
+
+        # Test
+        assert data is None
+
+    def test_before_samples(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        None before the oldest retained sample, even if it was once stored.
+        """
+        # Setup
+        for i in range(0, CAPACITY + 1):
+            history.append(sample(100 * (i + 1), float(i)))
+
+        # Run
+        data = history.at(150)
+
+        # Test
+        assert data is None
+
+
+class TestRange:
+    """
+    Copies of the columns over a time range.
+    """
+
+    def test_inclusive(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Both ends are included.
+        """
+        # Setup
+        for i in range(0, CAPACITY):
+            history.append(sample(100 * i, float(i)))
+
+        # Run
+        columns = history.range(100, 200)
+
+        # Test
+        assert set(columns) == set(telemetry_history.FIELDS)
+        assert columns["x"].tolist() == [1.0, 2.0]
+        assert np.isnan(columns["yaw"]).all()
+
+    def test_empty(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Every column is empty if there are no samples in range.
+        """
+        # Setup
+        history.append(sample(100, 1.0))
+
+        # Run
+        columns = history.range(200, 300)
+
+        # Test
+        assert all(len(column) == 0 for column in columns.values())
+
+    def test_copy(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Changing the copy does not change the history.
+        """
+        # Setup
+        history.append(sample(100, 1.0))
+
+        # Run
+        history.range(0, 100)["x"][0] = 5.0
+
+        # Test
+        assert history.range(0, 100)["x"].tolist() == [1.0]
+
+
+class TestAggregate:
+    """
+    Reductions of each field over a time range.
+    """
+
+    def test_mean(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Mean over the range, ignoring fields missing from some samples.
+        """
+        # Setup
+        history.append(sample(100, 1.0))
+        history.append(telemetry.TelemetryData(time_since_boot=200, yaw=0.5))
+        history.append(sample(300, 3.0))
+
+        # Run
+        data = history.aggregate(100, 300)
+
+        # Test
+        assert data is not None
+        assert data.x == pytest.approx(2.0)
+        assert data.yaw == pytest.approx(0.5)
+        assert data.time_since_boot == 200
+
+    def test_missing_field(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Fields missing from every sample are None, without warning.
+        """
+        # Setup
+        history.append(sample(100, 1.0))
+        history.append(sample(200, 3.0))
+
+        # Run
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            data_mean = history.aggregate(100, 200)
+            data_max = history.aggregate(100, 200, np.nanmax)
+
+        # Test
+        assert data_mean is not None
+        assert data_mean.yaw is None
+        assert data_mean.roll_speed is None
+        assert data_mean.x == pytest.approx(2.0)
+        assert data_max is not None
+        assert data_max.yaw is None
+        assert data_max.x == 3.0
+
+    def test_empty(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        None if there are no samples in range.
+        """
+        # Setup
+        history.append(sample(100, 1.0))
+
+        # Run
+        data = history.aggregate(200, 300)
+
+        # Test
+        assert data is None
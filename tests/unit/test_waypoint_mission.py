@@ -0,0 +1,162 @@
+"""
+Test the waypoint index and mission.
+"""
+
+import math
+import random
+
+import pytest
+
+from modules.command import waypoint_mission
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def waypoints() -> "list[tuple[float, float, float]]":  # type: ignore
+    """
+    Random waypoints over a 1 km survey area.
+    """
+    generator = random.Random(0)
+    yield [  # type: ignore
+        (generator.uniform(0, 1000), generator.uniform(0, 1000), generator.uniform(0, 50))
+        for _ in range(2000)
+    ]
+
+
+class TestWaypointIndex:
+    """
+    Nearest and radius searches skip removed waypoints.
+    """
+
+    def test_nearest(self, waypoints: "list[tuple[float, float, float]]") -> None:
+        """
+        Same result as a linear search, including after removals.
+        """
+        # Setup
+        index = waypoint_mission.WaypointIndex(waypoints)
+        for i in range(0, len(waypoints), 3):
+            index.remove(i)
+
+        for position in [(0, 0, 0), (500, 500, 25), (999, 1, 10)]:
+            # Run
+            nearest = index.nearest(position)
+
+            # Test
+            distances = {
+                i: math.dist(waypoints[i], position) for i in range(len(waypoints)) if i % 3 != 0
+            }
+            expected = min(distances, key=distances.get)
+            assert nearest == expected
+
+    def test_within(self, waypoints: "list[tuple[float, float, float]]") -> None:
+        """
+        Same result as a linear search.
+        """
+        # Setup
+        index = waypoint_mission.WaypointIndex(waypoints)
+        position = (300, 600, 20)
+
+        # Run
+        found = index.within(position, 50)
+
+        # Test
+        expected = [
+            i for i, waypoint in enumerate(waypoints) if math.dist(waypoint, position) <= 50
+        ]
+        assert sorted(found) == expected
+
+    def test_all_removed(self) -> None:
+        """
+        Nothing is found once every waypoint is removed.
+        """
+        # Setup
+        index = waypoint_mission.WaypointIndex([(0, 0, 0), (1, 1, 1)])
+
+        # Run
+        index.remove(0)
+        index.remove(1)
+        index.remove(1)
+
+        # Test
+        assert len(index) == 0
+        assert index.nearest((0, 0, 0)) is None
+        assert len(index.within((0, 0, 0), 10)) == 0
+
+
+class TestWaypointMission:
+    """
+    Target advances to the nearest unvisited waypoint on arrival.
+    """
+
+    def test_create_empty(self) -> None:
+        """
+        A mission needs waypoints.
+        """
+        # Run
+        result, mission = waypoint_mission.WaypointMission.create([], 1.0)
+
+        # Test
+        assert not result
+        assert mission is None
+
+    def test_advance(self) -> None:
+        """
+        Starts at the first waypoint, then goes to the nearest unvisited.
+        """
+        # Setup
+        result, mission = waypoint_mission.WaypointMission.create(
+            [(0, 0, 10), (100, 0, 10), (10, 0, 10), (10, 0.5, 10)], 1.0
+        )
+        assert result
+
+        # Run and test
+        assert mission.get_target() == (0, 0, 10)
+        assert not mission.update(5, 0, 10)
+
+        assert mission.update(0, 0, 10)
+        assert mission.get_target() == (10, 0, 10)
+
+        # Arriving at one visits both that are within the radius
+        assert mission.update(10, 0.2, 10)
+        assert mission.get_target() == (100, 0, 10)
+        assert mission.get_remaining() == 1
+
+        assert mission.update(100, 0, 10)
+        assert mission.get_target() is None
+        assert not mission.update(100, 0, 10)
+
+    def test_load(self, tmp_path: "pytest.TempPathFactory") -> None:
+        """
+        Rows of x, y, z with comments and blank rows.
+        """
+        # Setup
+        path = tmp_path / "mission.csv"
+        path.write_text("# x,y,z\n1,2,3\n\n4.5,5,6\n", encoding="utf-8")
+
+        # Run
+        result, mission = waypoint_mission.WaypointMission.load(str(path), 1.0)
+
+        # Test
+        assert result
+        assert mission.get_target() == (1.0, 2.0, 3.0)
+        assert mission.get_remaining() == 2
+
+    def test_load_invalid(self, tmp_path: "pytest.TempPathFactory") -> None:
+        """
+        Malformed rows and missing files fail.
+        """
+        # Setup
+        path = tmp_path / "mission.csv"
+        path.write_text("1,2\n", encoding="utf-8")
+
+        # Run
+        result, _ = waypoint_mission.WaypointMission.load(str(path), 1.0)
+        missing_result, _ = waypoint_mission.WaypointMission.load(str(tmp_path / "none"), 1.0)
+
+        # Test
+        assert not result
+        assert not missing_result
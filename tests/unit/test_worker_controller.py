@@ -0,0 +1,111 @@
+"""
+Test the worker controller.
+"""
+
+import multiprocessing as mp
+
+import pytest
+
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+JOIN_TIMEOUT = 5.0  # seconds
+PAUSED_CHECK_DELAY = 0.1  # seconds
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Creates a worker controller.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+def pause_then_exit(controller: worker_controller.WorkerController) -> None:
+    """
+    Worker loop that only passes the pause check, for running in another process.
+    """
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+
+class TestWorkerController:
+    """
+    Exit and pause requests.
+    """
+
+    def test_exit(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Exit is requested and then cleared.
+        """
+        # Run
+        before = controller.is_exit_requested()
+        controller.request_exit()
+        controller.request_exit()
+        requested = controller.is_exit_requested()
+        controller.clear_exit()
+        cleared = controller.is_exit_requested()
+
+        # Test
+        assert not before
+        assert requested
+        assert not cleared
+
+    def test_exit_other_process(self, controller: worker_controller.WorkerController) -> None:
+        """
+        A worker in another process sees the exit request.
+        """
+        # Setup
+        worker = mp.Process(target=pause_then_exit, args=(controller,))
+        worker.start()
+
+        # Run
+        controller.request_exit()
+        worker.join(JOIN_TIMEOUT)
+
+        # Test
+        assert not worker.is_alive()
+
+    def test_loop_start_time(self, controller: worker_controller.WorkerController) -> None:
+        """
+        A worker reports the time it first checked for exit.
+        """
+        # Setup
+        controller.request_exit()
+        worker = mp.Process(target=pause_then_exit, args=(controller,))
+
+        # Run
+        worker.start()
+        worker.join(JOIN_TIMEOUT)
+        loop_start_times = controller.get_loop_start_times()
+
+        # Test
+        assert worker.pid in loop_start_times
+
+    def test_pause_blocks_worker(self, controller: worker_controller.WorkerController) -> None:
+        """
+        A paused worker does not see the exit request until resumed.
+        """
+        # Setup
+        controller.request_pause()
+        worker = mp.Process(target=pause_then_exit, args=(controller,))
+        worker.start()
+
+        # Run
+        worker.join(PAUSED_CHECK_DELAY)
+        is_blocked = worker.is_alive()
+        controller.request_exit()
+        worker.join(PAUSED_CHECK_DELAY)
+        is_still_blocked = worker.is_alive()
+        controller.request_resume()
+        worker.join(JOIN_TIMEOUT)
+
+        # Test
+        assert is_blocked
+        assert is_still_blocked
+        assert not worker.is_alive()
@@ -0,0 +1,185 @@
+"""
+Test restarting workers of the worker manager with short-lived processes.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from tests.unit import recording_logger
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+JOIN_TIMEOUT = 5.0  # seconds
+
+
+def exit_with(code: int, controller: worker_controller.WorkerController) -> None:
+    """
+    Worker that ends at once with the exit code.
+    """
+    _ = controller
+    raise SystemExit(code)
+
+
+def wait_for_exit(controller: worker_controller.WorkerController) -> None:
+    """
+    Worker that runs until exit is requested.
+    """
+    while not controller.is_exit_requested():
+        time.sleep(0.01)
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Creates a worker controller.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+def create_manager(
+    target: "(...) -> object",  # type: ignore
+    work_arguments: tuple,
+    controller: worker_controller.WorkerController,
+    local_logger: recording_logger.RecordingLogger,
+) -> worker_manager.WorkerManager:
+    """
+    Manager of a single worker that must be valid.
+    """
+    result, properties = worker_manager.WorkerProperties.create(
+        1, target, work_arguments, [], [], controller, local_logger
+    )
+    assert result
+    assert properties is not None
+
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)
+    assert result
+    assert manager is not None
+
+    return manager
+
+
+def wait_until_ended(manager: worker_manager.WorkerManager) -> None:
+    """
+    Waits for every worker of the manager to end.
+    """
+    deadline = time.monotonic() + JOIN_TIMEOUT
+    while None in manager.get_worker_exit_codes():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestRestartWorker:
+    """
+    Replacing dead workers.
+    """
+
+    def test_exit_codes(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        None until the worker ends, then the code it exited with.
+        """
+        # Setup
+        manager = create_manager(exit_with, (3,), controller, local_logger)
+
+        # Run
+        before = manager.get_worker_exit_codes()
+        manager.start_workers()
+        wait_until_ended(manager)
+
+        # Test
+        assert before == [None]
+        assert manager.get_worker_exit_codes() == [3]
+
+    def test_restart_dead(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        A dead worker is replaced by a new process that is already started.
+        """
+        # Setup
+        manager = create_manager(exit_with, (1,), controller, local_logger)
+        manager.start_workers()
+        wait_until_ended(manager)
+        dead_sentinel = manager.get_worker_sentinels()[0]
+
+        # Run
+        result = manager.restart_worker(0)
+
+        # Test
+        assert result
+        assert manager.get_worker_sentinels()[0] != dead_sentinel
+        wait_until_ended(manager)
+        assert manager.get_worker_exit_codes() == [1]
+
+    def test_restart_alive(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        A worker that is alive is left running.
+        """
+        # Setup
+        manager = create_manager(wait_for_exit, (), controller, local_logger)
+        manager.start_workers()
+        sentinel = manager.get_worker_sentinels()[0]
+
+        # Run
+        result = manager.restart_worker(0)
+        controller.request_exit()
+        manager.join_workers()
+
+        # Test
+        assert result
+        assert manager.get_worker_sentinels()[0] == sentinel
+        assert manager.get_worker_exit_codes() == [0]
+
+    def test_failed_start(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        If the new worker cannot start, the dead worker is kept to retry on.
+        """
+        # Setup
+        manager = create_manager(exit_with, (1,), controller, local_logger)
+        manager.start_workers()
+        wait_until_ended(manager)
+        dead_sentinel = manager.get_worker_sentinels()[0]
+
+        def fail_start(_: mp.Process) -> None:
+            raise OSError("No more processes")
+
+        monkeypatch.setattr(mp.get_context().Process, "start", fail_start)
+
+        # Run
+        result = manager.restart_worker(0)
+
+        # Test
+        assert not result
+        assert manager.get_worker_sentinels()[0] == dead_sentinel
+        assert manager.get_worker_exit_codes() == [1]
+        assert [level for level, _ in local_logger.messages] == ["error"]
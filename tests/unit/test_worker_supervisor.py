@@ -0,0 +1,220 @@
+"""
+Test the scheduling of restarts of the worker supervisor with short-lived processes.
+"""
+
+import time
+
+import pytest
+
+from tests.unit import recording_logger
+from tests.unit import test_worker_manager
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+from utilities.workers import worker_supervisor
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger() -> recording_logger.RecordingLogger:  # type: ignore
+    """
+    Logger that records.
+    """
+    yield recording_logger.RecordingLogger()  # type: ignore
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Creates a worker controller.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+def supervise(
+    manager: worker_manager.WorkerManager,
+    controller: worker_controller.WorkerController,
+    local_logger: recording_logger.RecordingLogger,
+    duration: float,
+    **kwargs: object,
+) -> worker_supervisor.WorkerSupervisor:
+    """
+    Starts the worker and supervises it for the duration.
+    """
+    result, supervisor = worker_supervisor.WorkerSupervisor.create(
+        [manager], controller, local_logger, **kwargs
+    )
+    assert result
+    assert supervisor is not None
+
+    manager.start_workers()
+    supervisor.start()
+    time.sleep(duration)
+    supervisor.stop()
+
+    return supervisor
+
+
+def get_messages(local_logger: recording_logger.RecordingLogger, level: str) -> "list[str]":
+    """
+    Messages logged at the level.
+    """
+    return [message for logged_level, message in local_logger.messages if logged_level == level]
+
+
+class TestCreate:
+    """
+    Validation of the settings.
+    """
+
+    def test_backoff_order(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        The initial backoff may not exceed the maximum.
+        """
+        # Run
+        result, supervisor = worker_supervisor.WorkerSupervisor.create(
+            [], controller, local_logger, initial_backoff=2.0, max_backoff=1.0
+        )
+
+        # Test
+        assert not result
+        assert supervisor is None
+
+    def test_crash_loop_limit(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        The crash loop limit must be positive.
+        """
+        # Run
+        result, supervisor = worker_supervisor.WorkerSupervisor.create(
+            [], controller, local_logger, crash_loop_limit=0
+        )
+
+        # Test
+        assert not result
+        assert supervisor is None
+
+
+class TestWorkerSupervisor:
+    """
+    Restarts of workers that end.
+    """
+
+    def test_backoff_and_crash_loop(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        A crashing worker is restarted after a doubling backoff up to the maximum,
+        until it crashes more than the limit within the window.
+        """
+        # Setup
+        manager = test_worker_manager.create_manager(
+            test_worker_manager.exit_with, (1,), controller, local_logger
+        )
+
+        # Run
+        supervisor = supervise(
+            manager,
+            controller,
+            local_logger,
+            1.0,
+            initial_backoff=0.01,
+            max_backoff=0.05,
+            crash_loop_limit=4,
+            crash_loop_window=60.0,
+        )
+
+        # Test
+        assert supervisor.get_restart_counts() == {"exit_with": 4}
+        assert get_messages(local_logger, "warning") == [
+            f"exit_with worker 0 died, restarting in {backoff}s"
+            for backoff in (0.01, 0.02, 0.04, 0.05)
+        ]
+        assert get_messages(local_logger, "error") == [
+            "exit_with worker 0 crashed 5 times in 60.0s, not restarting"
+        ]
+
+    def test_crash_window(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        Crashes older than the window do not count, so the backoff does not grow
+        and the worker keeps being restarted.
+        """
+        # Setup
+        manager = test_worker_manager.create_manager(
+            test_worker_manager.exit_with, (1,), controller, local_logger
+        )
+
+        # Run
+        supervisor = supervise(
+            manager,
+            controller,
+            local_logger,
+            0.5,
+            initial_backoff=0.05,
+            crash_loop_limit=1,
+            crash_loop_window=0.01,
+        )
+
+        # Test
+        assert supervisor.get_restart_counts()["exit_with"] >= 3
+        assert set(get_messages(local_logger, "warning")) == {
+            "exit_with worker 0 died, restarting in 0.05s"
+        }
+        assert get_messages(local_logger, "error") == []
+
+    def test_finished(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        A worker that exits with code 0 has finished and is not restarted.
+        """
+        # Setup
+        manager = test_worker_manager.create_manager(
+            test_worker_manager.exit_with, (0,), controller, local_logger
+        )
+
+        # Run
+        supervisor = supervise(manager, controller, local_logger, 0.3, initial_backoff=0.01)
+
+        # Test
+        assert supervisor.get_restart_counts() == {"exit_with": 0}
+        assert local_logger.get_levels("exit_with worker 0 finished, not restarting") == ["info"]
+
+    def test_exit_requested(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: recording_logger.RecordingLogger,
+    ) -> None:
+        """
+        Nothing is restarted once exit has been requested.
+        """
+        # Setup
+        manager = test_worker_manager.create_manager(
+            test_worker_manager.exit_with, (1,), controller, local_logger
+        )
+        controller.request_exit()
+
+        # Run
+        supervisor = supervise(manager, controller, local_logger, 0.3, initial_backoff=0.01)
+
+        # Test
+        assert supervisor.get_restart_counts() == {"exit_with": 0}
+        assert len(local_logger.messages) == 0
@@ -0,0 +1,175 @@
+"""
+Latest value channel.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import pickle
+import struct
+
+from . import shared_memory_queue
+
+
+DEFAULT_KEY = "latest"
+
+
+class LatestValueChannel:
+    """
+    Holds only the most recent value of each key in shared memory.
+
+    A put overwrites the previous value and never waits for the reader.
+    Every put increments the sequence number of the key so readers can tell whether anything
+    new arrived, sequence 0 means nothing has been put yet.
+
+    Also has the batch and shutdown methods of `QueueProxyWrapper` so a worker can be given
+    either, in which case each reader process only receives values it has not seen yet.
+    """
+
+    __SLOT_HEADER_FORMAT = "=QI"  # sequence, length
+    __SLOT_HEADER_SIZE = struct.calcsize(__SLOT_HEADER_FORMAT)
+
+    def __init__(
+        self,
+        keys: "tuple[str, ...]" = (DEFAULT_KEY,),
+        slot_size: int = shared_memory_queue.DEFAULT_SLOT_SIZE,
+    ) -> None:
+        """
+        Constructor allocates a slot in shared memory for each key.
+
+        keys: Names of the values held.
+        slot_size: Size of a slot in bytes, including the header of the pickled value.
+        """
+        assert len(keys) > 0, "Channel requires at least 1 key"
+        assert slot_size > self.__SLOT_HEADER_SIZE, "Slot too small"
+
+        self.__indices = {key: i for i, key in enumerate(keys)}
+        self.__slot_size = slot_size
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=len(keys) * slot_size,
+        )
+        for i in range(len(keys)):
+            struct.pack_into(
+                self.__SLOT_HEADER_FORMAT, self.__shared_memory.buf, i * slot_size, 0, 0
+            )
+
+        self.__condition = mp.Condition()
+
+        # Local to each process after pickling
+        self.__last_sequence = 0
+
+    def put(self, item: object, key: str = DEFAULT_KEY) -> int:
+        """
+        Overwrites the value of the key and wakes up waiting readers.
+
+        item: Must be picklable into at most `slot_size` bytes including the header.
+        key: One of the keys of the channel.
+
+        Returns the new sequence number of the key.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) + self.__SLOT_HEADER_SIZE > self.__slot_size:
+            raise ValueError(f"Item of {len(data)} bytes does not fit in slot")
+
+        offset = self.__indices[key] * self.__slot_size
+        buffer = self.__shared_memory.buf
+
+        with self.__condition:
+            sequence = self.__read_sequence(offset) + 1
+            start = offset + self.__SLOT_HEADER_SIZE
+            buffer[start : start + len(data)] = data
+            struct.pack_into(self.__SLOT_HEADER_FORMAT, buffer, offset, sequence, len(data))
+
+            self.__condition.notify_all()
+
+        return sequence
+
+    def get(
+        self, key: str = DEFAULT_KEY, last_sequence: int = 0, timeout: "float | None" = None
+    ) -> "tuple[True, int, object] | tuple[False, int, None]":
+        """
+        Waits for a value of the key newer than `last_sequence` and returns the latest one.
+
+        key: One of the keys of the channel.
+        last_sequence: Sequence number the reader has already seen, 0 for any value.
+        timeout: Time waiting in seconds, 0 does not wait and None waits forever.
+
+        Returns whether there was a newer value, its sequence number and the value.
+        On failure the sequence number is `last_sequence` .
+        """
+        offset = self.__indices[key] * self.__slot_size
+        buffer = self.__shared_memory.buf
+
+        with self.__condition:
+            if not self.__condition.wait_for(
+                lambda: self.__read_sequence(offset) > last_sequence, timeout
+            ):
+                return False, last_sequence, None
+
+            sequence, length = struct.unpack_from(self.__SLOT_HEADER_FORMAT, buffer, offset)
+            start = offset + self.__SLOT_HEADER_SIZE
+            data = bytes(buffer[start : start + length])
+
+        return True, sequence, pickle.loads(data)
+
+    def sequence(self, key: str = DEFAULT_KEY) -> int:
+        """
+        Latest sequence number of the key, read without locking.
+        """
+        return self.__read_sequence(self.__indices[key] * self.__slot_size)
+
+    def put_many(self, items: "list[object]", max_wait: float = 0.0) -> int:
+        """
+        Puts the last item into the default key, the others would be overwritten anyway.
+
+        items: Items to put.
+        max_wait: Unused, a put never waits.
+
+        Returns the number of items, which are never refused.
+        """
+        _ = max_wait
+
+        if len(items) > 0:
+            self.put(items[-1])
+
+        return len(items)
+
+    def get_many(self, max_batch: int, max_wait: float = 0.0) -> "list[object]":
+        """
+        Returns the latest value of the default key if this process has not seen it yet.
+
+        max_batch: Unused, there is at most 1 value.
+        max_wait: Time waiting in seconds for a new value, 0 does not wait.
+
+        Returns a list of the value, empty if nothing new arrived in time.
+        """
+        _ = max_batch
+
+        result, sequence, item = self.get(DEFAULT_KEY, self.__last_sequence, max_wait)
+        if not result:
+            return []
+
+        self.__last_sequence = sequence
+        return [item]
+
+    def fill_and_drain_queue(self) -> None:
+        """
+        Puts the sentinel (None) into every key to wake up readers.
+        Nothing needs draining as values are overwritten.
+        """
+        for key in self.__indices:
+            self.put(None, key)
+
+    def close(self) -> None:
+        """
+        Frees the shared memory.
+        Call once from main after all workers have been joined.
+        """
+        self.__shared_memory.close()
+        self.__shared_memory.unlink()
+
+    def __read_sequence(self, offset: int) -> int:
+        """
+        Sequence number in the slot header at the offset.
+        """
+        return struct.unpack_from("=Q", self.__shared_memory.buf, offset)[0]
@@ -0,0 +1,124 @@
+"""
+For running jobs periodically in a worker loop.
+"""
+
+import enum
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+
+
+class MissedTickPolicy(enum.Enum):
+    """
+    What happens to the ticks of a job that passed while it was late.
+    """
+
+    # Run once and continue at the next tick in the future
+    SKIP = 0
+    # Run once for every tick that passed
+    CATCH_UP = 1
+
+
+class PeriodicScheduler:
+    """
+    Runs jobs at fixed periods on absolute monotonic deadlines.
+
+    Each deadline is the previous deadline plus the period rather than the time the job ran
+    plus the period, so the time jobs take does not accumulate into drift.
+    Several jobs share one loop, ordered by deadline in a heap.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor creates an empty schedule.
+        """
+        # Deadline, insertion order to break ties, and name of each job
+        self.__deadlines: "list[tuple[float, int, str]]" = []
+        self.__order = itertools.count()
+        self.__jobs: "dict[str, tuple[Callable[[], object], float, MissedTickPolicy]]" = {}
+        self.__skipped_counts: "dict[str, int]" = {}
+
+    def add(
+        self,
+        name: str,
+        job: "Callable[[], object]",
+        period: float,
+        policy: MissedTickPolicy = MissedTickPolicy.SKIP,
+        delay: float = 0.0,
+    ) -> bool:
+        """
+        Schedules the job.
+
+        name: Unique name of the job.
+        job: Called with no arguments at every tick, its result is ignored.
+        period: Time in seconds between ticks.
+        policy: What happens to ticks that passed while the job was late.
+        delay: Time in seconds from now until the first tick.
+
+        Returns False if the name is taken or the period is not positive.
+        """
+        if name in self.__jobs or period <= 0.0:
+            return False
+
+        self.__jobs[name] = (job, period, policy)
+        self.__skipped_counts[name] = 0
+        heapq.heappush(self.__deadlines, (time.monotonic() + delay, next(self.__order), name))
+        return True
+
+    def time_until_next(self) -> "float | None":
+        """
+        Time in seconds until the earliest deadline, 0 if already due, None if there are no jobs.
+        """
+        if len(self.__deadlines) == 0:
+            return None
+
+        return max(self.__deadlines[0][0] - time.monotonic(), 0.0)
+
+    def wait(self, max_wait: "float | None" = None) -> None:
+        """
+        Sleeps until the earliest deadline.
+
+        max_wait: Longest time in seconds to sleep, such as to check for exit requests,
+            None for no limit.
+        """
+        wait = self.time_until_next()
+        if wait is None:
+            wait = max_wait
+        elif max_wait is not None:
+            wait = min(wait, max_wait)
+
+        if wait is not None and wait > 0.0:
+            time.sleep(wait)
+
+    def run_pending(self) -> int:
+        """
+        Runs the jobs that are due, in order of deadline.
+
+        Returns the number of times jobs were run.
+        """
+        run_count = 0
+        now = time.monotonic()
+        while len(self.__deadlines) > 0 and self.__deadlines[0][0] <= now:
+            deadline, _, name = self.__deadlines[0]
+            job, period, policy = self.__jobs[name]
+
+            job()
+            run_count += 1
+
+            deadline += period
+            if policy == MissedTickPolicy.SKIP and deadline <= now:
+                # Stay on the original ticks
+                skipped = int((now - deadline) // period) + 1
+                deadline += skipped * period
+                self.__skipped_counts[name] += skipped
+
+            heapq.heapreplace(self.__deadlines, (deadline, next(self.__order), name))
+
+        return run_count
+
+    def get_skipped_counts(self) -> "dict[str, int]":
+        """
+        Number of ticks of each job that were skipped because it was late.
+        """
+        return dict(self.__skipped_counts)
@@ -2,22 +2,91 @@
 Queue.
 """
 
+import enum
+import multiprocessing as mp
 import multiprocessing.managers
+import multiprocessing.synchronize
 import queue
 import time
 
+from . import shared_memory_queue
+
+
+class QueueBackend(enum.Enum):
+    """
+    Underlying queue implementation.
+    """
+
+    MANAGER = 0
+    SHARED_MEMORY = 1
+
+
+class OverflowPolicy(enum.Enum):
+    """
+    What `QueueProxyWrapper.put()` does when the queue is full.
+    """
+
+    # Wait for space
+    BLOCK = 0
+    # Discard the item being put
+    DROP_NEWEST = 1
+    # Discard the oldest item in the queue to make space
+    DROP_OLDEST = 2
+    # Wait for space up to the overflow timeout, then discard the item being put
+    BLOCK_TIMEOUT_THEN_DROP = 3
+
 
 class QueueProxyWrapper:
     """
     Wrapper for an underlying queue proxy which also stores `maxsize`.
 
     `maxsize <= 0` means infinite size.
+    The shared memory backend is always bounded, `maxsize <= 0` uses a default number of slots.
+
+    Producers should use `put()` and `put_many()`, which apply the overflow policy
+    and count the discarded items.
     """
 
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
+    __SHARED_MEMORY_DEFAULT_MAXSIZE = 64
+
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager | None,
+        maxsize: int = 0,
+        backend: QueueBackend = QueueBackend.MANAGER,
+        slot_size: int = shared_memory_queue.DEFAULT_SLOT_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        overflow_timeout: float = 0.0,
+        notifier: multiprocessing.synchronize.Condition | None = None,
+    ) -> None:
+        """
+        mp_manager: Manager to create the queue proxy, unused by the shared memory backend.
+        maxsize: Maximum number of items in the queue.
+        backend: Queue implementation.
+        slot_size: Maximum pickled item size in bytes for the shared memory backend.
+        overflow_policy: What a put does when the queue is full.
+        overflow_timeout: Time waiting in seconds for space before dropping,
+            only used by `OverflowPolicy.BLOCK_TIMEOUT_THEN_DROP` .
+        notifier: Condition notified after every put, share one between queues
+            to wait on all of them with `queue_select.wait_any()` .
+        """
+        self.backend = backend
+        self.overflow_policy = overflow_policy
+        self.overflow_timeout = overflow_timeout
+        self.notifier = notifier
+        self.__dropped_count = mp.Value("Q", 0)
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, maxsize: int = 0) -> None:
+        if backend == QueueBackend.SHARED_MEMORY:
+            if maxsize <= 0:
+                maxsize = self.__SHARED_MEMORY_DEFAULT_MAXSIZE
+
+            self.queue = shared_memory_queue.SharedMemoryQueue(maxsize, slot_size)
+            self.maxsize = maxsize
+            return
+
+        assert mp_manager is not None, "Manager backend requires a manager"
         self.queue = mp_manager.Queue(maxsize)
         self.maxsize = maxsize
 
@@ -30,11 +99,9 @@ class QueueProxyWrapper:
         if timeout <= 0.0:
             timeout = self.__QUEUE_TIMEOUT
 
-        try:
-            for _ in range(self.maxsize):
-                self.queue.put(None, timeout=timeout)
-        except queue.Full:
-            return
+        # Sentinels are not subject to the overflow policy
+        self.__put_many_without_policy([None] * self.maxsize, timeout)
+        self.__notify()
 
     def drain_queue(self, timeout: float = 0.0) -> None:
         """
@@ -45,11 +112,102 @@ class QueueProxyWrapper:
         if timeout <= 0.0:
             timeout = self.__QUEUE_TIMEOUT
 
+        self.get_many(self.maxsize, timeout)
+
+    def put(self, item: object) -> None:
+        """
+        Puts an item into the queue, applying the overflow policy if it is full.
+        Same call as `LatestValueChannel.put()` so producers can be given either.
+        """
+        match self.overflow_policy:
+            case OverflowPolicy.BLOCK:
+                self.queue.put(item)
+            case OverflowPolicy.DROP_NEWEST:
+                try:
+                    self.queue.put_nowait(item)
+                except queue.Full:
+                    self.__add_dropped(1)
+            case OverflowPolicy.DROP_OLDEST:
+                self.__put_dropping_oldest(item)
+            case OverflowPolicy.BLOCK_TIMEOUT_THEN_DROP:
+                try:
+                    self.queue.put(item, timeout=self.overflow_timeout)
+                except queue.Full:
+                    self.__add_dropped(1)
+
+        self.__notify()
+
+    def put_many(self, items: "list[object]", max_wait: "float | None" = None) -> int:
+        """
+        Puts items into the queue in order, applying the overflow policy to those that do not fit.
+        The shared memory backend transfers every run of free slots under a single lock,
+        the manager backend still makes one round-trip per item.
+
+        items: Items to put.
+        max_wait: Total time waiting in seconds for space, 0 does not wait.
+            None waits forever for `OverflowPolicy.BLOCK` , like `put()` , and does not wait
+            for the other policies.
+            `OverflowPolicy.BLOCK_TIMEOUT_THEN_DROP` waits at least the overflow timeout.
+
+        Returns the number of items put. With `OverflowPolicy.BLOCK` the rest did not fit in time
+        and are left to the caller, with the other policies they were dropped and counted.
+        """
+        if max_wait is None and self.overflow_policy != OverflowPolicy.BLOCK:
+            max_wait = 0.0
+
+        if self.overflow_policy == OverflowPolicy.BLOCK_TIMEOUT_THEN_DROP:
+            max_wait = max(max_wait, self.overflow_timeout)
+
+        count = self.__put_many_without_policy(items, max_wait)
+
+        match self.overflow_policy:
+            case OverflowPolicy.DROP_NEWEST | OverflowPolicy.BLOCK_TIMEOUT_THEN_DROP:
+                self.__add_dropped(len(items) - count)
+            case OverflowPolicy.DROP_OLDEST:
+                for item in items[count:]:
+                    self.__put_dropping_oldest(item)
+
+                count = len(items)
+
+        self.__notify()
+
+        return count
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items discarded by the overflow policy across all processes.
+        """
+        return self.__dropped_count.value
+
+    def get_many(self, max_batch: int, max_wait: float = 0.0) -> "list[object]":
+        """
+        Removes and returns up to `max_batch` items.
+        Only the first item is waited for, the rest are taken if already in the queue.
+        The shared memory backend transfers the whole batch under a single lock,
+        the manager backend still makes one round-trip per item.
+
+        max_batch: Maximum number of items returned.
+        max_wait: Time waiting in seconds for the first item, 0 does not wait.
+
+        Returns the items, empty if nothing arrived in time.
+        """
+        if self.backend == QueueBackend.SHARED_MEMORY:
+            return self.queue.get_many(max_batch, max_wait > 0.0, max_wait)
+
+        items = []
         try:
-            for _ in range(self.maxsize):
-                self.queue.get(timeout=timeout)
+            if max_batch > 0:
+                if max_wait > 0.0:
+                    items.append(self.queue.get(timeout=max_wait))
+                else:
+                    items.append(self.queue.get_nowait())
+
+            while len(items) < max_batch:
+                items.append(self.queue.get_nowait())
         except queue.Empty:
-            return
+            pass
+
+        return items
 
     def fill_and_drain_queue(self) -> None:
         """
@@ -58,3 +216,79 @@ class QueueProxyWrapper:
         self.fill_queue_with_sentinel()
         time.sleep(self.__QUEUE_DELAY)
         self.drain_queue()
+
+    def close(self) -> None:
+        """
+        Frees the shared memory of the shared memory backend, does nothing otherwise.
+        Call once from main after all workers have been joined.
+        """
+        if self.backend == QueueBackend.SHARED_MEMORY:
+            self.queue.unlink()
+
+    def __put_many_without_policy(self, items: "list[object]", max_wait: "float | None") -> int:
+        """
+        Puts items into the queue in order, stopping at the first that does not fit in time.
+
+        max_wait: Total time waiting in seconds for space, None waits forever.
+
+        Returns the number of items put.
+        """
+        if self.backend == QueueBackend.SHARED_MEMORY:
+            return self.queue.put_many(items, max_wait is None or max_wait > 0.0, max_wait)
+
+        if max_wait is None:
+            for item in items:
+                self.queue.put(item)
+
+            return len(items)
+
+        deadline = time.monotonic() + max_wait
+        for count, item in enumerate(items):
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0.0:
+                    self.queue.put(item, timeout=remaining)
+                else:
+                    self.queue.put_nowait(item)
+            except queue.Full:
+                return count
+
+        return len(items)
+
+    def __put_dropping_oldest(self, item: object) -> None:
+        """
+        Puts an item, discarding the oldest items until it fits.
+        """
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+
+            # A consumer may have made space in the meantime
+            try:
+                self.queue.get_nowait()
+                self.__add_dropped(1)
+            except queue.Empty:
+                pass
+
+    def __notify(self) -> None:
+        """
+        Wakes up everything waiting on the notifier, if there is one.
+        """
+        if self.notifier is None:
+            return
+
+        with self.notifier:
+            self.notifier.notify_all()
+
+    def __add_dropped(self, count: int) -> None:
+        """
+        Adds to the shared count of discarded items.
+        """
+        if count <= 0:
+            return
+
+        with self.__dropped_count.get_lock():
+            self.__dropped_count.value += count
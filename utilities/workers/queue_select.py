@@ -0,0 +1,78 @@
+"""
+Waiting on multiple queues.
+"""
+
+import time
+
+from . import queue_proxy_wrapper
+
+
+POLL_MIN_DELAY = 0.001  # seconds
+POLL_MAX_DELAY = 0.05  # seconds
+
+
+def first_readable(queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> "int | None":
+    """
+    Returns the index of the first queue that is not empty, or None.
+    """
+    for i, queue in enumerate(queues):
+        if not queue.queue.empty():
+            return i
+
+    return None
+
+
+def wait_any(
+    queues: "list[queue_proxy_wrapper.QueueProxyWrapper]", timeout: "float | None" = None
+) -> "tuple[True, int] | tuple[False, None]":
+    """
+    Blocks until one of the queues has an item.
+
+    If all queues were created with the same notifier in this process, sleeps on the notifier
+    until a put wakes it up. Otherwise polls the queues with an increasing delay.
+
+    queues: Queues to wait on, earlier queues are reported first if several are readable.
+    timeout: Time waiting in seconds, None waits forever.
+
+    Returns whether a queue became readable and its index.
+    """
+    if len(queues) == 0:
+        return False, None
+
+    notifier = queues[0].notifier
+    if notifier is not None and all(queue.notifier is notifier for queue in queues):
+        with notifier:
+            notifier.wait_for(lambda: first_readable(queues) is not None, timeout)
+            index = first_readable(queues)
+    else:
+        index = poll(queues, timeout)
+
+    if index is None:
+        return False, None
+
+    return True, index
+
+
+def poll(
+    queues: "list[queue_proxy_wrapper.QueueProxyWrapper]", timeout: "float | None"
+) -> "int | None":
+    """
+    Checks the queues with exponential backoff until one is readable or the timeout expires.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = POLL_MIN_DELAY
+    while True:
+        index = first_readable(queues)
+        if index is not None:
+            return index
+
+        if deadline is None:
+            time.sleep(delay)
+        else:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return None
+
+            time.sleep(min(delay, remaining))
+
+        delay = min(delay * 2, POLL_MAX_DELAY)
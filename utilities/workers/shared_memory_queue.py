@@ -0,0 +1,230 @@
+"""
+Shared memory queue.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import pickle
+import queue
+import struct
+import time
+
+
+DEFAULT_SLOT_SIZE = 4096  # bytes
+
+
+class SharedMemoryQueue:
+    """
+    Fixed-slot ring buffer in shared memory with the same interface as a queue proxy.
+
+    Items are pickled into slots of `slot_size` bytes. The head and tail counters live in the
+    shared memory header and are guarded by a lock, semaphores count the used and free slots.
+    Unlike a `SyncManager` queue, no transfer goes through the manager server process.
+    """
+
+    __HEADER_FORMAT = "=QQ"  # head, tail
+    __HEADER_SIZE = struct.calcsize(__HEADER_FORMAT)
+    __TAIL_OFFSET = struct.calcsize("=Q")
+    __LENGTH_FORMAT = "=I"
+    __LENGTH_SIZE = struct.calcsize(__LENGTH_FORMAT)
+
+    def __init__(self, maxsize: int, slot_size: int = DEFAULT_SLOT_SIZE) -> None:
+        """
+        Constructor allocates the shared memory and the synchronization primitives.
+
+        maxsize: Number of slots, must be greater than 0 .
+        slot_size: Size of a slot in bytes, including the length prefix of the pickled item.
+        """
+        assert maxsize > 0, "Shared memory queue must be bounded"
+        assert slot_size > self.__LENGTH_SIZE, "Slot too small"
+
+        self.__maxsize = maxsize
+        self.__slot_size = slot_size
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__HEADER_SIZE + maxsize * slot_size,
+        )
+        struct.pack_into(self.__HEADER_FORMAT, self.__shared_memory.buf, 0, 0, 0)
+
+        self.__lock = mp.Lock()
+        self.__used_slots = mp.Semaphore(0)
+        self.__free_slots = mp.Semaphore(maxsize)
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue.
+
+        item: Must be picklable into at most `slot_size` bytes including the length prefix.
+        block: Whether to wait for a free slot.
+        timeout: Time waiting in seconds before raising `queue.Full`, None waits forever.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) + self.__LENGTH_SIZE > self.__slot_size:
+            raise ValueError(f"Item of {len(data)} bytes does not fit in slot")
+
+        if not self.__free_slots.acquire(block, timeout):
+            raise queue.Full
+
+        with self.__lock:
+            self.__write_slot(data)
+
+        self.__used_slots.release()
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Puts an item into the queue without blocking.
+        """
+        self.put(item, False)
+
+    def put_many(
+        self, items: "list[object]", block: bool = True, timeout: "float | None" = None
+    ) -> int:
+        """
+        Puts items into the queue in order, taking the lock once for every run of free slots.
+
+        items: Each must be picklable into at most `slot_size` bytes including the length prefix.
+        block: Whether to wait for free slots.
+        timeout: Total time waiting in seconds, None waits forever.
+
+        Returns the number of items put, the rest did not fit in time.
+        """
+        datas = [pickle.dumps(item, pickle.HIGHEST_PROTOCOL) for item in items]
+        for data in datas:
+            if len(data) + self.__LENGTH_SIZE > self.__slot_size:
+                raise ValueError(f"Item of {len(data)} bytes does not fit in slot")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        count = 0
+        while count < len(datas):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            if not self.__free_slots.acquire(block, remaining):
+                break
+
+            # Claim every other free slot available right now
+            claimed = 1
+            while count + claimed < len(datas) and self.__free_slots.acquire(False):
+                claimed += 1
+
+            with self.__lock:
+                for data in datas[count : count + claimed]:
+                    self.__write_slot(data)
+
+            for _ in range(claimed):
+                self.__used_slots.release()
+
+            count += claimed
+
+        return count
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns the oldest item in the queue.
+
+        block: Whether to wait for an item.
+        timeout: Time waiting in seconds before raising `queue.Empty`, None waits forever.
+        """
+        if not self.__used_slots.acquire(block, timeout):
+            raise queue.Empty
+
+        with self.__lock:
+            data = self.__read_slot()
+
+        self.__free_slots.release()
+
+        return pickle.loads(data)
+
+    def get_nowait(self) -> object:
+        """
+        Removes and returns the oldest item in the queue without blocking.
+        """
+        return self.get(False)
+
+    def get_many(
+        self, max_items: int, block: bool = True, timeout: "float | None" = None
+    ) -> "list[object]":
+        """
+        Removes and returns up to `max_items` of the oldest items, taking the lock once.
+
+        max_items: Maximum number of items returned.
+        block: Whether to wait for the first item, the others are only taken if already present.
+        timeout: Time waiting in seconds for the first item, None waits forever.
+
+        Returns the items, empty if nothing arrived in time.
+        """
+        if max_items <= 0 or not self.__used_slots.acquire(block, timeout):
+            return []
+
+        claimed = 1
+        while claimed < max_items and self.__used_slots.acquire(False):
+            claimed += 1
+
+        with self.__lock:
+            datas = [self.__read_slot() for _ in range(claimed)]
+
+        for _ in range(claimed):
+            self.__free_slots.release()
+
+        return [pickle.loads(data) for data in datas]
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items in the queue.
+        """
+        head, tail = struct.unpack_from(self.__HEADER_FORMAT, self.__shared_memory.buf, 0)
+        return tail - head
+
+    def empty(self) -> bool:
+        """
+        Whether the queue is approximately empty.
+        """
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        """
+        Whether the queue is approximately full.
+        """
+        return self.qsize() >= self.__maxsize
+
+    def unlink(self) -> None:
+        """
+        Closes and frees the shared memory.
+        Call once from the creating process after all other processes have stopped using it.
+        """
+        self.__shared_memory.close()
+        self.__shared_memory.unlink()
+
+    def __slot_offset(self, index: int) -> int:
+        """
+        Byte offset of the slot for the head or tail counter.
+        """
+        return self.__HEADER_SIZE + (index % self.__maxsize) * self.__slot_size
+
+    def __write_slot(self, data: bytes) -> None:
+        """
+        Writes the data at the tail and advances it. Lock must be held.
+        """
+        buffer = self.__shared_memory.buf
+        tail = struct.unpack_from("=Q", buffer, self.__TAIL_OFFSET)[0]
+
+        offset = self.__slot_offset(tail)
+        struct.pack_into(self.__LENGTH_FORMAT, buffer, offset, len(data))
+        start = offset + self.__LENGTH_SIZE
+        buffer[start : start + len(data)] = data
+
+        struct.pack_into("=Q", buffer, self.__TAIL_OFFSET, tail + 1)
+
+    def __read_slot(self) -> bytes:
+        """
+        Copies out the data at the head and advances it. Lock must be held.
+        """
+        buffer = self.__shared_memory.buf
+        head = struct.unpack_from("=Q", buffer, 0)[0]
+
+        offset = self.__slot_offset(head)
+        length = struct.unpack_from(self.__LENGTH_FORMAT, buffer, offset)[0]
+        start = offset + self.__LENGTH_SIZE
+        data = bytes(buffer[start : start + length])
+
+        struct.pack_into("=Q", buffer, 0, head + 1)
+
+        return data
@@ -3,70 +3,123 @@ For controlling workers.
 """
 
 import multiprocessing as mp
+import os
 import time
 
 
+# Whether this process has reported reaching its loop, reset in forked children
+_is_loop_start_reported = False  # pylint: disable=invalid-name
+
+
+def _reset_loop_start_reported() -> None:
+    """
+    Forked children have not reached their loop yet.
+    """
+    global _is_loop_start_reported  # pylint: disable=global-statement
+    _is_loop_start_reported = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_loop_start_reported)
+
+
 class WorkerController:
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
+
+    Requests are bits of a state word in shared memory, so the checks done by workers
+    on every loop iteration are a single memory read.
     """
 
-    __QUEUE_DELAY = 0.1  # seconds
+    __EXIT_BIT = 0x1
+    __PAUSE_BIT = 0x2
 
     def __init__(self) -> None:
         """
-        Constructor creates internal queue and semaphore.
+        Constructor creates shared state word and resume event.
         """
-        self.__pause = mp.BoundedSemaphore(1)
-        self.__is_paused = False
-        self.__exit_queue = mp.Queue(1)
+        # Written under the lock, read without it
+        self.__state = mp.RawValue("i", 0)
+        self.__state_lock = mp.Lock()
+
+        # Set while not paused
+        self.__resume = mp.Event()
+        self.__resume.set()
+
+        # Process ID and monotonic time of the first exit check of each process
+        self.__loop_starts = mp.SimpleQueue()
+        self.__loop_start_times: "dict[int, float]" = {}
 
     def request_pause(self) -> None:
         """
         Requests worker processes to pause.
         """
-        if not self.__is_paused:
-            self.__pause.acquire()
-            self.__is_paused = True
+        with self.__state_lock:
+            # Clear before publishing so a worker that sees the bit always blocks
+            self.__resume.clear()
+            self.__state.value |= self.__PAUSE_BIT
 
     def request_resume(self) -> None:
         """
         Requests worker processes to resume.
         """
-        if self.__is_paused:
-            self.__pause.release()
-            self.__is_paused = False
+        with self.__state_lock:
+            self.__state.value &= ~self.__PAUSE_BIT
+            self.__resume.set()
 
     def check_pause(self) -> None:
         """
         Blocks worker if main has requested it to pause, otherwise continues.
         """
-        self.__pause.acquire()
-        self.__pause.release()
+        if self.__state.value & self.__PAUSE_BIT:
+            self.__resume.wait()
 
     def request_exit(self) -> None:
         """
         Requests worker processes to exit.
         Does nothing if already requested.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if self.__exit_queue.empty():
-            self.__exit_queue.put(None)
+        with self.__state_lock:
+            self.__state.value |= self.__EXIT_BIT
 
     def clear_exit(self) -> None:
         """
         Clears the exit request condition.
         Does nothing if already cleared.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if not self.__exit_queue.empty():
-            _ = self.__exit_queue.get()
+        with self.__state_lock:
+            self.__state.value &= ~self.__EXIT_BIT
 
     def is_exit_requested(self) -> bool:
         """
         Returns whether main has requested the worker process to exit.
         There is a race condition, but it's fine because the worker process
         will do at most 1 additional loop.
+
+        The first call in each process also reports that the worker has reached its loop.
+        """
+        if not _is_loop_start_reported:
+            self.__report_loop_start()
+
+        return (self.__state.value & self.__EXIT_BIT) != 0
+
+    def get_loop_start_times(self) -> "dict[int, float]":
+        """
+        Returns the monotonic time each process first checked for exit, by process ID.
+        Call from main only.
         """
-        return not self.__exit_queue.empty()
+        while not self.__loop_starts.empty():
+            process_id, loop_start_time = self.__loop_starts.get()
+            self.__loop_start_times[process_id] = loop_start_time
+
+        return dict(self.__loop_start_times)
+
+    def __report_loop_start(self) -> None:
+        """
+        Reports the first exit check of this process.
+        """
+        global _is_loop_start_reported  # pylint: disable=global-statement
+        _is_loop_start_reported = True
+
+        self.__loop_starts.put((os.getpid(), time.monotonic()))
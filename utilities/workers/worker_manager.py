@@ -3,13 +3,14 @@ For managing workers.
 """
 
 import multiprocessing as mp
+import time
 
 from modules.common.modules.logger import logger
 from utilities.workers import worker_controller
 from utilities.workers import queue_proxy_wrapper
 
 
-class WorkerProperties:
+class WorkerProperties:  # pylint: disable=too-many-instance-attributes
     """
     Worker Properties.
     """
@@ -26,6 +27,8 @@ class WorkerProperties:
         output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         controller: worker_controller.WorkerController,
         local_logger: logger.Logger,
+        start_method: "str | None" = None,
+        preload: "list[str] | None" = None,
     ) -> "tuple[bool, WorkerProperties | None]":
         """
         Creates worker properties.
@@ -37,6 +40,11 @@ class WorkerProperties:
         output_queues: Output queues.
         controller: Worker controller.
         local_logger: Existing logger from process.
+        start_method: "spawn", "fork", or "forkserver", None for the default of the platform.
+            Queues and the controller must be created with the same start method,
+            so set it with `mp.set_start_method()` in main as well.
+        preload: Modules imported once by the fork server instead of by every worker,
+            only used by "forkserver". Only the first preload before the server starts is used.
 
         Returns the WorkerProperties object.
         """
@@ -47,6 +55,13 @@ class WorkerProperties:
             )
             return False, None
 
+        if start_method is not None and start_method not in mp.get_all_start_methods():
+            local_logger.error(f"Start method {start_method} not available on platform", True)
+            return False, None
+
+        if preload is None:
+            preload = []
+
         return True, WorkerProperties(
             cls.__create_key,
             count,
@@ -55,6 +70,8 @@ class WorkerProperties:
             input_queues,
             output_queues,
             controller,
+            start_method,
+            preload,
         )
 
     def __init__(
@@ -66,6 +83,8 @@ class WorkerProperties:
         input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         controller: worker_controller.WorkerController,
+        start_method: "str | None",
+        preload: "list[str]",
     ) -> None:
         """
         Private constructor, use create() method.
@@ -78,6 +97,8 @@ class WorkerProperties:
         self.__input_queues = input_queues
         self.__output_queues = output_queues
         self.__controller = controller
+        self.__start_method = start_method
+        self.__preload = preload
 
     def get_worker_arguments(self) -> "tuple":
         """
@@ -116,6 +137,24 @@ class WorkerProperties:
         """
         return self.__target.__name__
 
+    def get_controller(self) -> worker_controller.WorkerController:
+        """
+        Returns the worker controller.
+        """
+        return self.__controller
+
+    def get_start_method(self) -> "str | None":
+        """
+        Returns the start method, None for the default of the platform.
+        """
+        return self.__start_method
+
+    def get_preload(self) -> "list[str]":
+        """
+        Returns the modules for the fork server to preload.
+        """
+        return self.__preload
+
 
 class WorkerManager:
     """
@@ -139,11 +178,15 @@ class WorkerManager:
 
         Returns whether the workers were able to be created and the Worker Manager.
         """
+        # Must be set before the fork server is started by the first worker
+        preload = worker_properties.get_preload()
+        if worker_properties.get_start_method() == "forkserver" and len(preload) > 0:
+            mp.get_context("forkserver").set_forkserver_preload(preload)
+
         workers = []
         for _ in range(0, worker_properties.get_worker_count()):
             result, worker = WorkerManager.__create_single_worker(
-                worker_properties.get_worker_target(),
-                worker_properties.get_worker_arguments(),
+                worker_properties,
                 local_logger,
             )
             if not result:
@@ -175,19 +218,27 @@ class WorkerManager:
         self.__worker_properties = worker_properties
         self.__local_logger = local_logger
 
+        # Monotonic time each worker was started at
+        self.__start_times: "list[float | None]" = [None] * len(workers)
+
     @staticmethod
-    def __create_single_worker(target: "(...) -> object", args: "tuple", local_logger: logger.Logger) -> "tuple[bool, mp.Process | None]":  # type: ignore
+    def __create_single_worker(
+        worker_properties: WorkerProperties, local_logger: logger.Logger
+    ) -> "tuple[bool, mp.Process | None]":
         """
         Creates a single worker.
 
-        target: Function.
-        args: Target function arguments.
+        worker_properties: Target function, its arguments, and the start method.
         local_logger: Existing logger from process.
 
         Returns whether a worker was created and the worker.
         """
         try:
-            worker = mp.Process(target=target, args=args)
+            context = mp.get_context(worker_properties.get_start_method())
+            worker = context.Process(
+                target=worker_properties.get_worker_target(),
+                args=worker_properties.get_worker_arguments(),
+            )
         # Catching all exceptions for library call
         # pylint: disable-next=broad-exception-caught
         except Exception as e:
@@ -200,7 +251,8 @@ class WorkerManager:
         """
         Start workers.
         """
-        for worker in self.__workers:
+        for i, worker in enumerate(self.__workers):
+            self.__start_times[i] = time.monotonic()
             worker.start()
 
     def join_workers(self) -> None:
@@ -210,16 +262,107 @@ class WorkerManager:
         for worker in self.__workers:
             worker.join()
 
+    def join_worker(self, index: int, timeout: "float | None" = None) -> None:
+        """
+        Join a single worker.
+
+        index: Index of the worker, same as in `get_worker_sentinels()` .
+        timeout: Time in seconds to wait for the worker to end, None to wait until it does.
+        """
+        self.__workers[index].join(timeout)
+
+    def get_target_name(self) -> str:
+        """
+        Returns the name of the target of the workers.
+        """
+        return self.__worker_properties.get_target_name()
+
+    def get_time_to_first_loop(self) -> "list[float | None]":
+        """
+        Time in seconds from starting each worker to its first check of the controller,
+        in worker order. None if the worker has not reached its loop yet.
+        Restarted workers are measured from their restart.
+        """
+        loop_start_times = self.__worker_properties.get_controller().get_loop_start_times()
+
+        times = []
+        for worker, start_time in zip(self.__workers, self.__start_times):
+            loop_start_time = loop_start_times.get(worker.pid)
+            if start_time is None or loop_start_time is None:
+                times.append(None)
+                continue
+
+            times.append(loop_start_time - start_time)
+
+        return times
+
+    def get_worker_sentinels(self) -> "list[int]":
+        """
+        Returns the sentinel of each started worker, in worker order.
+        A sentinel becomes ready for `multiprocessing.connection.wait()` when its worker ends.
+        """
+        return [worker.sentinel for worker in self.__workers]
+
+    def get_worker_exit_codes(self) -> "list[int | None]":
+        """
+        Returns the exit code of each worker, in worker order.
+        None if the worker has not ended, negative if it was ended by a signal.
+        """
+        return [worker.exitcode for worker in self.__workers]
+
+    def restart_worker(self, index: int) -> bool:
+        """
+        Replaces a dead worker with a new one and starts it.
+
+        index: Index of the worker, same as in `get_worker_sentinels()` .
+
+        Returns whether the worker was able to be restarted.
+        """
+        worker = self.__workers[index]
+        if worker.is_alive():
+            return True
+
+        target_and_worker_name = f"{self.__worker_properties.get_target_name()} {worker.name}"
+
+        result, new_worker = WorkerManager.__create_single_worker(
+            self.__worker_properties,
+            self.__local_logger,
+        )
+        if not result:
+            self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+            return False
+
+        # Get Pylance to stop complaining
+        assert new_worker is not None
+
+        # Start before replacing, so a failed start leaves the dead worker to retry on
+        start_time = time.monotonic()
+        try:
+            new_worker.start()
+        # Catching all exceptions for library call
+        # pylint: disable-next=broad-exception-caught
+        except Exception as e:
+            self.__local_logger.error(
+                f"Exception raised while restarting {target_and_worker_name}: {e}", True
+            )
+            return False
+
+        self.__start_times[index] = start_time
+        self.__workers[index] = new_worker
+
+        # Release the resources of the dead worker
+        worker.close()
+
+        return True
+
     def check_and_restart_dead_workers(self) -> bool:
         """
         Check and restart dead workers.
 
         Returns whether the dead workers were able to be restarted.
         """
-        new_workers = []
-        for worker in self.__workers:
+        for i, worker in enumerate(self.__workers):
             if worker.is_alive():
-                new_workers.append(worker)
                 continue
 
             # Log dead worker
@@ -229,19 +372,7 @@ class WorkerManager:
                 True,
             )
 
-            # Create a new worker
-            result, new_worker = WorkerManager.__create_single_worker(
-                self.__worker_properties.get_worker_target(),
-                self.__worker_properties.get_worker_arguments(),
-                self.__local_logger,
-            )
-            if not result:
-                self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+            if not self.restart_worker(i):
                 return False
 
-            # Append the new worker
-            new_workers.append(new_worker)
-
-        self.__workers = new_workers
-
         return True
@@ -0,0 +1,221 @@
+"""
+For restarting workers that die.
+"""
+
+import multiprocessing as mp
+import multiprocessing.connection
+import threading
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+# A worker may not have been reaped yet when its sentinel becomes ready
+EXIT_CODE_TIMEOUT = 1.0  # seconds
+
+
+class WorkerSupervisor:  # pylint: disable=too-many-instance-attributes
+    """
+    Background thread in main that restarts workers that crash.
+
+    Waits on the sentinels of all workers, so it uses no CPU while they are alive.
+    A dead worker is restarted after a backoff that doubles with each recent crash.
+    Once a worker crashes more than the crash loop limit within the crash loop window,
+    it is no longer restarted.
+    A worker that returns normally (exit code 0) has finished and is not restarted.
+    Nothing is restarted after exit has been requested.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        worker_managers: "list[worker_manager.WorkerManager]",
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        crash_loop_limit: int = 5,
+        crash_loop_window: float = 60.0,
+    ) -> "tuple[bool, WorkerSupervisor | None]":
+        """
+        Creates a supervisor of workers that have already been started.
+
+        worker_managers: Managers of the workers to supervise.
+        controller: Worker controller, for whether exit has been requested.
+        local_logger: Existing logger from process.
+        initial_backoff: Delay in seconds before restarting after the first recent crash.
+        max_backoff: Maximum delay in seconds before restarting.
+        crash_loop_limit: Maximum number of crashes of a worker within the window.
+        crash_loop_window: Time in seconds that a crash counts as recent.
+
+        Returns whether the supervisor was able to be created and the supervisor.
+        """
+        if initial_backoff <= 0.0 or max_backoff < initial_backoff:
+            local_logger.error("Backoff must be positive and no greater than maximum", True)
+            return False, None
+
+        if crash_loop_limit <= 0 or crash_loop_window <= 0.0:
+            local_logger.error("Crash loop limit and window must be positive", True)
+            return False, None
+
+        return True, WorkerSupervisor(
+            cls.__create_key,
+            worker_managers,
+            controller,
+            local_logger,
+            initial_backoff,
+            max_backoff,
+            crash_loop_limit,
+            crash_loop_window,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        worker_managers: "list[worker_manager.WorkerManager]",
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+        initial_backoff: float,
+        max_backoff: float,
+        crash_loop_limit: int,
+        crash_loop_window: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WorkerSupervisor.__create_key, "Use create() method"
+
+        self.__worker_managers = worker_managers
+        self.__controller = controller
+        self.__local_logger = local_logger
+        self.__initial_backoff = initial_backoff
+        self.__max_backoff = max_backoff
+        self.__crash_loop_limit = crash_loop_limit
+        self.__crash_loop_window = crash_loop_window
+
+        # Workers are identified by (manager index, worker index)
+        # Time of each recent crash
+        self.__crash_times: "dict[tuple[int, int], list[float]]" = {}
+        # Time at which to restart
+        self.__pending_restarts: "dict[tuple[int, int], float]" = {}
+        # Dead and not to be restarted
+        self.__stopped: "set[tuple[int, int]]" = set()
+
+        self.__restart_counts_lock = threading.Lock()
+        self.__restart_counts = {manager.get_target_name(): 0 for manager in worker_managers}
+
+        self.__stop_reader, self.__stop_writer = mp.Pipe(False)
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self) -> None:
+        """
+        Starts supervising in the background.
+        """
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops supervising and waits for the background thread to end.
+        Call before joining the workers.
+        """
+        self.__stop_writer.send(None)
+        self.__thread.join()
+
+    def get_restart_counts(self) -> "dict[str, int]":
+        """
+        Returns the number of restarts of each worker target.
+        """
+        with self.__restart_counts_lock:
+            return dict(self.__restart_counts)
+
+    def __run(self) -> None:
+        """
+        Supervisor loop.
+        """
+        while True:
+            self.__restart_due_workers()
+
+            sentinels = {}
+            for i, manager in enumerate(self.__worker_managers):
+                for j, sentinel in enumerate(manager.get_worker_sentinels()):
+                    key = (i, j)
+                    if key not in self.__pending_restarts and key not in self.__stopped:
+                        sentinels[sentinel] = key
+
+            timeout = None
+            if len(self.__pending_restarts) > 0:
+                timeout = max(min(self.__pending_restarts.values()) - time.monotonic(), 0.0)
+
+            ready = multiprocessing.connection.wait(list(sentinels) + [self.__stop_reader], timeout)
+            if self.__stop_reader in ready:
+                return
+
+            for sentinel in ready:
+                self.__handle_death(sentinels[sentinel])
+
+    def __handle_death(self, key: "tuple[int, int]") -> None:
+        """
+        Schedules a restart of the dead worker, unless exiting, it finished or crash looping.
+        """
+        if self.__controller.is_exit_requested():
+            self.__stopped.add(key)
+            return
+
+        manager = self.__worker_managers[key[0]]
+        worker_name = f"{manager.get_target_name()} worker {key[1]}"
+
+        # Returning from the worker function is a deliberate end, such as a timeout
+        manager.join_worker(key[1], EXIT_CODE_TIMEOUT)
+        if manager.get_worker_exit_codes()[key[1]] == 0:
+            self.__local_logger.info(f"{worker_name} finished, not restarting", True)
+            self.__stopped.add(key)
+            return
+
+        now = time.monotonic()
+        crash_times = [
+            crash_time
+            for crash_time in self.__crash_times.get(key, [])
+            if now - crash_time < self.__crash_loop_window
+        ]
+        crash_times.append(now)
+        self.__crash_times[key] = crash_times
+
+        if len(crash_times) > self.__crash_loop_limit:
+            self.__local_logger.error(
+                f"{worker_name} crashed {len(crash_times)} times in {self.__crash_loop_window}s, not restarting",
+                True,
+            )
+            self.__stopped.add(key)
+            return
+
+        backoff = min(self.__initial_backoff * 2 ** (len(crash_times) - 1), self.__max_backoff)
+        self.__local_logger.warning(f"{worker_name} died, restarting in {backoff}s", True)
+        self.__pending_restarts[key] = now + backoff
+
+    def __restart_due_workers(self) -> None:
+        """
+        Restarts the workers whose backoff has elapsed.
+        """
+        now = time.monotonic()
+        for key, restart_time in list(self.__pending_restarts.items()):
+            if restart_time > now:
+                continue
+
+            del self.__pending_restarts[key]
+
+            if self.__controller.is_exit_requested():
+                self.__stopped.add(key)
+                continue
+
+            manager = self.__worker_managers[key[0]]
+            if not manager.restart_worker(key[1]):
+                # Try again after another backoff
+                self.__handle_death(key)
+                continue
+
+            with self.__restart_counts_lock:
+                self.__restart_counts[manager.get_target_name()] += 1